@@ -14,14 +14,54 @@ from mobase import IPlugin
 
 from .basic_game import BasicGame
 from .basic_game_ini import BasicIniGame
+from .plugin_manifest import GameModuleManifest, load_ini_games, load_manifest
+from .startup_profile import startup_profile
 
 site.addsitedir(os.path.join(os.path.dirname(__file__), "lib"))
 
 
-BasicGame.setup()
+with startup_profile.measure("stages", "setup"):
+    BasicGame.setup()
+
+
+def _create_declarative_plugins(
+    module_manifest: GameModuleManifest,
+) -> list[IPlugin]:
+    """
+    Create the game plugins of a declarative module from its manifest, without
+    importing the module.
+    """
+    plugins: list[IPlugin] = []
+    for game_class in module_manifest.game_classes():
+        try:
+            cls = type(
+                game_class.name,
+                (BasicGame,),
+                {
+                    "__module__": "{}.games.{}".format(
+                        __package__, module_manifest.module
+                    ),
+                    **game_class.attributes,
+                },
+            )
+            with startup_profile.measure("instantiations", game_class.name):
+                plugins.append(cls())
+        except Exception as e:
+            print(
+                "Failed to instantiate {}: {}".format(game_class.name, e),
+                file=sys.stderr,
+            )
+    return plugins
 
 
 def createPlugins():
+    with startup_profile.measure("stages", "createPlugins"):
+        game_plugins = _create_plugins()
+    startup_profile.write()
+    return game_plugins
+
+
+def _create_plugins() -> list[IPlugin]:
     # List of game class from python:
     game_plugins: typing.List[IPlugin] = []
 
@@ -29,19 +69,48 @@ def createPlugins():
     curpath = os.path.abspath(os.path.dirname(__file__))
     escaped_games_path = glob.escape(os.path.join(curpath, "games"))
 
-    # List all the .ini files:
-    for file in glob.glob(os.path.join(escaped_games_path, "*.ini")):
-        game_plugins.append(BasicIniGame(file))
+    # List all the .ini files, compiled and validated once per file change:
+    try:
+        with startup_profile.measure("stages", "ini_games"):
+            ini_games = load_ini_games(pathlib.Path(curpath, "games"))
+    except OSError as e:
+        print("Failed to list INI game plugins: {}".format(e), file=sys.stderr)
+        ini_games = []
+
+    for ini_game in ini_games:
+        name = os.path.basename(ini_game.path)
+        if ini_game.error is not None:
+            print(
+                "Invalid game plugin {}: {}".format(name, ini_game.error),
+                file=sys.stderr,
+            )
+            continue
+        try:
+            with startup_profile.measure("instantiations", name):
+                game_plugins.append(BasicIniGame(ini_game.path, ini_game.attributes))
+        except Exception as e:
+            print("Failed to instantiate {}: {}".format(name, e), file=sys.stderr)
+
+    # List all the python plugins, using the manifest to avoid importing modules
+    # that only contain declarative game plugins:
+    try:
+        with startup_profile.measure("stages", "manifest"):
+            manifest = load_manifest(pathlib.Path(curpath, "games"))
+    except OSError as e:
+        print("Failed to list game plugins: {}".format(e), file=sys.stderr)
+        manifest = []
+
+    for module_manifest in manifest:
+        module_p = os.path.basename(module_manifest.path)
 
-    # List all the python plugins:
-    for file in glob.glob(os.path.join(escaped_games_path, "*.py")):
-        module_p = os.path.relpath(file, os.path.join(curpath, "games"))
-        if module_p == "__init__.py":
+        if module_manifest.declarative:
+            game_plugins.extend(_create_declarative_plugins(module_manifest))
             continue
 
         # Import the module:
         try:
-            module = importlib.import_module(".games." + module_p[:-3], __package__)
+            with startup_profile.measure("imports", module_p[:-3]):
+                module = importlib.import_module(".games." + module_p[:-3], __package__)
         except ImportError as e:
             print("Failed to import module {}: {}".format(module_p, e), file=sys.stderr)
         except Exception as e:
@@ -57,7 +126,8 @@ def createPlugins():
                     and obj is not BasicGame
                 ):
                     try:
-                        game_plugins.append(obj())
+                        with startup_profile.measure("instantiations", name):
+                            game_plugins.append(obj())
                     except Exception as e:
                         print(
                             "Failed to instantiate {}: {}".format(name, e),
@@ -1,8 +1,10 @@
+from .archive_restructurer import ArchiveRestructurer
 from .basic_local_savegames import BasicLocalSavegames
 from .basic_mod_data_checker import BasicModDataChecker, GlobPatterns
 from .basic_save_game_info import BasicGameSaveGameInfo
 
 __all__ = [
+    "ArchiveRestructurer",
     "BasicModDataChecker",
     "BasicGameSaveGameInfo",
     "GlobPatterns",
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import os
+import shutil
+from collections.abc import Iterable
+from pathlib import Path
+
+import mobase
+
+from .utils import is_directory
+
+
+class FileTreeIndex:
+    """
+    Index of the first two levels of a file tree (the entries of the tree and the
+    entries of its folders). Each level is built in a single pass, the second one only
+    when first queried.
+
+    Names of the entries of the tree are compared case-insensitively, like
+    `mobase.IFileTree.exists()`, while names of the entries of its folders are
+    compared exactly.
+    """
+
+    def __init__(self, filetree: mobase.IFileTree):
+        self.entries: tuple[mobase.FileTreeEntry, ...] = tuple(filetree)
+        """The entries of the tree, in order."""
+
+        self._files: set[str] = set()
+        self._directories: set[str] = set()
+        self._suffixes: list[tuple[mobase.FileTreeEntry, str]] = []
+        self._subentries: list[mobase.FileTreeEntry] | None = None
+        # names of the entries of the folders, as a list since most archives are
+        # queried once or twice and hashing the names costs more than scanning them
+        self._subnames: list[str] = []
+
+        for entry in self.entries:
+            if is_directory(entry):
+                self._directories.add(entry.name().casefold())
+            else:
+                self._files.add(entry.name().casefold())
+                self._suffixes.append((entry, entry.suffix().casefold()))
+
+    def _index_subdirectories(self) -> list[mobase.FileTreeEntry]:
+        if self._subentries is None:
+            self._subentries = [
+                subentry
+                for entry in self.entries
+                if is_directory(entry)
+                for subentry in entry
+            ]
+            self._subnames = [subentry.name() for subentry in self._subentries]
+        return self._subentries
+
+    def has_file(self, name: str) -> bool:
+        """
+        Check if the tree contains a file with the given name, like
+        `filetree.exists(name, mobase.IFileTree.FILE)`.
+        """
+        return name.casefold() in self._files
+
+    def has_directory(self, name: str) -> bool:
+        """
+        Check if the tree contains a folder with the given name, like
+        `filetree.exists(name, mobase.IFileTree.DIRECTORY)`.
+        """
+        return name.casefold() in self._directories
+
+    def in_subdirectory(self, name: str) -> bool:
+        """
+        Check if a folder of the tree contains a file or folder with the given name.
+        """
+        self._index_subdirectories()
+        return name in self._subnames
+
+    def files_with_suffix(self, *suffixes: str) -> list[mobase.FileTreeEntry]:
+        """
+        Retrieve the files of the tree with one of the given suffixes (without the
+        leading dot, case-insensitive), in tree order.
+        """
+        keys = {suffix.casefold() for suffix in suffixes}
+        return [entry for entry, suffix in self._suffixes if suffix in keys]
+
+    def subdirectory_entries(self) -> list[mobase.FileTreeEntry]:
+        """
+        Retrieve the entries of the folders of the tree, in tree order.
+        """
+        return list(self._index_subdirectories())
+
+
+class ArchiveRestructurer:
+    """
+    Restructure the content of a mod archive in a mod data checker, e.g.:
+
+        restructurer = ArchiveRestructurer(filetree)
+        if restructurer.index.has_file("mod.txt"):
+            restructurer.move_all("mods/FOLDERNAME/")
+        elif restructurer.index.in_subdirectory("mod.txt"):
+            restructurer.execute([(filetree[0], "mods/")])
+
+    The queries are answered from an index of the tree (see `FileTreeIndex`), built
+    on first use and rebuilt after the tree is modified through the restructurer.
+    Changes made directly to the tree must be followed by a call to `invalidate()`.
+    """
+
+    def __init__(self, filetree: mobase.IFileTree):
+        self._filetree = filetree
+        self._index: FileTreeIndex | None = None
+
+    @property
+    def filetree(self) -> mobase.IFileTree:
+        return self._filetree
+
+    @property
+    def index(self) -> FileTreeIndex:
+        """The index of the current content of the tree."""
+        if self._index is None:
+            self._index = FileTreeIndex(self._filetree)
+        return self._index
+
+    def invalidate(self) -> None:
+        """
+        Discard the index, after the tree was modified outside of the restructurer.
+        """
+        self._index = None
+
+    def execute(
+        self,
+        moves: Iterable[tuple[mobase.FileTreeEntry, str]],
+        policy: mobase.IFileTree.InsertPolicy = mobase.IFileTree.MERGE,
+    ) -> bool:
+        """
+        Move entries of the tree, in order. The moves are planned before any entry is
+        moved, so the plan can be built while iterating the tree.
+
+        Args:
+            moves: Entries to move with their target path, see `mobase.IFileTree.move`
+                for the target path specs.
+            policy (optional): Policy for conflicting entries.
+
+        Returns:
+            True if at least one entry was moved.
+        """
+        plan = list(moves)
+        for entry, target in plan:
+            self._filetree.move(entry, target, policy)
+        if plan:
+            self.invalidate()
+        return bool(plan)
+
+    def move_all(self, target: str) -> bool:
+        """
+        Move all the entries of the tree to the given folder (merging folders).
+
+        Args:
+            target: Target folder, ending with a `/`.
+
+        Returns:
+            True if at least one entry was moved, i.e., if the tree was not empty.
+        """
+        return self.execute((entry, target) for entry in self.index.entries)
+
+
+def move_overwrite_merge(source: Path | str, destination: Path | str) -> None:
+    """
+    Move a file or folder on disk, merging folders with existing folders and
+    replacing existing files. This is used to rename the `FOLDERNAME` placeholder of
+    installed mods.
+
+    Args:
+        source: File or folder to move.
+        destination: Target path.
+    """
+    if not os.path.exists(destination):
+        shutil.move(source, destination)
+        return
+    if os.path.isfile(source):
+        os.replace(source, destination)
+        return
+    for item in os.listdir(source):
+        move_overwrite_merge(
+            os.path.join(source, item), os.path.join(destination, item)
+        )
+    os.rmdir(source)
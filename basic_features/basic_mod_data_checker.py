@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import fnmatch
+import functools
 import re
+import threading
 from dataclasses import dataclass, field
-from typing import Iterable, Literal
+from typing import ClassVar, Hashable, Iterable, Literal, NamedTuple, Sequence
 
 import mobase
 
@@ -37,30 +39,271 @@ class OptionalRegexPattern:
         return bool(self._pattern.match(value))
 
 
+class _GlobTrieNode:
+    __slots__ = ("literals", "wildcards", "terminal", "final")
+
+    def __init__(self) -> None:
+        # children by (casefolded) name, for components without wildcards:
+        self.literals: dict[str, _GlobTrieNode] = {}
+
+        # children for components with wildcards, tried in order:
+        self.wildcards: list[tuple[re.Pattern[str], _GlobTrieNode]] = []
+
+        # True if a pattern ends at this node:
+        self.terminal = False
+
+        # single regex matching the names of the terminal wildcard children, see
+        # GlobTrie.accepts_child():
+        self.final: re.Pattern[str] | None = None
+
+    def compile(self) -> None:
+        alternatives = [
+            wildcard.pattern for wildcard, child in self.wildcards if child.terminal
+        ]
+        if alternatives:
+            self.final = re.compile("|".join(f"(?:{a})" for a in alternatives), re.I)
+        for child in self.literals.values():
+            child.compile()
+        for _, child in self.wildcards:
+            child.compile()
+
+
+GlobTrieState = tuple[_GlobTrieNode, ...]
+"""Nodes of a `GlobTrie` reached by a path, see `GlobTrie.step()`."""
+
+_GLOB_SEPARATORS = re.compile(r"[/\\]")
+
+
+class GlobTrie:
+    """
+    Glob patterns with subfolders (e.g. `Mods/*.pak` or `*/Public`), matched one
+    path component at a time.
+
+    Patterns are split on `/` and `\\` and stored as a trie of components, so that
+    a file tree can be matched while walking it, without building the path of each
+    entry, and subtrees that cannot match any pattern are pruned as soon as their
+    folder is reached (see `step()`). Unlike `fnmatch`, wildcards never match
+    separators, i.e., `*.pak` only matches `.pak` files in the first folder.
+    """
+
+    def __init__(self, globs: Iterable[str]) -> None:
+        self._root = _GlobTrieNode()
+        for glob in globs:
+            node = self._root
+            for component in _GLOB_SEPARATORS.split(glob.strip("/\\")):
+                node = self._child(node, component)
+            node.terminal = True
+        self._root.compile()
+
+    @staticmethod
+    def _child(node: _GlobTrieNode, component: str) -> _GlobTrieNode:
+        if not any(c in component for c in "*?["):
+            return node.literals.setdefault(component.casefold(), _GlobTrieNode())
+
+        pattern = re.compile(fnmatch.translate(component), re.I)
+        for wildcard, child in node.wildcards:
+            if wildcard.pattern == pattern.pattern:
+                return child
+        child = _GlobTrieNode()
+        node.wildcards.append((pattern, child))
+        return child
+
+    @property
+    def root(self) -> GlobTrieState:
+        """The state of the empty path, i.e., of the root of the tree to match."""
+        return (self._root,)
+
+    def step(self, state: GlobTrieState, name: str) -> GlobTrieState:
+        """
+        Advance the given state by a path component.
+
+        Args:
+            state: State of the parent folder.
+            name: Name of the entry in the parent folder.
+
+        Returns:
+            The state of the entry, empty if neither the entry nor its children can
+            match a pattern.
+        """
+        key = name.casefold()
+        nodes: dict[_GlobTrieNode, None] = {}
+        for node in state:
+            if (child := node.literals.get(key)) is not None:
+                nodes[child] = None
+            for wildcard, child in node.wildcards:
+                if wildcard.match(name):
+                    nodes[child] = None
+        return tuple(nodes)
+
+    def accepts(self, state: GlobTrieState) -> bool:
+        """
+        Returns:
+            True if the path of the given state matches one of the patterns.
+        """
+        return any(node.terminal for node in state)
+
+    def accepts_child(self, state: GlobTrieState, name: str) -> bool:
+        """
+        Check if the path of an entry matches one of the patterns, with at most a
+        single regex match per node. This is equivalent to (but faster than)
+        `accepts(step(state, name))`, e.g., for the files of a folder.
+
+        Args:
+            state: State of the parent folder.
+            name: Name of the entry in the parent folder.
+        """
+        key = name.casefold()
+        for node in state:
+            if (child := node.literals.get(key)) is not None and child.terminal:
+                return True
+            if node.final is not None and node.final.match(name) is not None:
+                return True
+        return False
+
+    def match(self, path: str) -> bool:
+        """
+        Check if the given relative path (separated by `/` or `\\`) matches one of
+        the patterns.
+        """
+        state = self.root
+        for name in _GLOB_SEPARATORS.split(path.strip("/\\")):
+            if not (state := self.step(state, name)):
+                return False
+        return self.accepts(state)
+
+
+PatternCategory = Literal["ignore", "unfold", "valid", "delete", "move"]
+
+# Maximum number of names whose classification is kept by each RegexPatterns:
+CLASSIFY_CACHE_SIZE = 4096
+
+
+def _compile_categories(
+    categories: Iterable[tuple[PatternCategory, Iterable[str]]],
+) -> tuple[re.Pattern[str] | None, dict[str, tuple[PatternCategory, int]]]:
+    """
+    Compile the glob patterns of the given categories into a single regex.
+
+    Every pattern has a named group, mapped to its category and its index in the
+    category by the returned dictionary (named groups are used since the regex from
+    `fnmatch.translate` may contain groups of its own). Alternatives are tried in
+    order, so the first matching pattern is the one reported by `match.lastgroup`.
+    """
+    alternatives: list[str] = []
+    groups: dict[str, tuple[PatternCategory, int]] = {}
+    for category, globs in categories:
+        for index, glob in enumerate(globs):
+            name = f"{category}_{index}"
+            alternatives.append(f"(?P<{name}>{fnmatch.translate(glob)})")
+            groups[name] = (category, index)
+
+    if not alternatives:
+        return None, groups
+    return re.compile("|".join(alternatives), re.I), groups
+
+
 class RegexPatterns:
     """
     Regex patterns for validation in `BasicModDataChecker`.
     """
 
+    CATEGORIES: tuple[PatternCategory, ...] = (
+        "ignore",
+        "unfold",
+        "valid",
+        "delete",
+        "move",
+    )
+    """Categories of patterns, in precedence order, see `classify()`."""
+
+    _interned: ClassVar[dict[Hashable, RegexPatterns]] = {}
+    _interned_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @staticmethod
+    def compile(globs: GlobPatterns) -> RegexPatterns:
+        """
+        Retrieve the regex patterns of the given glob patterns. The regex patterns
+        are compiled once per process, and shared by all the checkers using equal
+        glob patterns (including patterns obtained with `GlobPatterns.merge()`).
+
+        Args:
+            globs: Glob patterns to compile.
+
+        Returns:
+            The regex patterns of the given glob patterns.
+        """
+        key = globs.key()
+        with RegexPatterns._interned_lock:
+            patterns = RegexPatterns._interned.get(key)
+            if patterns is None:
+                patterns = RegexPatterns(globs)
+                RegexPatterns._interned[key] = patterns
+        return patterns
+
     def __init__(self, globs: GlobPatterns) -> None:
         self.unfold = OptionalRegexPattern(globs.unfold)
         self.delete = OptionalRegexPattern(globs.delete)
         self.valid = OptionalRegexPattern(globs.valid)
+        self.valid_paths = GlobTrie(globs.valid or [])
 
         self.move = {
             key: re.compile(fnmatch.translate(key), re.I) for key in globs.move
         }
         self.ignore = OptionalRegexPattern(globs.ignore)
 
+        self._move_keys = list(globs.move)
+        self._move_pattern, self._move_groups = _compile_categories(
+            [("move", self._move_keys)]
+        )
+
+        patterns: dict[PatternCategory, Iterable[str]] = {
+            "ignore": globs.ignore or [],
+            "unfold": globs.unfold or [],
+            "valid": globs.valid or [],
+            "delete": globs.delete or [],
+            "move": self._move_keys,
+        }
+        self._pattern, self._groups = _compile_categories(
+            (category, patterns[category]) for category in RegexPatterns.CATEGORIES
+        )
+        self._classify_cached = functools.lru_cache(maxsize=CLASSIFY_CACHE_SIZE)(
+            self._classify
+        )
+
+    def classify(self, value: str) -> tuple[PatternCategory, int] | None:
+        """
+        Find the first pattern matching the given value, in precedence order (see
+        `CATEGORIES`) and then in definition order, with a single regex match.
+
+        Returns:
+            The category of the matching pattern and its index in that category (for
+            move, see `move_key()`), or None if no pattern matches.
+        """
+        # the results are cached since the same names (readme.txt, bin, etc.) are
+        # found in most archives
+        return self._classify_cached(value)
+
+    def _classify(self, value: str) -> tuple[PatternCategory, int] | None:
+        if self._pattern is None or (match := self._pattern.match(value)) is None:
+            return None
+        return self._groups[match.lastgroup]  # type: ignore
+
+    def move_key(self, index: int) -> str:
+        """
+        Retrieve the move pattern (key of `GlobPatterns.move`) at the given index.
+        """
+        return self._move_keys[index]
+
     def move_match(self, value: str) -> str | None:
         """
         Retrieve the first move patterns that matches the given value, or None if no
         move matches.
         """
-        for key, pattern in self.move.items():
-            if pattern.match(value):
-                return key
-        return None
+        if self._move_pattern is None:
+            return None
+        if (match := self._move_pattern.match(value)) is None:
+            return None
+        return self._move_keys[self._move_groups[match.lastgroup][1]]  # type: ignore
 
 
 def _merge_list(l1: list[str] | None, l2: list[str] | None) -> list[str] | None:
@@ -82,6 +325,23 @@ class GlobPatterns:
     move: dict[str, str] = field(default_factory=dict[str, str])
     ignore: list[str] | None = None
 
+    def key(self) -> Hashable:
+        """
+        Returns:
+            A hashable value that is equal for equal glob patterns.
+        """
+
+        def to_tuple(globs: list[str] | None) -> tuple[str, ...] | None:
+            return None if globs is None else tuple(globs)
+
+        return (
+            to_tuple(self.unfold),
+            to_tuple(self.valid),
+            to_tuple(self.delete),
+            tuple(self.move.items()),
+            to_tuple(self.ignore),
+        )
+
     def merge(
         self, other: GlobPatterns, mode: Literal["merge", "replace"] = "replace"
     ) -> GlobPatterns:
@@ -120,12 +380,85 @@ class GlobPatterns:
             )
 
 
+FixActionType = Literal["unfold", "delete", "move"]
+
+
+class FixAction(NamedTuple):
+    """
+    Change made to an entry by `BasicModDataChecker.fix()`.
+    """
+
+    entry: mobase.FileTreeEntry
+    action: FixActionType
+
+    # target path of the entry, for move actions:
+    target: str | None = None
+
+    def __str__(self) -> str:
+        if self.action == "move":
+            return f"move {self.entry.name()} to {self.target}"
+        return f"{self.action} {self.entry.name()}"
+
+
+@dataclass(frozen=True)
+class FixPlan:
+    """
+    Changes made to the top-level entries of a tree by `BasicModDataChecker.fix()`,
+    see `BasicModDataChecker.plan_fix()`.
+    """
+
+    tree: mobase.IFileTree
+    """The tree the plan was computed for."""
+
+    entries: tuple[mobase.FileTreeEntry, ...]
+    """The entries of the tree when the plan was computed."""
+
+    names: tuple[str, ...]
+    """The names of the entries when the plan was computed."""
+
+    actions: tuple[FixAction, ...]
+    """The actions to perform, in order."""
+
+    @staticmethod
+    def create(
+        tree: mobase.IFileTree,
+        entries: Sequence[mobase.FileTreeEntry],
+        actions: Sequence[FixAction],
+    ) -> FixPlan:
+        return FixPlan(
+            tree,
+            tuple(entries),
+            tuple(entry.name() for entry in entries),
+            tuple(actions),
+        )
+
+    def is_current(self, filetree: mobase.IFileTree) -> bool:
+        """
+        Check if the plan applies to the given tree, i.e., if the tree is the one
+        the plan was computed for and its entries were not replaced or renamed
+        since.
+        """
+        if filetree is not self.tree or len(filetree) != len(self.entries):
+            return False
+        return all(
+            entry is planned and entry.name() == name
+            for entry, planned, name in zip(
+                filetree, self.entries, self.names, strict=True
+            )
+        )
+
+    def __str__(self) -> str:
+        return "\n".join(str(action) for action in self.actions) or "nothing to fix"
+
+
 class BasicModDataChecker(mobase.ModDataChecker):
     """Game feature that is used to check and fix the content of a data tree
     via simple file definitions.
 
     The file definitions support glob pattern (without subfolders) and are
-    checked and fixed in definition order of the `file_patterns` dict.
+    checked and fixed in definition order of the `file_patterns` dict. Valid patterns
+    with subfolders can be matched against nested entries by subclasses, see
+    `RegexPatterns.valid_paths`.
 
     Args:
         file_patterns (optional): A GlobPatterns object, with the following attributes:
@@ -166,61 +499,117 @@ class BasicModDataChecker(mobase.ModDataChecker):
     _regex_patterns: RegexPatterns
     """The regex patterns derived from the file (glob) patterns."""
 
+    _fix_plan: FixPlan | None
+    """
+    The fix plan of the last tree checked by `dataLooksValid()`, if it was fixable
+    and not fixed yet.
+    """
+
     def __init__(self, file_patterns: GlobPatterns | None = None):
         super().__init__()
 
         self._file_patterns = file_patterns or GlobPatterns()
-        self._regex_patterns = RegexPatterns(self._file_patterns)
+        self._regex_patterns = RegexPatterns.compile(self._file_patterns)
+        self._fix_plan = None
 
     def dataLooksValid(
         self, filetree: mobase.IFileTree
     ) -> mobase.ModDataChecker.CheckReturn:
         status = mobase.ModDataChecker.INVALID
 
+        # the fix plan is built along the check, since MO2 calls fix() right after
+        # dataLooksValid() on the same tree when the tree is fixable
+        entries: list[mobase.FileTreeEntry] = []
+        actions: list[FixAction] = []
+
         rp = self._regex_patterns
         for entry in filetree:
-            name = entry.name().casefold()
-
-            if rp.ignore.match(name):
-                continue
-            if rp.unfold.match(name):
-                if is_directory(entry):
-                    status = self.dataLooksValid(entry)
-                else:
+            entries.append(entry)
+            match rp.classify(entry.name().casefold()):
+                case ("ignore", _):
+                    continue
+                case ("unfold", _):
+                    if is_directory(entry):
+                        status = self.dataLooksValid(entry)
+                        actions.append(FixAction(entry, "unfold"))
+                    else:
+                        status = mobase.ModDataChecker.INVALID
+                        break
+                case ("valid", _):
+                    if status is mobase.ModDataChecker.INVALID:
+                        status = mobase.ModDataChecker.VALID
+                case ("delete", _):
+                    status = mobase.ModDataChecker.FIXABLE
+                    actions.append(FixAction(entry, "delete"))
+                case ("move", index):
+                    status = mobase.ModDataChecker.FIXABLE
+                    actions.append(FixAction(entry, "move", self._move_target(index)))
+                case _:
                     status = mobase.ModDataChecker.INVALID
                     break
-            elif rp.valid.match(name):
-                if status is mobase.ModDataChecker.INVALID:
-                    status = mobase.ModDataChecker.VALID
-            elif rp.delete.match(name) or rp.move_match(name) is not None:
-                status = mobase.ModDataChecker.FIXABLE
-            else:
-                status = mobase.ModDataChecker.INVALID
-                break
+        else:
+            # only kept for fixable trees, fix() is not called on other trees and the
+            # plan would keep the tree alive
+            if status is mobase.ModDataChecker.FIXABLE:
+                self._fix_plan = FixPlan.create(filetree, entries, actions)
+                return status
+
+        self._fix_plan = None
         return status
 
-    def fix(self, filetree: mobase.IFileTree) -> mobase.IFileTree:
+    def plan_fix(self, filetree: mobase.IFileTree) -> FixPlan:
+        """
+        Compute the changes made to the given tree by `fix()`.
+
+        The plan of the last tree checked by `dataLooksValid()` is reused if the
+        tree did not change since, otherwise the entries are matched again.
+
+        Args:
+            filetree: Tree to fix.
+
+        Returns:
+            The fix plan of the tree.
+        """
+        if self._fix_plan is not None and self._fix_plan.is_current(filetree):
+            return self._fix_plan
+
+        entries = list(filetree)
+        actions: list[FixAction] = []
+
         rp = self._regex_patterns
-        for entry in list(filetree):
-            name = entry.name()
-
-            if rp.ignore.match(name):
-                continue
-            # unfold first - if this match, entry is a directory (checked in
-            # dataLooksValid)
-            if rp.unfold.match(name):
-                assert is_directory(entry)
-                filetree.merge(entry)
-                entry.detach()
-
-            elif rp.valid.match(name):
-                continue
-
-            elif rp.delete.match(name):
-                entry.detach()
-
-            elif (move_key := rp.move_match(name)) is not None:
-                target = self._file_patterns.move[move_key]
-                filetree.move(entry, target)
+        for entry in entries:
+            match rp.classify(entry.name()):
+                case ("unfold", _):
+                    # if this match, entry is a directory (checked in dataLooksValid)
+                    assert is_directory(entry)
+                    actions.append(FixAction(entry, "unfold"))
+                case ("delete", _):
+                    actions.append(FixAction(entry, "delete"))
+                case ("move", index):
+                    actions.append(FixAction(entry, "move", self._move_target(index)))
+                case _:
+                    # ignored, valid or unknown entry
+                    pass
+
+        return FixPlan.create(filetree, entries, actions)
+
+    def _move_target(self, index: int) -> str:
+        return self._file_patterns.move[self._regex_patterns.move_key(index)]
+
+    def fix(self, filetree: mobase.IFileTree) -> mobase.IFileTree:
+        plan = self.plan_fix(filetree)
+        self._fix_plan = None
+
+        for entry, action, target in plan.actions:
+            match action:
+                case "unfold":
+                    assert is_directory(entry)
+                    filetree.merge(entry)
+                    entry.detach()
+                case "delete":
+                    entry.detach()
+                case "move":
+                    assert target is not None
+                    filetree.move(entry, target)
 
         return filetree
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import functools
+import re
 import shutil
 import sys
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Callable, Generic, TypeVar
+from typing import Callable, Generic, TypeVar, cast
 
 from PyQt6.QtCore import QDir, QFileInfo, QStandardPaths
 from PyQt6.QtGui import QIcon
@@ -15,38 +18,156 @@ from .basic_features.basic_save_game_info import (
     BasicGameSaveGame,
     BasicGameSaveGameInfo,
 )
+from .startup_profile import startup_profile
+from .store_registry import ErrorList, StoreRegistry
 
 
 def replace_variables(value: str, game: BasicGame) -> str:
     """Replace special paths in the given value."""
+    return game._variables.expand(value)  # pyright: ignore[reportPrivateUsage]
 
-    if value.find("%DOCUMENTS%") != -1:
-        value = value.replace(
-            "%DOCUMENTS%",
-            QStandardPaths.writableLocation(
+
+@functools.cache
+def _standard_location(location: QStandardPaths.StandardLocation) -> str:
+    return QStandardPaths.writableLocation(location)
+
+
+class BasicGameVariables:
+    """
+    Variables that can be used in the string mappings of a game, e.g. `%GAME_PATH%`.
+
+    Besides the built-in variables, game plugins can declare their own variables with
+    the `GameVariables` attribute, whose values can refer to other variables. Values
+    and expansions are computed on first use and kept until the mappings of the game
+    are invalidated, see `BasicGame.invalidate_mappings()`.
+    """
+
+    def __init__(self, game: BasicGame, variables: Mapping[str, str]):
+        """
+        Args:
+            game: The game the variables belong to.
+            variables: Variables declared by the game plugin, as a mapping from name
+                (without the surrounding %) to value.
+        """
+        self._game = game
+
+        self._resolvers: dict[str, Callable[[], str]] = {
+            "DOCUMENTS": lambda: _standard_location(
                 QStandardPaths.StandardLocation.DocumentsLocation
             ),
-        )
-    if value.find("%USERPROFILE%") != -1:
-        value = value.replace(
-            "%USERPROFILE%",
-            QStandardPaths.writableLocation(
+            "USERPROFILE": lambda: _standard_location(
                 QStandardPaths.StandardLocation.HomeLocation
             ),
+            "GAME_DOCUMENTS": lambda: game.documentsDirectory().absolutePath(),
+            "GAME_PATH": lambda: game.gameDirectory().absolutePath(),
+        }
+        for name, value in variables.items():
+            if name in self._resolvers or not re.fullmatch(r"\w+", name):
+                raise ValueError(
+                    "Basic game plugin from {} has an invalid variable %{}%.".format(
+                        game._fromName,  # pyright: ignore[reportPrivateUsage]
+                        name,
+                    )
+                )
+            self._resolvers[name] = lambda value=value: self.expand(value)
+
+        # Only known variables are matched, so that unknown %...% sequences (e.g.
+        # environment variables) are left untouched:
+        self._pattern = re.compile(
+            "%({})%".format("|".join(map(re.escape, self._resolvers)))
         )
-    if value.find("%GAME_DOCUMENTS%") != -1:
-        value = value.replace(
-            "%GAME_DOCUMENTS%", game.documentsDirectory().absolutePath()
-        )
-    if value.find("%GAME_PATH%") != -1:
-        value = value.replace("%GAME_PATH%", game.gameDirectory().absolutePath())
 
-    return value
+        self._generation = -1
+        self._values: dict[str, str] = {}
+        self._expansions: dict[str, str] = {}
+
+        # Variables currently being resolved, to detect cycles:
+        self._resolving: list[str] = []
+
+    def _sync(self) -> int:
+        generation = self._game._mappings_generation  # pyright: ignore[reportPrivateUsage]
+        if generation != self._generation:
+            self._values.clear()
+            self._expansions.clear()
+            self._generation = generation
+        return generation
+
+    def value(self, name: str) -> str:
+        """
+        Retrieve the value of a variable.
+
+        Args:
+            name: Name of the variable, without the surrounding %.
+
+        Returns:
+            The value of the variable.
+
+        Raises:
+            KeyError: If the variable does not exist.
+            ValueError: If the variable refers to itself, directly or not.
+        """
+        generation = self._sync()
+        if name in self._values:
+            return self._values[name]
+
+        resolver = self._resolvers[name]
+        if name in self._resolving:
+            cycle = self._resolving[self._resolving.index(name) :] + [name]
+            raise ValueError(
+                "Basic game plugin from {} has cyclic variables: {}.".format(
+                    self._game._fromName,  # pyright: ignore[reportPrivateUsage]
+                    " -> ".join(f"%{n}%" for n in cycle),
+                )
+            )
+
+        self._resolving.append(name)
+        try:
+            value = resolver()
+        finally:
+            self._resolving.pop()
+
+        # Do not keep values computed while the mappings were invalidated:
+        if self._generation == generation:
+            self._values[name] = value
+        return value
+
+    def expand(self, value: str) -> str:
+        """
+        Replace the variables in the given value.
+
+        Args:
+            value: The value to expand.
+
+        Returns:
+            The value, with all known variables replaced.
+        """
+        if "%" not in value:
+            return value
+
+        generation = self._sync()
+        if value in self._expansions:
+            return self._expansions[value]
+
+        expanded = self._pattern.sub(lambda m: self.value(m.group(1)), value)
+        if self._generation == generation:
+            self._expansions[value] = expanded
+        return expanded
 
 
 _T = TypeVar("_T")
 
 
+def _copy_value(value: _T) -> _T:
+    """
+    Copy mutable mapping values, so that callers cannot modify cached values.
+    """
+    if isinstance(value, QDir):
+        return QDir(value)  # type: ignore
+    if isinstance(value, list):
+        return list(value)  # type: ignore
+    return value
+
+
 class BasicGameMapping(Generic[_T]):
     # The game:
     _game: "BasicGame"
@@ -66,6 +187,12 @@ class BasicGameMapping(Generic[_T]):
     # Function to apply to the value:
     _apply_fn: Callable[[_T | str], _T] | None
 
+    # Cached value, with the generation of the game mappings it was computed for:
+    _cache: tuple[int, _T] | None
+
+    # Whether the value can be cached (False for defaults probing the filesystem):
+    _cacheable: bool
+
     def __init__(
         self,
         game: BasicGame,
@@ -73,11 +200,14 @@ class BasicGameMapping(Generic[_T]):
         internal_method: str,
         default: Callable[[BasicGame], _T] | None = None,
         apply_fn: Callable[[_T | str], _T] | None = None,
+        cache_default: bool = True,
     ):
         self._game = game
         self._exposed_name = exposed_name
         self._internal_method_name = internal_method
         self._apply_fn = apply_fn
+        self._cache = None
+        self._cacheable = cache_default or hasattr(game, exposed_name)
 
         if hasattr(game, self._exposed_name):
             value = getattr(game, self._exposed_name)
@@ -106,7 +236,21 @@ class BasicGameMapping(Generic[_T]):
             )
 
     def get(self) -> _T:
-        """Return the value of this mapping."""
+        """
+        Return the value of this mapping. The value is computed on first access and
+        kept until the mappings of the game are invalidated, see
+        `BasicGame.invalidate_mappings()`, unless it comes from a default that is
+        not cached (`cache_default=False`).
+        """
+        if not self._cacheable:
+            return self._compute()
+
+        generation = self._game._mappings_generation  # pyright: ignore[reportPrivateUsage]
+        if self._cache is None or self._cache[0] != generation:
+            self._cache = (generation, self._compute())
+        return _copy_value(self._cache[1])
+
+    def _compute(self) -> _T:
         value = self._default(self._game)  # type: ignore
 
         if isinstance(value, str):
@@ -140,6 +284,7 @@ class BasicGameOptionsMapping(BasicGameMapping[list[_T]]):
         super().__init__(game, exposed_name, internal_method, lambda g: [], apply_fn)
         self._index = -1
         self._current_default = default
+        self._current_cache: tuple[int, _T] | None = None
 
     def set_index(self, index: int):
         """
@@ -149,6 +294,7 @@ class BasicGameOptionsMapping(BasicGameMapping[list[_T]]):
             index: Index of the option to use.
         """
         self._index = index
+        self._game.invalidate_mappings()
 
     def set_value(self, value: _T):
         """
@@ -162,6 +308,7 @@ class BasicGameOptionsMapping(BasicGameMapping[list[_T]]):
             self._index = self.get().index(value)
         except ValueError:
             self._index = -1
+        self._game.invalidate_mappings()
 
     def has_value(self) -> bool:
         """
@@ -173,6 +320,17 @@ class BasicGameOptionsMapping(BasicGameMapping[list[_T]]):
         return self._index != -1
 
     def current(self) -> _T:
+        """
+        Return the value of the selected option, or the default value if there are
+        no options. As for `get()`, the value is kept until the mappings of the game
+        are invalidated.
+        """
+        generation = self._game._mappings_generation  # pyright: ignore[reportPrivateUsage]
+        if self._current_cache is None or self._current_cache[0] != generation:
+            self._current_cache = (generation, self._compute_current())
+        return _copy_value(self._current_cache[1])
+
+    def _compute_current(self) -> _T:
         values = self._default(self._game)  # type: ignore
 
         if not values:
@@ -300,6 +458,8 @@ class BasicGameMappings:
             "documentsDirectory",
             apply_fn=lambda s: QDir(s) if isinstance(s, str) else s,
             default=BasicGameMappings._default_documents_directory,
+            # the folder can be created after startup, e.g., by the first launch
+            cache_default=False,
         )
         self.iniFiles = BasicGameMapping(
             game,
@@ -318,6 +478,7 @@ class BasicGameMappings:
             "savesDirectory",
             apply_fn=lambda s: QDir(s) if isinstance(s, str) else s,
             default=lambda g: g.documentsDirectory(),
+            cache_default=False,
         )
         self.savegameExtension = BasicGameMapping(
             game, "GameSaveExtension", "savegameExtension", default=lambda g: "save"
@@ -374,37 +535,64 @@ class BasicGame(mobase.IPluginGame):
     to make it easier to create game plugins without having to implement
     all the methods of mobase.IPluginGame."""
 
-    # List of steam, GOG, origin and Epic games:
-    steam_games: dict[str, Path]
-    gog_games: dict[str, Path]
-    origin_games: dict[str, Path]
-    epic_games: dict[str, Path]
-    eadesktop_games: dict[str, Path]
+    # Registry of the games installed through each store, see setup():
+    stores: StoreRegistry
+
+    # Maximum time (in seconds) to wait for each store when scanning it, stores that
+    # are not listed use store_default_timeout:
+    store_timeouts: dict[str, float] = {}
+    store_default_timeout: float = 15.0
 
     @staticmethod
-    def setup():
-        from .eadesktop_utils import find_games as find_eadesktop_games
-        from .epic_utils import find_games as find_epic_games
-        from .gog_utils import find_games as find_gog_games
-        from .origin_utils import find_games as find_origin_games
-        from .steam_utils import find_games as find_steam_games
-
-        errors: list[tuple[str, Exception]] = []
-        BasicGame.steam_games = find_steam_games()
-        BasicGame.gog_games = find_gog_games()
-        BasicGame.origin_games = find_origin_games()
-        BasicGame.epic_games = find_epic_games(errors)
-        BasicGame.eadesktop_games = find_eadesktop_games(errors)
-
-        if errors:
-            QMessageBox.critical(
-                None,
-                "Errors loading game list",
-                (
-                    "The following errors occurred while loading the list of available games:\n"
-                    f"\n- {'\n\n- '.join('\n '.join(str(e) for e in messageError) for messageError in errors)}"
-                ),
-            )
+    def setup(timeouts: Mapping[str, float] | None = None, rescan: bool = False):
+        """
+        Register the supported stores. Stores are not scanned here but the first time
+        the games of a store are needed (see `BasicGame.stores`), stores scanned
+        together are scanned concurrently, and stores that do not answer in time are
+        reported as errors.
+
+        Results are cached on disk and a store is only scanned again if one of the
+        files or folders read during the previous scan changed.
+
+        Other stores can be registered afterwards with `BasicGame.stores.register()`,
+        the IDs of the games for these stores must be available in `BasicGameMappings`
+        (see `StoreProvider.mapping`).
+
+        Args:
+            timeouts (optional): Maximum time (in seconds) to wait for each store,
+                overriding `BasicGame.store_timeouts`.
+            rescan (optional): If True, ignore cached results and scan all stores.
+        """
+        from .eadesktop_utils import EaDesktopStore
+        from .epic_utils import EpicGamesStore
+        from .gog_utils import GogStore
+        from .origin_utils import OriginStore
+        from .steam_utils import SteamStore
+
+        timeouts = BasicGame.store_timeouts | dict(timeouts or {})
+
+        BasicGame.stores = StoreRegistry(
+            BasicGame.store_default_timeout, BasicGame._show_store_errors
+        )
+        for provider in (
+            SteamStore(rescan),
+            GogStore(),
+            OriginStore(rescan),
+            EpicGamesStore(rescan),
+            EaDesktopStore(rescan),
+        ):
+            BasicGame.stores.register(provider, timeouts.get(provider.name))
+
+    @staticmethod
+    def _show_store_errors(errors: ErrorList):
+        QMessageBox.critical(
+            None,
+            "Errors loading game list",
+            (
+                "The following errors occurred while loading the list of available games:\n"
+                f"\n- {'\n\n- '.join('\n '.join(str(e) for e in messageError) for messageError in errors)}"
+            ),
+        )
 
     # File containing the plugin:
     _fromName: str
@@ -422,26 +610,78 @@ class BasicGame(mobase.IPluginGame):
             self._fromName = self.__class__.__name__
 
         self._gamePath = ""
+        self._store_ids_resolved = True
+        self._mappings_generation = 0
 
-        self._mappings: BasicGameMappings = BasicGameMappings(self)
+        self._variables = BasicGameVariables(self, getattr(self, "GameVariables", {}))
+
+        with startup_profile.measure("mappings", self._fromName):
+            self._mappings: BasicGameMappings = BasicGameMappings(self)
+
+    def invalidate_mappings(self):
+        """
+        Discard the cached values of the game mappings, so that they are computed
+        again on next access. This is done automatically when the game path, the
+        selected store IDs or the settings of the plugin change.
+        """
+        self._mappings_generation += 1
+
+    def _on_plugin_setting_changed(
+        self, plugin_name: str, key: str, old: mobase.MoVariant, new: mobase.MoVariant
+    ):
+        if plugin_name == self.name():
+            self.invalidate_mappings()
 
     def _register_feature(self, feature: mobase.GameFeature) -> bool:
         return self._organizer.gameFeatures().registerFeature(self, feature, 0, True)
 
+    def _store_mappings(self) -> dict[str, BasicGameOptionsMapping[str]]:
+        return {
+            provider.name: cast(
+                BasicGameOptionsMapping[str], getattr(self._mappings, provider.mapping)
+            )
+            for provider in BasicGame.stores.providers()
+        }
+
+    def _resolve_store_ids(self):
+        """
+        Find the store IDs matching the current game path. This is done on first use
+        rather than in setGamePath(), so that stores are only scanned if needed.
+        """
+        if self._store_ids_resolved:
+            return
+        self._store_ids_resolved = True
+
+        if not self._gamePath:
+            return
+
+        mappings = self._store_mappings()
+        found = BasicGame.stores.find_path(
+            self._gamePath,
+            {store: mapping.get() for store, mapping in mappings.items()},
+        )
+        for store, store_id in found.items():
+            mappings[store].set_value(store_id)
+
     # Specific to BasicGame:
     def is_steam(self) -> bool:
+        self._resolve_store_ids()
         return self._mappings.steamAPPId.has_value()
 
     def is_gog(self) -> bool:
+        self._resolve_store_ids()
         return self._mappings.gogAPPId.has_value()
 
     def is_origin(self) -> bool:
+        self._resolve_store_ids()
         return self._mappings.originManifestIds.has_value()
 
     def is_epic(self) -> bool:
+        self._resolve_store_ids()
         return self._mappings.epicAPPId.has_value()
 
     def is_eadesktop(self) -> bool:
+        self._resolve_store_ids()
         return self._mappings.eaDesktopContentId.has_value()
 
     # IPlugin interface:
@@ -449,8 +689,12 @@ class BasicGame(mobase.IPluginGame):
     def init(self, organizer: mobase.IOrganizer) -> bool:
         self._organizer = organizer
 
+        startup_profile.set_logs_directory(Path(organizer.basePath(), "logs"))
+
         self._register_feature(BasicGameSaveGameInfo())
 
+        self._organizer.onPluginSettingChanged(self._on_plugin_setting_changed)
+
         if self._mappings.originWatcherExecutables.get():
             from .origin_utils import OriginWatcher
 
@@ -494,30 +738,12 @@ class BasicGame(mobase.IPluginGame):
     # IPluginGame interface:
 
     def detectGame(self):
-        for steam_id in self._mappings.steamAPPId.get():
-            if steam_id in BasicGame.steam_games:
-                self.setGamePath(BasicGame.steam_games[steam_id])
-                return
-
-        for gog_id in self._mappings.gogAPPId.get():
-            if gog_id in BasicGame.gog_games:
-                self.setGamePath(BasicGame.gog_games[gog_id])
-                return
-
-        for origin_manifest_id in self._mappings.originManifestIds.get():
-            if origin_manifest_id in BasicGame.origin_games:
-                self.setGamePath(BasicGame.origin_games[origin_manifest_id])
-                return
-
-        for epic_id in self._mappings.epicAPPId.get():
-            if epic_id in BasicGame.epic_games:
-                self.setGamePath(BasicGame.epic_games[epic_id])
-                return
-
-        for eadesktop_content_id in self._mappings.eaDesktopContentId.get():
-            if eadesktop_content_id in BasicGame.eadesktop_games:
-                self.setGamePath(BasicGame.eadesktop_games[eadesktop_content_id])
-                return
+        # all the stores for which the game has IDs are scanned at once:
+        found = BasicGame.stores.find_game(
+            {store: mapping.get() for store, mapping in self._store_mappings().items()}
+        )
+        if found is not None:
+            self.setGamePath(found[2])
 
     def gameName(self) -> str:
         return self._mappings.gameName.get()
@@ -546,15 +772,19 @@ class BasicGame(mobase.IPluginGame):
         return self._mappings.nexusGameId.get()
 
     def steamAPPId(self) -> str:
+        self._resolve_store_ids()
         return self._mappings.steamAPPId.current()
 
     def gogAPPId(self) -> str:
+        self._resolve_store_ids()
         return self._mappings.gogAPPId.current()
 
     def epicAPPId(self) -> str:
+        self._resolve_store_ids()
         return self._mappings.epicAPPId.current()
 
     def eaDesktopContentId(self) -> str:
+        self._resolve_store_ids()
         return self._mappings.eaDesktopContentId.current()
 
     def binaryName(self) -> str:
@@ -640,26 +870,11 @@ class BasicGame(mobase.IPluginGame):
 
     def setGamePath(self, path: Path | str) -> None:
         self._gamePath = str(path)
+        self.invalidate_mappings()
 
-        path = Path(path)
-
-        # Check if we have a matching steam, GOG, Origin or EA Desktop id and set the
-        # index accordingly:
-        for steamid, steampath in BasicGame.steam_games.items():
-            if steampath == path:
-                self._mappings.steamAPPId.set_value(steamid)
-        for gogid, gogpath in BasicGame.gog_games.items():
-            if gogpath == path:
-                self._mappings.gogAPPId.set_value(gogid)
-        for originid, originpath in BasicGame.origin_games.items():
-            if originpath == path:
-                self._mappings.originManifestIds.set_value(originid)
-        for epicid, epicpath in BasicGame.epic_games.items():
-            if epicpath == path:
-                self._mappings.epicAPPId.set_value(epicid)
-        for eadesktopid, eadesktoppath in BasicGame.eadesktop_games.items():
-            if eadesktoppath == path:
-                self._mappings.eaDesktopContentId.set_value(eadesktopid)
+        # The matching steam, GOG, Origin, Epic or EA Desktop ids are resolved on first
+        # use, so that opening an instance does not require scanning the stores:
+        self._store_ids_resolved = False
 
     def documentsDirectory(self) -> QDir:
         return self._mappings.documentsDirectory.get()
@@ -2,22 +2,32 @@
 
 import configparser
 import os
+from collections.abc import Mapping
 
 from .basic_game import BasicGame
 
 
 class BasicIniGame(BasicGame):
-    def __init__(self, path: str):
+    def __init__(self, path: str, attributes: Mapping[str, str] | None = None):
+        """
+        Args:
+            path: Path to the INI file defining the game.
+            attributes (optional): Values of the DEFAULT section of the file, as
+                compiled by `plugin_manifest.load_ini_games()`. If not given, the file
+                is read.
+        """
         # Set the _fromName to get more "correct" errors:
         self._fromName = os.path.basename(path)
 
         # Read the file:
-        config = configparser.ConfigParser()
-        config.optionxform = str  # type: ignore
-        config.read(path)
+        if attributes is None:
+            config = configparser.ConfigParser()
+            config.optionxform = str  # type: ignore
+            config.read(path)
+            attributes = config["DEFAULT"]
 
         # Just fill the class with values:
-        for k, v in config["DEFAULT"].items():
+        for k, v in attributes.items():
             setattr(self, k, v)
 
         super().__init__()
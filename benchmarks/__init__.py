@@ -0,0 +1,34 @@
+# -*- encoding: utf-8 -*-
+
+"""
+Benchmarks for the basic games plugin, runnable outside of MO2.
+
+Benchmarks are run from the root of the repository, e.g.:
+
+    python -m benchmarks.startup --runs 5
+"""
+
+from __future__ import annotations
+
+import importlib
+import sys
+import types
+from pathlib import Path
+
+PACKAGE_NAME = "basic_games"
+REPOSITORY = Path(__file__).parent.parent
+
+
+def import_plugin_module(name: str, repository: Path = REPOSITORY) -> types.ModuleType:
+    """
+    Import a module of the plugin (e.g. `steam_utils`) without running the plugin
+    `__init__`, which creates all the game plugins.
+
+    The stub `mobase` and fake `winreg` modules must be installed first if the module
+    requires them.
+    """
+    if PACKAGE_NAME not in sys.modules:
+        package = types.ModuleType(PACKAGE_NAME)
+        package.__path__ = [str(repository)]
+        sys.modules[PACKAGE_NAME] = package
+    return importlib.import_module(f"{PACKAGE_NAME}.{name}")
@@ -0,0 +1,91 @@
+# -*- encoding: utf-8 -*-
+
+"""
+Benchmark of the Steam application manifest reader.
+
+Compares the targeted extraction of `AppState.appid` and `AppState.installdir` used
+by the Steam utilities with a full `vdf` parse, on generated manifests shaped like
+the ones written by Steam, and checks that both return the same values.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from collections.abc import Callable
+from typing import Any, cast
+
+import vdf  # pyright: ignore[reportMissingTypeStubs]
+
+from . import fake_winreg, import_plugin_module
+from .fixtures import steam_app_manifest
+
+
+def _vdf_fields(text: str) -> tuple[str, str] | None:
+    try:
+        app_state = cast(
+            dict[str, str],
+            vdf.loads(text)["AppState"],  # pyright: ignore[reportUnknownMemberType]
+        )
+        return app_state["appid"], app_state["installdir"]
+    except (KeyError, SyntaxError):
+        return None
+
+
+def _corpus(count: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    texts = [
+        steam_app_manifest(100 + i * 10, f"Steam Game {i}", rng) for i in range(count)
+    ]
+
+    # less common but valid manifests, which must give the same result as vdf:
+    texts.append(texts[0].replace('"appid"', '// comment\n\t"appid"'))
+    texts.append(texts[0].replace("Steam Game 0", 'Steam \\"Game\\" \\\\ 0'))
+    texts.append("\ufeff" + texts[0])
+    return texts
+
+
+def _measure(fn: Callable[[str], Any], texts: list[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Steam manifest reader benchmark.")
+    parser.add_argument("--manifests", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    # steam_utils imports winreg, which only exists on Windows:
+    fake_winreg.install(fake_winreg.FakeRegistry())
+    extract_app_state = import_plugin_module("steam_utils")._extract_app_state
+
+    texts = _corpus(args.manifests, args.seed)
+
+    mismatches = [
+        i
+        for i, text in enumerate(texts)
+        if extract_app_state(text) != _vdf_fields(text)
+    ]
+    if mismatches:
+        print(f"Mismatching results for manifests {mismatches}", file=sys.stderr)
+        return 1
+
+    full = _measure(_vdf_fields, texts, args.repeat)
+    targeted = _measure(extract_app_state, texts, args.repeat)
+    print(f"{len(texts)} manifests (best of {args.repeat}):")
+    print(f"  vdf       {full * 1000:9.1f}ms")
+    print(f"  targeted  {targeted * 1000:9.1f}ms ({full / targeted:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
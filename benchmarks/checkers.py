@@ -0,0 +1,358 @@
+# -*- encoding: utf-8 -*-
+
+"""
+Benchmark and regression check of the mod data checkers restructuring archives
+(Payday, Unreal Engine games, Titanfall 2, etc., see `CHECKERS`).
+
+Large archives with the layouts handled by each checker are generated (by default
+with 20k files) and `dataLooksValid()` and `fix()` are run on an in-memory file tree
+(see `fake_filetree.py`). For each game and layout, the benchmark reports:
+
+  - the wall time,
+  - the entries visited (listed or accessed by index), the path lookups and the moves
+    made on the tree,
+  - a digest of the fixed layout, so that changes to the checkers can be checked to
+    produce the same layouts.
+
+Results can be saved with `--save` and compared to a previous run with `--baseline`,
+in which case the benchmark fails if a layout changes, if a checker visits more
+entries or makes more lookups, or is slower than the given tolerance, e.g.:
+
+    python -m benchmarks.checkers --save baseline.json
+    python -m benchmarks.checkers --baseline baseline.json --tolerance 0.25
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from . import REPOSITORY, import_plugin_module, stub_mobase
+
+# Archive layouts, as functions returning the paths of the archive files, given
+# the number of files of the archive:
+Layout = Callable[[int], list[str]]
+
+
+def _payload(count: int, prefix: str = "", suffix: str = "dat") -> list[str]:
+    return [f"{prefix}data/folder{i % 100}/file{i}.{suffix}" for i in range(count)]
+
+
+def _loose(count: int) -> list[str]:
+    suffixes = ("pak", "utoc", "ucas", "bk2", "dll", "txt")
+    return [f"mod{i}.{suffixes[i % len(suffixes)]}" for i in range(count)]
+
+
+def _folders(count: int, marker: str, folders: int = 200) -> list[str]:
+    # many top-level folders, the marker is in the last one
+    return [f"folder{i % folders}/file{i}.dat" for i in range(count)] + [
+        f"folder{folders - 1}/{marker}"
+    ]
+
+
+def _marker(name: str, prefix: str = "") -> Layout:
+    return lambda count: [prefix + name] + _payload(count, prefix)
+
+
+def _prefixed(prefix: str, suffix: str = "dat") -> Layout:
+    return lambda count: _payload(count, prefix, suffix)
+
+
+PAYDAY_LAYOUTS: dict[str, Layout] = {
+    "mod.txt": _marker("mod.txt"),
+    "wrapped mod.txt": _marker("mod.txt", "MyMod/"),
+    "main.xml with levels": lambda count: ["main.xml", "levels/level.xml"]
+    + _payload(count),
+    "wrapped main.xml": _marker("main.xml", "MyMod/"),
+    "double-wrapped mod.txt": _marker("mod.txt", "MyMod/MyMod/"),
+}
+
+UNREAL_LAYOUTS: dict[str, Layout] = {
+    "loose paks": _loose,
+    "UE4SS": _marker("UE4SS.dll"),
+    "UE4SS scripts": _prefixed("Scripts/", "lua"),
+}
+
+# Checkers by game: module, checker class and game class.
+CHECKERS: dict[str, tuple[str, str, str, dict[str, Layout]]] = {
+    "Payday 1": (
+        "game_payday1",
+        "Payday1ModDataChecker",
+        "Payday1Game",
+        PAYDAY_LAYOUTS,
+    ),
+    "Payday 2": (
+        "game_payday2",
+        "Payday2ModDataChecker",
+        "Payday2Game",
+        PAYDAY_LAYOUTS,
+    ),
+    "Payday 3": (
+        "game_payday3",
+        "Payday3ModDataChecker",
+        "Payday3Game",
+        UNREAL_LAYOUTS,
+    ),
+    "RAID WW2": (
+        "game_raid2",
+        "RaidWW2ModDataChecker",
+        "RaidWW2Game",
+        {"mod": _payload, "many folders": lambda count: _folders(count, "mod.txt")},
+    ),
+    "Crime Boss": (
+        "game_crimeboss",
+        "CrimeBossModDataChecker",
+        "CrimeBossGame",
+        UNREAL_LAYOUTS
+        | {
+            "native mod": _prefixed("Content/"),
+            "wrapped native mod": _prefixed("MyMod/Content/"),
+        },
+    ),
+    "Silent Hill 2": (
+        "game_silenthill2remake",
+        "SilentHill2ModDataChecker",
+        "SilentHill2Game",
+        UNREAL_LAYOUTS,
+    ),
+    "Pacific Drive": (
+        "game_pacificdrive",
+        "PacificDriveModDataChecker",
+        "PacificDriveGame",
+        UNREAL_LAYOUTS,
+    ),
+    "Walking Dead": (
+        "game_ovkwalkingdead",
+        "OTWDModDataChecker",
+        "OTWDGame",
+        UNREAL_LAYOUTS,
+    ),
+    "Titanfall 2": (
+        "game_titanfall2",
+        "Titanfall2ModDataChecker",
+        "Titanfall2Game",
+        {
+            "mod.json": _marker("mod.json"),
+            "wrapped mod.json": _marker("mod.json", "MyMod/"),
+            "many folders": lambda count: _folders(count, "mod.json"),
+        },
+    ),
+    "Hitman 3": (
+        "game_hitman3",
+        "Hitman3ModDataChecker",
+        "Hitman3Game",
+        {
+            "manifest.json": _marker("manifest.json"),
+            "wrapped manifest.json": _marker("manifest.json", "MyMod/"),
+        },
+    ),
+    "Noita": (
+        "game_noita",
+        "NoitaModDataChecker",
+        "NoitaGame",
+        {
+            "mod.xml": _marker("mod.xml"),
+            "wrapped mod.xml": _marker("mod.xml", "MyMod/"),
+            "many folders": lambda count: _folders(count, "mod.xml"),
+        },
+    ),
+    "Zuma Deluxe": (
+        "game_zuma_deluxe",
+        "ZumaModDataChecker",
+        "ZumaGame",
+        {
+            "map.txt": _marker("map.txt"),
+            "wrapped map.txt": _marker("map.txt", "MyLevel/"),
+            "level folders": _prefixed("MyLevels/images/"),
+            "many folders": lambda count: _folders(count, "levels/"),
+        },
+    ),
+}
+
+# Counters compared exactly against the baseline, other values use the tolerance:
+EXACT_COUNTERS = ("visits", "lookups")
+
+
+class _Organizer:
+    """
+    Organizer with the methods used by the checkers. The managed game is the game
+    class, since the checkers only read class attributes.
+    """
+
+    def __init__(self, game: type, mods_path: str):
+        self._game = game
+        self._mods_path = mods_path
+
+    def managedGame(self) -> type:
+        return self._game
+
+    def modList(self) -> _Organizer:
+        return self
+
+    def onModInstalled(self, callback: Callable[..., Any]) -> bool:
+        return True
+
+    def modsPath(self) -> str:
+        return self._mods_path
+
+
+def _measure(checker: Any, paths: list[str], fake_filetree: Any) -> dict[str, Any]:
+    tree = fake_filetree.MemoryFileTree.build(paths)
+
+    start = time.perf_counter()
+    status = checker.dataLooksValid(tree)
+    fixed = checker.fix(tree)
+    seconds = time.perf_counter() - start
+
+    layout = "\n".join(fixed.files()) if fixed is not None else "<not fixed>"
+    return {
+        "seconds": seconds,
+        "visits": tree.counters["visits"],
+        "lookups": tree.counters["lookups"],
+        "moves": tree.counters["moves"],
+        "status": str(getattr(status, "__name__", status)),
+        "layout": hashlib.sha1(layout.encode("utf-8")).hexdigest()[:12],
+    }
+
+
+def run(
+    repository: Path, files: int, runs: int, games: list[str] | None
+) -> tuple[dict[str, dict[str, dict[str, Any]]], list[str]]:
+    """
+    Run the checkers on the generated archives.
+
+    Returns:
+        The results, by game and layout (fastest run), and the list of failures
+        (checkers raising an exception).
+    """
+    stub_mobase.install()
+    from . import fake_filetree
+
+    results: dict[str, dict[str, dict[str, Any]]] = {}
+    failures: list[str] = []
+    with tempfile.TemporaryDirectory(prefix="basic_games_checkers_") as mods_path:
+        for game, (module_name, checker_name, game_name, layouts) in CHECKERS.items():
+            if games and game not in games:
+                continue
+            module = import_plugin_module(f"games.{module_name}", repository)
+            organizer = _Organizer(getattr(module, game_name), mods_path)
+
+            results[game] = {}
+            for name, layout in layouts.items():
+                paths = layout(files)
+                try:
+                    samples = [
+                        _measure(
+                            getattr(module, checker_name)(organizer),
+                            paths,
+                            fake_filetree,
+                        )
+                        for _ in range(runs)
+                    ]
+                except Exception as e:
+                    failures.append(f"{game} ({name}): {e!r}")
+                    continue
+                results[game][name] = min(samples, key=lambda values: values["seconds"])
+
+    return results, failures
+
+
+def compare(
+    results: dict[str, dict[str, dict[str, Any]]],
+    baseline: dict[str, dict[str, dict[str, Any]]],
+    tolerance: float,
+) -> list[str]:
+    """
+    Returns:
+        The regressions of the results compared to the baseline.
+    """
+    regressions: list[str] = []
+    for game, layouts in baseline.items():
+        for name, previous in layouts.items():
+            current = results.get(game, {}).get(name)
+            if current is None:
+                continue
+            if current["layout"] != previous["layout"]:
+                regressions.append(f"{game} ({name}): fixed layout changed")
+            for key in ("seconds", *EXACT_COUNTERS):
+                limit = previous[key] * (1 if key in EXACT_COUNTERS else 1 + tolerance)
+                if current[key] > limit:
+                    regressions.append(
+                        f"{game} ({name}): {key} {current[key]:g} > {previous[key]:g}"
+                    )
+    return regressions
+
+
+def _print(results: dict[str, dict[str, dict[str, Any]]]) -> None:
+    print(
+        f"{'game':14} {'layout':22} {'time':>10} {'visits':>8} {'lookups':>8}"
+        f" {'moves':>7}  layout"
+    )
+    for game, layouts in results.items():
+        for name, values in layouts.items():
+            print(
+                f"{game:14} {name:22} {values['seconds'] * 1000:8.2f}ms"
+                f" {values['visits']:8} {values['lookups']:8} {values['moves']:7}"
+                f"  {values['layout']}"
+            )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Mod data checkers benchmark.")
+    parser.add_argument(
+        "--repository",
+        type=Path,
+        default=REPOSITORY,
+        help="path to the basic games plugin to benchmark",
+    )
+    parser.add_argument("--runs", type=int, default=3, help="number of timed runs")
+    parser.add_argument(
+        "--files", type=int, default=20000, help="number of files of the archives"
+    )
+    parser.add_argument(
+        "--game", action="append", choices=list(CHECKERS), help="games to run"
+    )
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--save", type=Path, help="save the results to this file")
+    parser.add_argument(
+        "--baseline", type=Path, help="fail on regressions compared to this file"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed relative increase of time (default: 0.25)",
+    )
+    args = parser.parse_args(argv)
+
+    results, failures = run(args.repository.resolve(), args.files, args.runs, args.game)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print(results)
+
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        failures += compare(
+            results,
+            json.loads(args.baseline.read_text(encoding="utf-8")),
+            args.tolerance,
+        )
+
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+# -*- encoding: utf-8 -*-
+
+"""
+In-memory filesystem, to run the store utilities without touching the disk, see
+`fs_utils.detection_pass()`.
+
+The filesystem implements the interface of `fs_utils.FileSystem`, the plugin modules
+are not typed from here.
+"""
+
+from __future__ import annotations
+
+import errno
+import io
+import os
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from . import import_plugin_module
+
+fs_utils: Any = import_plugin_module("fs_utils")
+
+
+def _key(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+class MemoryFileSystem:
+    def __init__(self):
+        self._files: dict[str, tuple[bytes, int]] = {}
+        self._folders: dict[str, dict[str, str]] = {}
+        self._folder_mtimes: dict[str, int] = {}
+        self._clock = 0
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def _add_folder(self, path: str) -> None:
+        key = _key(path)
+        if key in self._folders:
+            return
+        parent = os.path.dirname(os.path.normpath(path))
+        self._folders[key] = {}
+        self._folder_mtimes[key] = self._tick()
+        if parent and _key(parent) != key:
+            self._add_folder(parent)
+            self._folders[_key(parent)][key] = os.path.basename(path)
+            self._folder_mtimes[_key(parent)] = self._tick()
+
+    def write(self, path: Path | str, content: bytes | str) -> None:
+        """
+        Create or replace a file, creating its parent folders if needed.
+        """
+        path = os.path.normpath(str(path))
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+
+        parent = os.path.dirname(path)
+        self._add_folder(parent)
+        if (key := _key(path)) not in self._files:
+            self._folders[_key(parent)][key] = os.path.basename(path)
+            self._folder_mtimes[_key(parent)] = self._tick()
+        self._files[key] = (content, self._tick())
+
+    def copy_tree(self, root: Path) -> None:
+        """
+        Copy the files of the given folder (and its subfolders) from the disk.
+        """
+        for folder, dirnames, filenames in os.walk(root):
+            self._add_folder(folder)
+            for dirname in dirnames:
+                self._add_folder(os.path.join(folder, dirname))
+            for filename in filenames:
+                filepath = os.path.join(folder, filename)
+                with open(filepath, "rb") as fp:
+                    self.write(filepath, fp.read())
+
+    def stat(self, path: str) -> Any:
+        key = _key(path)
+        if key in self._files:
+            content, mtime_ns = self._files[key]
+            return fs_utils.FileStat(mtime_ns, len(content), False)
+        if key in self._folders:
+            return fs_utils.FileStat(
+                self._folder_mtimes[key], len(self._folders[key]), True
+            )
+        raise FileNotFoundError(errno.ENOENT, "No such file or directory", path)
+
+    def scandir(self, path: str) -> list[Any]:
+        key = _key(path)
+        if key in self._files:
+            raise NotADirectoryError(errno.ENOTDIR, "Not a directory", path)
+        if key not in self._folders:
+            raise FileNotFoundError(errno.ENOENT, "No such file or directory", path)
+        return [
+            fs_utils.FileEntry(name, child in self._folders)
+            for child, name in self._folders[key].items()
+        ]
+
+    def open(self, path: str) -> BinaryIO:
+        key = _key(path)
+        if key not in self._files:
+            self.stat(path)
+            raise IsADirectoryError(errno.EISDIR, "Is a directory", path)
+        return io.BytesIO(self._files[key][0])
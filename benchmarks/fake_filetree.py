@@ -0,0 +1,244 @@
+# -*- encoding: utf-8 -*-
+
+"""
+In-memory implementation of the `mobase.IFileTree` methods used by the mod data
+checkers, to run the checkers on generated archives.
+
+The stub `mobase` module must be installed before this module is imported. Calls are
+counted on the root tree (see `MemoryFileTree.counters`), so that benchmarks can
+compare how much of the tree the checkers visit.
+"""
+
+from __future__ import annotations
+
+import importlib
+import re
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+# the stub module is not typed from here
+mobase: Any = importlib.import_module("mobase")
+
+_SEPARATORS = re.compile(r"[/\\]")
+
+
+class MemoryFileEntry(mobase.FileTreeEntry):
+    def __init__(self, name: str, parent: MemoryFileTree | None = None):
+        self._name = name
+        self._parent = parent
+
+    def name(self) -> str:
+        return self._name
+
+    def suffix(self) -> str:
+        return self._name.rsplit(".", 1)[1] if "." in self._name else ""
+
+    def hasSuffix(self, suffix: str) -> bool:
+        return self.suffix().casefold() == suffix.casefold()
+
+    def isDir(self) -> bool:
+        return False
+
+    def isFile(self) -> bool:
+        return not self.isDir()
+
+    def parent(self) -> MemoryFileTree | None:
+        return self._parent
+
+    def path(self, sep: str = "\\") -> str:
+        names: list[str] = []
+        entry: MemoryFileEntry = self
+        while entry._parent is not None:
+            names.append(entry._name)
+            entry = entry._parent
+        return sep.join(reversed(names))
+
+    def pathFrom(self, tree: MemoryFileTree, sep: str = "\\") -> str:
+        names: list[str] = []
+        entry: MemoryFileEntry | None = self
+        while entry is not None and entry is not tree:
+            names.append(entry._name)
+            entry = entry._parent
+        return sep.join(reversed(names))
+
+    def detach(self) -> bool:
+        if self._parent is None:
+            return False
+        return self._parent.remove(self)
+
+    def _root(self) -> MemoryFileTree:
+        entry: MemoryFileEntry = self
+        while entry._parent is not None:
+            entry = entry._parent
+        assert isinstance(entry, MemoryFileTree)
+        return entry
+
+    def _count(self, operation: str, count: int = 1) -> None:
+        self._root().counters[operation] += count
+
+
+class MemoryFileTree(MemoryFileEntry, mobase.IFileTree):
+    def __init__(self, name: str = "", parent: MemoryFileTree | None = None):
+        super().__init__(name, parent)
+        self._children: dict[str, MemoryFileEntry] = {}
+
+        # calls made on the tree and its subtrees, for root trees:
+        self.counters: Counter[str] = Counter()
+
+    @staticmethod
+    def build(paths: Iterable[str]) -> MemoryFileTree:
+        """
+        Create a tree from the paths of its files. Paths ending with a separator are
+        created as (empty) folders.
+        """
+        tree = MemoryFileTree()
+        for path in paths:
+            *folders, name = _SEPARATORS.split(path)
+            parent = tree
+            for folder in folders:
+                parent = parent._add_directory(folder)
+            if name:
+                parent._add_child(MemoryFileEntry(name))
+        return tree
+
+    def isDir(self) -> bool:
+        return True
+
+    def files(self) -> list[str]:
+        """
+        Returns:
+            The sorted paths of the files and empty folders of the tree, separated by
+            `/`, to compare layouts.
+        """
+        paths: list[str] = []
+        for entry in self._children.values():
+            if isinstance(entry, MemoryFileTree):
+                subpaths = entry.files()
+                paths.extend(f"{entry._name}/{path}" for path in subpaths or [""])
+            else:
+                paths.append(entry._name)
+        return sorted(paths)
+
+    # internal methods, not counted
+
+    def _add_child(self, entry: MemoryFileEntry) -> None:
+        entry._parent = self
+        self._children[entry._name.casefold()] = entry
+
+    def _remove_child(self, entry: MemoryFileEntry) -> None:
+        del self._children[entry._name.casefold()]
+        entry._parent = None
+
+    def _add_directory(self, name: str) -> MemoryFileTree:
+        child = self._children.get(name.casefold())
+        if not isinstance(child, MemoryFileTree):
+            child = MemoryFileTree(name)
+            self._add_child(child)
+        return child
+
+    def _resolve(self, path: str) -> MemoryFileEntry | None:
+        entry: MemoryFileEntry = self
+        for name in _SEPARATORS.split(path.strip("/\\")):
+            if not name:
+                continue
+            if not isinstance(entry, MemoryFileTree):
+                return None
+            child = entry._children.get(name.casefold())
+            if child is None:
+                return None
+            entry = child
+        return entry
+
+    def _insert(self, entry: MemoryFileEntry, policy: Any) -> None:
+        existing = self._children.get(entry._name.casefold())
+        if existing is None:
+            self._add_child(entry)
+        elif (
+            policy is mobase.IFileTree.MERGE
+            and isinstance(existing, MemoryFileTree)
+            and isinstance(entry, MemoryFileTree)
+        ):
+            for child in list(entry._children.values()):
+                entry._remove_child(child)
+                existing._insert(child, policy)
+        else:
+            self._remove_child(existing)
+            self._add_child(entry)
+
+    # IFileTree methods
+
+    def __iter__(self) -> Iterator[MemoryFileEntry]:
+        self._count("visits", len(self._children))
+        return iter(list(self._children.values()))
+
+    def __len__(self) -> int:
+        return len(self._children)
+
+    def __getitem__(self, index: int) -> MemoryFileEntry:
+        self._count("visits")
+        return list(self._children.values())[index]
+
+    def exists(self, path: str, type: Any = None) -> bool:
+        self._count("lookups")
+        entry = self._resolve(path)
+        if entry is None:
+            return False
+        if type is mobase.IFileTree.FILE:
+            return not entry.isDir()
+        if type is mobase.IFileTree.DIRECTORY:
+            return entry.isDir()
+        return True
+
+    def find(self, path: str, type: Any = None) -> MemoryFileEntry | None:
+        self._count("lookups")
+        entry = self._resolve(path)
+        if entry is None or (type is mobase.IFileTree.DIRECTORY and not entry.isDir()):
+            return None
+        return entry
+
+    def createOrphanTree(self, name: str = "") -> MemoryFileTree:
+        return MemoryFileTree(name)
+
+    def move(self, entry: MemoryFileEntry, path: str, policy: Any = None) -> bool:
+        self._count("moves")
+        if path == "" or path[-1] in "/\\":
+            folder, name = path, entry._name
+        else:
+            *folders, name = _SEPARATORS.split(path)
+            folder = "/".join(folders)
+
+        # entries cannot be moved into themselves
+        target: MemoryFileTree = self
+        for part in _SEPARATORS.split(folder):
+            if part:
+                target = target._add_directory(part)
+        ancestor: MemoryFileEntry | None = target
+        while ancestor is not None:
+            if ancestor is entry:
+                return False
+            ancestor = ancestor._parent
+
+        if entry._parent is not None:
+            entry._parent._remove_child(entry)
+        entry._name = name
+        target._insert(entry, policy or mobase.IFileTree.MERGE)
+        return True
+
+    def merge(self, other: MemoryFileTree, overwrites: bool = False) -> int:
+        self._count("moves", len(other._children))
+        for child in list(other._children.values()):
+            other._remove_child(child)
+            self._insert(child, mobase.IFileTree.MERGE)
+        return 0
+
+    def remove(self, entry: MemoryFileEntry | str) -> bool:
+        if isinstance(entry, str):
+            found = self._resolve(entry)
+            if found is None:
+                return False
+            entry = found
+        if entry._parent is not self:
+            return False
+        self._remove_child(entry)
+        return True
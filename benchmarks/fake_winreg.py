@@ -0,0 +1,169 @@
+# -*- encoding: utf-8 -*-
+
+"""
+In-memory stand-in for the `winreg` module, implementing the subset used by the
+store utilities (`OpenKey`, `QueryValueEx`, `QueryInfoKey` and `EnumKey`).
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import types
+from pathlib import Path
+from typing import Any
+
+HKEY_CLASSES_ROOT = 0x80000000
+HKEY_CURRENT_USER = 0x80000001
+HKEY_LOCAL_MACHINE = 0x80000002
+
+_HIVE_NAMES = {
+    "HKEY_CLASSES_ROOT": HKEY_CLASSES_ROOT,
+    "HKEY_CURRENT_USER": HKEY_CURRENT_USER,
+    "HKEY_LOCAL_MACHINE": HKEY_LOCAL_MACHINE,
+}
+
+
+class FakeKey:
+    def __init__(self, hive: int, path: str, registry: FakeRegistry):
+        self._hive = hive
+        self._path = path
+        self._registry = registry
+
+    def __enter__(self) -> FakeKey:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.Close()
+
+    def Close(self) -> None:
+        pass
+
+
+class FakeRegistry:
+    """
+    Registry content, as a mapping from (hive, key path) to the values of the key.
+    Key paths are case-insensitive, as in the Windows registry.
+    """
+
+    def __init__(self):
+        self._values: dict[tuple[int, str], dict[str, Any]] = {}
+        self._paths: dict[tuple[int, str], str] = {}
+
+        # number of calls to the registry functions:
+        self.calls = 0
+
+    def set_value(self, hive: int, path: str, name: str, value: Any) -> None:
+        self.add_key(hive, path)
+        self._values[hive, path.casefold()][name] = value
+
+    def add_key(self, hive: int, path: str) -> None:
+        parts = path.split("\\")
+        for i in range(1, len(parts) + 1):
+            subpath = "\\".join(parts[:i])
+            self._values.setdefault((hive, subpath.casefold()), {})
+            self._paths.setdefault((hive, subpath.casefold()), subpath)
+
+    def to_json(self) -> list[dict[str, Any]]:
+        hives = {v: k for k, v in _HIVE_NAMES.items()}
+        return [
+            {"hive": hives[hive], "path": self._paths[hive, path], "values": values}
+            for (hive, path), values in self._values.items()
+        ]
+
+    @staticmethod
+    def from_json(content: list[dict[str, Any]]) -> FakeRegistry:
+        registry = FakeRegistry()
+        for key in content:
+            hive = _HIVE_NAMES[key["hive"]]
+            registry.add_key(hive, key["path"])
+            for name, value in key["values"].items():
+                registry.set_value(hive, key["path"], name, value)
+        return registry
+
+    def _key(self, key: FakeKey | int, sub_key: str) -> tuple[int, str]:
+        if isinstance(key, FakeKey):
+            hive = key._hive  # pyright: ignore[reportPrivateUsage]
+            path = key._path  # pyright: ignore[reportPrivateUsage]
+            path = f"{path}\\{sub_key}" if sub_key else path
+        else:
+            hive, path = key, sub_key
+        return hive, path.strip("\\").casefold()
+
+    def _subkeys(self, hive: int, path: str) -> list[str]:
+        prefix = path + "\\"
+        return sorted(
+            self._paths[h, p].split("\\")[-1]
+            for h, p in self._values
+            if h == hive and p.startswith(prefix) and "\\" not in p[len(prefix) :]
+        )
+
+    # winreg API:
+
+    def OpenKey(
+        self, key: FakeKey | int, sub_key: str, reserved: int = 0, access: int = 0
+    ) -> FakeKey:
+        self.calls += 1
+        hive, path = self._key(key, sub_key)
+        if (hive, path) not in self._values:
+            raise FileNotFoundError(2, "The system cannot find the file specified")
+        return FakeKey(hive, path, self)
+
+    def QueryValueEx(self, key: FakeKey, name: str) -> tuple[Any, int]:
+        self.calls += 1
+        values = self._values[self._key(key, "")]
+        if name not in values:
+            raise FileNotFoundError(2, "The system cannot find the file specified")
+        value = values[name]
+        return value, 4 if isinstance(value, int) else 1
+
+    def QueryInfoKey(self, key: FakeKey) -> tuple[int, int, int]:
+        self.calls += 1
+        hive, path = self._key(key, "")
+        return len(self._subkeys(hive, path)), len(self._values[hive, path]), 0
+
+    def EnumKey(self, key: FakeKey, index: int) -> str:
+        self.calls += 1
+        hive, path = self._key(key, "")
+        subkeys = self._subkeys(hive, path)
+        if index >= len(subkeys):
+            raise OSError(259, "No more data is available")
+        return subkeys[index]
+
+
+def create_module(registry: FakeRegistry) -> types.ModuleType:
+    """
+    Create a module exposing the winreg API backed by the given registry.
+    """
+    module = types.ModuleType("winreg")
+    module.__dict__.update(
+        HKEY_CLASSES_ROOT=HKEY_CLASSES_ROOT,
+        HKEY_CURRENT_USER=HKEY_CURRENT_USER,
+        HKEY_LOCAL_MACHINE=HKEY_LOCAL_MACHINE,
+        OpenKey=registry.OpenKey,
+        QueryValueEx=registry.QueryValueEx,
+        QueryInfoKey=registry.QueryInfoKey,
+        EnumKey=registry.EnumKey,
+        registry=registry,
+    )
+    return module
+
+
+def install(registry: FakeRegistry) -> types.ModuleType:
+    """
+    Install the fake registry as the `winreg` module. Must be called before the store
+    utilities are imported.
+    """
+    module = create_module(registry)
+    sys.modules["winreg"] = module
+    return module
+
+
+def load(path: Path) -> FakeRegistry:
+    with open(path, "r", encoding="utf-8") as fp:
+        return FakeRegistry.from_json(json.load(fp))
+
+
+def save(registry: FakeRegistry, path: Path) -> None:
+    with open(path, "w", encoding="utf-8") as fp:
+        json.dump(registry.to_json(), fp, indent=2)
@@ -0,0 +1,432 @@
+# -*- encoding: utf-8 -*-
+
+"""
+Generators for synthetic launcher data (Steam, GOG, Epic Games / Legendary, EA
+Desktop and Origin), shaped like the files written by the real launchers.
+
+Launcher data is generated under a root folder, and the registry keys pointing to it
+are written to a `FakeRegistry`. Locations that the store utilities build from
+`%VARIABLE%` strings are created both as literal folder names relative to the root
+(`os.path.expandvars` does not expand them on Linux, so the benchmarks run from the
+root folder) and through the environment returned by `launcher_environment`.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from urllib import parse
+
+from .fake_winreg import HKEY_CURRENT_USER, HKEY_LOCAL_MACHINE, FakeRegistry
+
+
+@dataclass
+class FixtureSizes:
+    steam_libraries: int = 3
+    steam_games: int = 3000
+    gog_games: int = 200
+    epic_games: int = 300
+    epic_manifest_chunks: int = 200
+    legendary_games: int = 100
+    ea_games: int = 150
+    origin_games: int = 100
+    origin_depth: int = 4
+    origin_files: int = 20
+
+
+def launcher_environment(root: Path) -> dict[str, str]:
+    """
+    Environment variables pointing the store utilities to the fixtures in the given
+    root folder.
+    """
+    return {
+        "PROGRAMDATA": str(root.joinpath("%PROGRAMDATA%")),
+        "LOCALAPPDATA": str(root.joinpath("%LocalAppData%")),
+        "APPDATA": str(root.joinpath("%AppData%")),
+        "ProgramW6432": str(root.joinpath("ea_games")),
+        "XDG_CONFIG_HOME": str(root.joinpath("xdg")),
+    }
+
+
+def _write(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+
+
+def steam_app_manifest(appid: int, installdir: str, rng: random.Random) -> str:
+    """
+    Content of an `appmanifest_<appid>.acf` file, with the sections usually found
+    in Steam manifests.
+    """
+    depots = "".join(
+        f"""
+		"{appid + i}"
+		{{
+			"manifest"		"{rng.getrandbits(63)}"
+			"size"		"{rng.randint(1 << 20, 1 << 34)}"
+		}}"""
+        for i in range(1, rng.randint(2, 6))
+    )
+    return f""""AppState"
+{{
+	"appid"		"{appid}"
+	"universe"		"1"
+	"LauncherPath"		"C:\\\\Program Files (x86)\\\\Steam\\\\steam.exe"
+	"name"		"{installdir}"
+	"StateFlags"		"4"
+	"installdir"		"{installdir}"
+	"LastUpdated"		"{rng.randint(1500000000, 1700000000)}"
+	"LastPlayed"		"{rng.randint(1500000000, 1700000000)}"
+	"SizeOnDisk"		"{rng.randint(1 << 20, 1 << 36)}"
+	"StagingSize"		"0"
+	"buildid"		"{rng.randint(1, 1 << 24)}"
+	"LastOwner"		"{rng.getrandbits(60)}"
+	"UpdateResult"		"0"
+	"BytesToDownload"		"0"
+	"BytesDownloaded"		"0"
+	"BytesToStage"		"0"
+	"BytesStaged"		"0"
+	"TargetBuildID"		"0"
+	"AutoUpdateBehavior"		"0"
+	"AllowOtherDownloadsWhileRunning"		"0"
+	"ScheduledAutoUpdate"		"0"
+	"InstalledDepots"
+	{{{depots}
+	}}
+	"SharedDepots"
+	{{
+		"228985"		"228980"
+		"228990"		"228980"
+	}}
+	"UserConfig"
+	{{
+		"language"		"english"
+	}}
+	"MountedConfig"
+	{{
+		"language"		"english"
+	}}
+}}
+"""
+
+
+def generate_steam(
+    root: Path, registry: FakeRegistry, sizes: FixtureSizes, rng: random.Random
+) -> dict[str, Path]:
+    steam_path = root.joinpath("steam")
+    _write(steam_path.joinpath("steam.exe"), "")
+    registry.set_value(
+        HKEY_CURRENT_USER,
+        "Software\\Valve\\Steam",
+        "SteamExe",
+        str(steam_path.joinpath("steam.exe")),
+    )
+
+    libraries = [steam_path] + [
+        root.joinpath(f"steam_library_{i}") for i in range(1, sizes.steam_libraries)
+    ]
+    folders = "".join(
+        f"""
+	"{i}"
+	{{
+		"path"		"{json.dumps(str(library))[1:-1]}"
+		"label"		""
+		"contentid"		"{rng.getrandbits(63)}"
+		"totalsize"		"0"
+	}}"""
+        for i, library in enumerate(libraries)
+    )
+    _write(
+        steam_path.joinpath("steamapps", "libraryfolders.vdf"),
+        f'"libraryfolders"\n{{{folders}\n}}\n',
+    )
+
+    games: dict[str, Path] = {}
+    for i in range(sizes.steam_games):
+        library = libraries[i % len(libraries)]
+        appid = 10000 + i * 10
+        installdir = f"Steam Game {appid}"
+        _write(
+            library.joinpath("steamapps", f"appmanifest_{appid}.acf"),
+            steam_app_manifest(appid, installdir, rng),
+        )
+        games[str(appid)] = library.joinpath("steamapps", "common", installdir)
+
+    # libraries without games still have a steamapps folder
+    for library in libraries:
+        library.joinpath("steamapps").mkdir(parents=True, exist_ok=True)
+
+    return games
+
+
+def generate_gog(
+    root: Path, registry: FakeRegistry, sizes: FixtureSizes
+) -> dict[str, Path]:
+    games: dict[str, Path] = {}
+    for i in range(sizes.gog_games):
+        game_id = str(1207658000 + i)
+        path = root.joinpath("gog_games", f"GOG Game {game_id}")
+        registry.set_value(
+            HKEY_LOCAL_MACHINE,
+            f"Software\\Wow6432Node\\GOG.com\\Games\\{game_id}",
+            "path",
+            str(path),
+        )
+        games[game_id] = path
+    registry.add_key(HKEY_LOCAL_MACHINE, "Software\\Wow6432Node\\GOG.com\\Games")
+    return games
+
+
+def epic_manifest(app_name: str, install_location: Path, chunks: int) -> str:
+    """
+    Content of an Epic Games launcher `.item` manifest. Some launcher versions store
+    large chunk lists in manifests, simulated with `chunks` entries.
+    """
+    return json.dumps(
+        {
+            "FormatVersion": 0,
+            "bIsIncompleteInstall": False,
+            "LaunchCommand": "",
+            "LaunchExecutable": "Binaries/Win64/Game.exe",
+            "ManifestLocation": "C:\\ProgramData\\Epic\\EpicGamesLauncher\\Data\\Manifests",
+            "bIsApplication": True,
+            "bIsExecutable": True,
+            "bIsManaged": False,
+            "bNeedsValidation": False,
+            "bRequiresAuth": True,
+            "bAllowMultipleInstances": False,
+            "bCanRunOffline": True,
+            "bAllowUriCmdArgs": False,
+            "BaseURLs": [f"https://epicgames-download1.akamaized.net/{app_name}"],
+            "BuildLabel": "Live",
+            "AppCategories": ["public", "games", "applications"],
+            "ChunkDbs": [],
+            "CompatibleApps": [],
+            "DisplayName": app_name,
+            "InstallationGuid": app_name.encode().hex().upper()[:32],
+            "InstallLocation": str(install_location),
+            "InstallSessionId": "",
+            "InstallTags": [],
+            "InstallComponents": [],
+            "HostInstallationGuid": "00000000000000000000000000000000",
+            "PrereqIds": [],
+            "PrereqSHA1Hash": "",
+            "LastPrereqSucceededSHA1Hash": "",
+            "StagingLocation": f"{install_location}/.egstore/bps",
+            "TechnicalType": "games,applications",
+            "VaultThumbnailUrl": "",
+            "VaultTitleText": "",
+            "InstallSize": 123456789,
+            "MainWindowProcessName": "",
+            "ProcessNames": [],
+            "BackgroundProcessNames": [],
+            "IgnoredProcessNames": [],
+            "DlcProcessNames": [],
+            "MandatoryAppFolderName": app_name,
+            "OwnershipToken": "false",
+            "CatalogNamespace": app_name.lower(),
+            "CatalogItemId": app_name.encode().hex()[:32],
+            "AppName": app_name,
+            "AppVersionString": "1.0.0",
+            "MainGameCatalogNamespace": app_name.lower(),
+            "MainGameCatalogItemId": app_name.encode().hex()[:32],
+            "MainGameAppName": app_name,
+            "AllowedUriEnvVars": [],
+            "FileChunks": [
+                {
+                    "Guid": f"{i:032X}",
+                    "Hash": f"{i * 7919:016X}",
+                    "Filename": f"Content/Paks/pakchunk{i}-WindowsNoEditor.pak",
+                    "Size": i * 1024,
+                }
+                for i in range(chunks)
+            ],
+        },
+        indent="\t",
+    )
+
+
+def generate_epic(
+    root: Path, registry: FakeRegistry, sizes: FixtureSizes
+) -> dict[str, Path]:
+    data_path = root.joinpath("epic")
+    registry.set_value(
+        HKEY_LOCAL_MACHINE,
+        "Software\\Wow6432Node\\Epic Games\\EpicGamesLauncher",
+        "AppDataPath",
+        str(data_path),
+    )
+
+    games: dict[str, Path] = {}
+    for i in range(sizes.epic_games):
+        app_name = f"EpicApp{i:05d}"
+        location = root.joinpath("epic_games", app_name)
+        _write(
+            data_path.joinpath("Manifests", f"{app_name.encode().hex().upper()}.item"),
+            epic_manifest(app_name, location, sizes.epic_manifest_chunks),
+        )
+        games[app_name] = location
+
+    installed: dict[str, dict[str, Any]] = {
+        f"LegendaryApp{i:05d}": {
+            "app_name": f"LegendaryApp{i:05d}",
+            "base_urls": [],
+            "can_run_offline": True,
+            "egl_guid": "",
+            "executable": "Game.exe",
+            "install_path": str(root.joinpath("legendary_games", f"Game{i}")),
+            "install_size": 123456789,
+            "install_tags": [],
+            "is_dlc": False,
+            "launch_parameters": "",
+            "manifest_path": None,
+            "needs_verification": False,
+            "platform": "Windows",
+            "prereq_info": None,
+            "requires_ot": False,
+            "save_path": None,
+            "title": f"Legendary Game {i}",
+            "version": "1.0.0",
+        }
+        for i in range(sizes.legendary_games)
+    }
+    _write(
+        root.joinpath("xdg", "legendary", "installed.json"),
+        json.dumps(installed, indent=4),
+    )
+    games.update(
+        (app_name, Path(game["install_path"])) for app_name, game in installed.items()
+    )
+
+    return games
+
+
+def ea_installer_data(content_id: str, title: str) -> str:
+    return f"""<?xml version="1.0" encoding="utf-8"?>
+<DiPManifest version="4.0">
+  <buildMetaData>
+    <gameVersion version="1.0.0.0"/>
+    <dlcVersion version="0"/>
+    <featureFlags autoUpdateEnabled="1" treatUpdatesAsMandatory="0" useGameVersionFromManifestEnabled="0" forceTouchupInstallerAfterUpdate="0" languageChangeSupportEnabled="1" enableDifferentialUpdate="1" dynamicContentSupportEnabled="0"/>
+  </buildMetaData>
+  <contentIDs>
+    <contentID>{content_id}</contentID>
+    <contentID>{title.lower().replace(" ", "_")}_pc_ww</contentID>
+  </contentIDs>
+  <gameTitles>
+    <gameTitle locale="en_US">{title}</gameTitle>
+    <gameTitle locale="fr_FR">{title}</gameTitle>
+    <gameTitle locale="de_DE">{title}</gameTitle>
+  </gameTitles>
+  <runtime>
+    <launcher uid="1">
+      <filePath>[HKEY_LOCAL_MACHINE\\SOFTWARE\\EA Games\\{title}\\Install Dir]Game.exe</filePath>
+      <trial>0</trial>
+    </launcher>
+  </runtime>
+  <touchup>
+    <filePath>{{installLocation}}\\__Installer\\Touchup.exe</filePath>
+    <parameters>install -locale {{locale}} -installPath {{installLocation}}</parameters>
+  </touchup>
+</DiPManifest>
+"""
+
+
+def generate_eadesktop(root: Path, sizes: FixtureSizes) -> dict[str, Path]:
+    install_path = root.joinpath("ea_games")
+    install_path.mkdir(parents=True, exist_ok=True)
+    _write(
+        root.joinpath("%LocalAppData%", "Electronic Arts", "EA Desktop", "user_1.ini"),
+        "\n".join(
+            [
+                "user.downloadinplacedir=" + str(install_path),
+                "user.gamecommandline.origin.ofr.50.0002694=",
+                "user.locale=en_US",
+                "",
+            ]
+        ),
+    )
+
+    games: dict[str, Path] = {}
+    for i in range(sizes.ea_games):
+        content_id = str(1000000 + i)
+        game_dir = install_path.joinpath(f"EA Game {i}")
+        _write(
+            game_dir.joinpath("__Installer", "installerdata.xml"),
+            ea_installer_data(content_id, f"EA Game {i}"),
+        )
+        games[content_id] = game_dir
+
+    # folders without installer data are skipped by the store utilities
+    install_path.joinpath("Not A Game").mkdir(exist_ok=True)
+
+    return games
+
+
+def origin_manifest(manifest_id: str, install_path: Path) -> str:
+    query = parse.urlencode(
+        {
+            "currentstate": "kReadyToStart",
+            "downloading": "0",
+            "id": manifest_id,
+            "dipinstallpath": str(install_path),
+            "previousstate": "kInstalling",
+            "totalbytes": "12345678",
+        }
+    )
+    return f"?{query}"
+
+
+def generate_origin(root: Path, sizes: FixtureSizes) -> dict[str, Path]:
+    local_content = root.joinpath("%PROGRAMDATA%", "Origin", "LocalContent")
+    local_content.mkdir(parents=True, exist_ok=True)
+
+    games: dict[str, Path] = {}
+    for i in range(sizes.origin_games):
+        manifest_id = f"OFB-EAST:{100000 + i}"
+        game_dir = local_content.joinpath(f"Origin Game {i}")
+        install_path = root.joinpath("origin_games", f"Origin Game {i}")
+        _write(
+            game_dir.joinpath(f"OFB-EAST{100000 + i}.mfst"),
+            origin_manifest(manifest_id, install_path),
+        )
+        games[manifest_id] = install_path
+
+        # downloaded content, without manifests
+        content_dir = game_dir
+        for depth in range(sizes.origin_depth):
+            content_dir = content_dir.joinpath(f"content_{depth}")
+            for j in range(sizes.origin_files):
+                _write(content_dir.joinpath(f"data_{j}.bin"), "")
+
+    return games
+
+
+def generate(
+    root: Path, sizes: FixtureSizes, seed: int = 0
+) -> tuple[FakeRegistry, dict[str, dict[str, Path]]]:
+    """
+    Generate launcher data for all stores in the given root folder.
+
+    Args:
+        root: Folder to generate the launcher data in.
+        sizes: Number of games, libraries, etc., to generate.
+        seed: Seed for the generated values.
+
+    Returns:
+        The registry pointing to the generated data, and the games expected to be
+        found in each store.
+    """
+    rng = random.Random(seed)
+    registry = FakeRegistry()
+    expected = {
+        "Steam": generate_steam(root, registry, sizes, rng),
+        "GOG": generate_gog(root, registry, sizes),
+        "Origin": generate_origin(root, sizes),
+        "Epic Games": generate_epic(root, registry, sizes),
+        "EA Desktop": generate_eadesktop(root, sizes),
+    }
+    return registry, expected
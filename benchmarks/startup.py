@@ -0,0 +1,279 @@
+# -*- encoding: utf-8 -*-
+
+"""
+Headless startup benchmark.
+
+Runs `createPlugins()` and the detection of all game plugins end to end, with a stub
+`mobase` module and a fake `winreg` module pointing to synthetic launcher data, and
+reports the cold (empty cache) and warm timings, the peak memory and the per-stage
+breakdown from the startup profile.
+
+Each run is done in a fresh interpreter, so that module imports are measured.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from . import PACKAGE_NAME, REPOSITORY, fake_winreg, fixtures, stub_mobase
+
+PROFILE_FILENAME = "basic_games_startup.json"
+
+
+def _peak_memory() -> int:
+    """
+    Returns:
+        The peak resident memory of the process, in bytes.
+    """
+    if sys.platform != "win32":
+        import resource
+
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS, in kilobytes elsewhere
+        return usage if sys.platform == "darwin" else usage * 1024
+
+    import tracemalloc
+
+    return tracemalloc.get_traced_memory()[1]
+
+
+def _import_plugin(repository: Path) -> Any:
+    spec = importlib.util.spec_from_file_location(
+        PACKAGE_NAME,
+        repository.joinpath("__init__.py"),
+        submodule_search_locations=[str(repository)],
+    )
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE_NAME] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_child(repository: Path, fixture_root: Path) -> dict[str, Any]:
+    """
+    Run the plugin startup in the current interpreter. Must be called in a fresh
+    interpreter, from the fixture root folder.
+    """
+    if sys.platform == "win32":
+        import tracemalloc
+
+        tracemalloc.start()
+
+    registry = fake_winreg.load(fixture_root.joinpath("registry.json"))
+    fake_winreg.install(registry)
+    stub_mobase.install()
+
+    # plugins are created once the MO2 application exists, errors are reported
+    # through message boxes
+    from PyQt6.QtWidgets import QApplication, QMessageBox
+
+    _app = QApplication([])
+
+    def critical(*args: Any, **kwargs: Any) -> None:
+        print(*args[1:3], file=sys.stderr)
+
+    QMessageBox.critical = critical  # type: ignore
+
+    start = time.perf_counter()
+    plugin = _import_plugin(repository)
+    imported = time.perf_counter()
+    plugins = plugin.createPlugins()
+    created = time.perf_counter()
+
+    basic_game = sys.modules[PACKAGE_NAME + ".basic_game"].BasicGame
+    games = [game for game in plugins if isinstance(game, basic_game)]
+    for game in games:
+        game.detectGame()
+    detected = sum(1 for game in games if game.isInstalled())
+    end = time.perf_counter()
+
+    stores = {
+        store: len(index.games) for store, index in basic_game.stores.scan().items()
+    }
+
+    profile: dict[str, Any] = {}
+    profile_path = Path(os.environ["BASIC_GAMES_PROFILE"], PROFILE_FILENAME)
+    if profile_path.exists():
+        profile = json.loads(profile_path.read_text(encoding="utf-8"))
+
+    return {
+        "total": end - start,
+        "import": imported - start,
+        "createPlugins": created - imported,
+        "detection": end - created,
+        "plugins": len(plugins),
+        "detected": detected,
+        "store_games": stores,
+        "registry_calls": registry.calls,
+        "peak_memory": _peak_memory(),
+        "profile": profile,
+    }
+
+
+def _run(
+    repository: Path, fixture_root: Path, cache_dir: Path, profile_dir: Path
+) -> dict[str, Any]:
+    env = os.environ.copy()
+    env.update(fixtures.launcher_environment(fixture_root))
+    env.update(
+        PYTHONPATH=str(REPOSITORY),
+        BASIC_GAMES_CACHE_DIR=str(cache_dir),
+        BASIC_GAMES_PROFILE=str(profile_dir),
+        QT_QPA_PLATFORM="offscreen",
+    )
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.startup",
+            "--child",
+            "--repository",
+            str(repository),
+            "--fixtures",
+            str(fixture_root),
+        ],
+        cwd=fixture_root,
+        env=env,
+        check=True,
+        stdout=subprocess.PIPE,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def _median(values: list[float]) -> float:
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2
+
+
+def _print_section(title: str, values: dict[str, float], limit: int) -> None:
+    if not values:
+        return
+    print(f"  {title}:")
+    for name, seconds in sorted(values.items(), key=lambda kv: -kv[1])[:limit]:
+        print(f"    {name:<40} {seconds * 1000:9.2f}ms")
+
+
+def _print_run(name: str, runs: list[dict[str, Any]], top: int) -> None:
+    result = runs[-1]
+    print(
+        f"{name}: {_median([run['total'] for run in runs]) * 1000:.1f}ms"
+        f" (median of {len(runs)}), peak memory"
+        f" {max(run['peak_memory'] for run in runs) / 2**20:.1f}MiB"
+    )
+    print(
+        f"  import {result['import'] * 1000:.1f}ms,"
+        f" createPlugins {result['createPlugins'] * 1000:.1f}ms,"
+        f" detection {result['detection'] * 1000:.1f}ms,"
+        f" {result['plugins']} plugins, {result['detected']} detected,"
+        f" {result['registry_calls']} registry calls"
+    )
+
+    profile = result["profile"]
+    _print_section("stages", profile.get("stages", {}), top)
+    _print_section("imports", profile.get("imports", {}), top)
+    _print_section("instantiations", profile.get("instantiations", {}), top)
+
+    stores = profile.get("stores", {})
+    if stores:
+        print("  stores:")
+        for store, values in stores.items():
+            details = ", ".join(
+                f"{key} {value}" for key, value in values.items() if key != "seconds"
+            )
+            print(
+                f"    {store:<40}"
+                f" {values.get('seconds', 0.0) * 1000:9.2f}ms ({details})"
+            )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Headless startup benchmark.")
+    parser.add_argument(
+        "--repository",
+        type=Path,
+        default=REPOSITORY,
+        help="path to the basic games plugin to benchmark",
+    )
+    parser.add_argument(
+        "--fixtures",
+        type=Path,
+        help="folder to generate the launcher data in (defaults to a temporary folder)",
+    )
+    parser.add_argument("--runs", type=int, default=3, help="number of runs")
+    parser.add_argument("--top", type=int, default=10, help="entries per section")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+
+    sizes = fixtures.FixtureSizes()
+    for name, value in vars(sizes).items():
+        parser.add_argument(
+            "--" + name.replace("_", "-"), type=int, default=value, dest=name
+        )
+
+    args = parser.parse_args(argv)
+    repository: Path = args.repository.resolve()
+
+    if args.child:
+        print(json.dumps(run_child(repository, args.fixtures.resolve())))
+        return 0
+
+    for name in vars(sizes):
+        setattr(sizes, name, getattr(args, name))
+
+    with tempfile.TemporaryDirectory(prefix="basic_games_bench_") as tmp:
+        fixture_root = args.fixtures.resolve() if args.fixtures else Path(tmp, "data")
+        fixture_root.mkdir(parents=True, exist_ok=True)
+
+        start = time.perf_counter()
+        registry, expected = fixtures.generate(fixture_root, sizes)
+        fake_winreg.save(registry, fixture_root.joinpath("registry.json"))
+        print(
+            f"Generated fixtures in {time.perf_counter() - start:.1f}s: "
+            + ", ".join(f"{store} {len(games)}" for store, games in expected.items()),
+            file=sys.stderr,
+        )
+
+        cold: list[dict[str, Any]] = []
+        warm: list[dict[str, Any]] = []
+        for i in range(args.runs):
+            cache_dir = Path(tmp, f"cache_{i}")
+            profile_dir = Path(tmp, f"profile_{i}")
+            cache_dir.mkdir()
+            profile_dir.mkdir()
+            cold.append(_run(repository, fixture_root, cache_dir, profile_dir))
+            warm.append(_run(repository, fixture_root, cache_dir, profile_dir))
+
+    for result in cold + warm:
+        for store, games in expected.items():
+            if result["store_games"].get(store) != len(games):
+                print(
+                    f"Warning: found {result['store_games'].get(store)} {store} games,"
+                    f" expected {len(games)}",
+                    file=sys.stderr,
+                )
+
+    if args.json:
+        print(json.dumps({"cold": cold, "warm": warm}, indent=2))
+    else:
+        _print_run("cold", cold, args.top)
+        _print_run("warm", warm, args.top)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,304 @@
+# -*- encoding: utf-8 -*-
+
+"""
+Stress benchmark and regression check of the store providers.
+
+Large launcher data is generated (by default 10k Steam manifests, 1k Epic Games
+manifests, 500 EA Desktop installers and deep Origin trees) and each provider is run
+on it with a fake registry, with empty caches (cold) and with the caches of the
+previous run (warm). For each provider and run, the benchmark reports:
+
+  - the wall time,
+  - the filesystem calls reaching the OS (stat, folder listings and opened files, see
+    `fs_utils.CachedFileSystem`) and the registry calls,
+  - the peak and retained memory allocated, measured in a separate run since
+    tracing allocations slows the providers down.
+
+The games found are checked against the generated data. Results can be saved with
+`--save` and compared to a previous run with `--baseline`, in which case the
+benchmark fails if a provider makes more filesystem or registry calls, or is slower
+or allocates more than the given tolerance, e.g.:
+
+    python -m benchmarks.stores --save baseline.json
+    python -m benchmarks.stores --baseline baseline.json --tolerance 0.25
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+from . import REPOSITORY, fake_winreg, fixtures, import_plugin_module
+
+# Provider class of each store, by module:
+PROVIDERS = {
+    "Steam": ("steam_utils", "SteamStore"),
+    "GOG": ("gog_utils", "GogStore"),
+    "Origin": ("origin_utils", "OriginStore"),
+    "Epic Games": ("epic_utils", "EpicGamesStore"),
+    "EA Desktop": ("eadesktop_utils", "EaDesktopStore"),
+}
+
+STRESS_SIZES = fixtures.FixtureSizes(
+    steam_libraries=4,
+    steam_games=10000,
+    gog_games=500,
+    epic_games=1000,
+    legendary_games=200,
+    ea_games=500,
+    origin_games=200,
+    origin_depth=8,
+    origin_files=20,
+)
+
+# Counters compared exactly against the baseline, other values use the tolerance:
+EXACT_COUNTERS = ("fs_calls", "registry_calls")
+
+
+def _measure(
+    provider: Any,
+    fs_utils: Any,
+    base: Any,
+    registry: fake_winreg.FakeRegistry,
+    trace: bool,
+) -> tuple[dict[str, Any], dict[str, Path], list[tuple[str, Exception]]]:
+    errors: list[tuple[str, Exception]] = []
+    registry.calls = 0
+    if trace:
+        tracemalloc.start()
+
+    with fs_utils.detection_pass(base) as filesystem:
+        start = time.perf_counter()
+        games: dict[str, Path] = provider.detect(errors)
+        seconds = time.perf_counter() - start
+
+    if trace:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {"peak_memory": peak, "retained_memory": current}, games, errors
+
+    counters: dict[str, int] = filesystem.counters()
+    return (
+        {
+            "seconds": seconds,
+            "fs_calls": sum(
+                count
+                for name, count in counters.items()
+                if name.endswith("_misses") or name == "reads"
+            ),
+            **{name: count for name, count in counters.items() if name != "reads"},
+            "reads": counters["reads"],
+            "registry_calls": registry.calls,
+        },
+        games,
+        errors,
+    )
+
+
+def run(
+    repository: Path,
+    root: Path,
+    cache_dir: Path,
+    registry: fake_winreg.FakeRegistry,
+    expected: dict[str, dict[str, Path]],
+    runs: int,
+    memory: bool,
+) -> tuple[dict[str, dict[str, dict[str, Any]]], list[str]]:
+    """
+    Run the providers on the generated data.
+
+    Returns:
+        The results, by run (cold, warm) and store, and the list of failures (games
+        not matching the generated data or errors).
+    """
+    fake_winreg.install(registry)
+    fs_utils = import_plugin_module("fs_utils", repository)
+    providers = {
+        store: getattr(import_plugin_module(module, repository), name)()
+        for store, (module, name) in PROVIDERS.items()
+    }
+
+    base = None
+    if memory:
+        from .fake_filesystem import MemoryFileSystem
+
+        base = MemoryFileSystem()
+        base.copy_tree(root)
+
+    results: dict[str, dict[str, dict[str, Any]]] = {"cold": {}, "warm": {}}
+    failures: list[str] = []
+
+    def clear_caches():
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        cache_dir.mkdir()
+
+    for store, provider in providers.items():
+        samples: dict[str, list[dict[str, Any]]] = {"cold": [], "warm": []}
+        for _ in range(runs):
+            clear_caches()
+            for name in ("cold", "warm"):
+                values, games, errors = _measure(
+                    provider, fs_utils, base, registry, False
+                )
+                samples[name].append(values)
+                if errors:
+                    failures.append(f"{store} ({name}): {errors}")
+                if games != expected[store]:
+                    failures.append(
+                        f"{store} ({name}): found {len(games)} games,"
+                        f" expected {len(expected[store])}"
+                    )
+
+        clear_caches()
+        for name in ("cold", "warm"):
+            memory_values, _, _ = _measure(provider, fs_utils, base, registry, True)
+            best = min(samples[name], key=lambda values: values["seconds"])
+            results[name][store] = best | memory_values
+
+    return results, failures
+
+
+def compare(
+    results: dict[str, dict[str, dict[str, Any]]],
+    baseline: dict[str, dict[str, dict[str, Any]]],
+    tolerance: float,
+) -> list[str]:
+    """
+    Returns:
+        The regressions of the results compared to the baseline.
+    """
+    regressions: list[str] = []
+    for name, stores in baseline.items():
+        for store, previous in stores.items():
+            current = results.get(name, {}).get(store)
+            if current is None:
+                continue
+            for key in ("seconds", "peak_memory", *EXACT_COUNTERS):
+                limit = previous[key] * (1 if key in EXACT_COUNTERS else 1 + tolerance)
+                if current[key] > limit:
+                    regressions.append(
+                        f"{store} ({name}): {key} {current[key]:g} > {previous[key]:g}"
+                    )
+    return regressions
+
+
+def _print(results: dict[str, dict[str, dict[str, Any]]]) -> None:
+    for name, stores in results.items():
+        print(f"{name}:")
+        print(
+            f"  {'store':12} {'time':>10} {'fs calls':>9} {'stat':>7} {'scandir':>8}"
+            f" {'reads':>7} {'registry':>9} {'peak':>9} {'retained':>9}"
+        )
+        for store, values in stores.items():
+            print(
+                f"  {store:12} {values['seconds'] * 1000:8.1f}ms"
+                f" {values['fs_calls']:9}"
+                f" {values.get('stat_misses', 0):7}"
+                f" {values.get('scandir_misses', 0):8}"
+                f" {values['reads']:7}"
+                f" {values['registry_calls']:9}"
+                f" {values['peak_memory'] / 1024 / 1024:7.1f}Mi"
+                f" {values['retained_memory'] / 1024 / 1024:7.1f}Mi"
+            )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Store providers stress benchmark.")
+    parser.add_argument(
+        "--repository",
+        type=Path,
+        default=REPOSITORY,
+        help="path to the basic games plugin to benchmark",
+    )
+    parser.add_argument("--runs", type=int, default=3, help="number of timed runs")
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="run the providers on an in-memory copy of the launcher data",
+    )
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--save", type=Path, help="save the results to this file")
+    parser.add_argument(
+        "--baseline", type=Path, help="fail on regressions compared to this file"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed relative increase of time and memory (default: 0.25)",
+    )
+
+    for name, value in vars(STRESS_SIZES).items():
+        parser.add_argument(
+            "--" + name.replace("_", "-"), type=int, default=value, dest=name
+        )
+
+    args = parser.parse_args(argv)
+    sizes = fixtures.FixtureSizes(
+        **{name: getattr(args, name) for name in vars(STRESS_SIZES)}
+    )
+
+    with tempfile.TemporaryDirectory(prefix="basic_games_stores_") as tmp:
+        root = Path(tmp, "data")
+        root.mkdir()
+
+        start = time.perf_counter()
+        registry, expected = fixtures.generate(root, sizes)
+        print(
+            f"Generated fixtures in {time.perf_counter() - start:.1f}s: "
+            + ", ".join(f"{store} {len(games)}" for store, games in expected.items()),
+            file=sys.stderr,
+        )
+
+        # the providers read %VARIABLE% locations relative to the working directory
+        # on Linux, see fixtures
+        cwd = os.getcwd()
+        environ = os.environ.copy()
+        os.environ.update(fixtures.launcher_environment(root))
+        os.environ["BASIC_GAMES_CACHE_DIR"] = str(Path(tmp, "cache"))
+        os.chdir(root)
+        try:
+            results, failures = run(
+                args.repository.resolve(),
+                root,
+                Path(tmp, "cache"),
+                registry,
+                expected,
+                args.runs,
+                args.memory,
+            )
+        finally:
+            os.chdir(cwd)
+            os.environ.clear()
+            os.environ.update(environ)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print(results)
+
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        failures += compare(
+            results,
+            json.loads(args.baseline.read_text(encoding="utf-8")),
+            args.tolerance,
+        )
+
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+# -*- encoding: utf-8 -*-
+
+"""
+Minimal stand-in for the `mobase` module, so that game plugins can be imported and
+instantiated outside of MO2.
+
+Every attribute of the module is a stub class that can be subclassed, instantiated
+with any arguments and whose own attributes are stub classes, which is enough to
+define plugins, features and enumeration values. Stub instances do not implement any
+behavior.
+"""
+
+from __future__ import annotations
+
+import sys
+import types
+from typing import Any
+
+
+def _stub_init(self: Any, *args: Any, **kwargs: Any) -> None:
+    pass
+
+
+def _stub_class(name: str, base: type | None = None) -> Any:
+    # each class has its own __init__ that does not call super().__init__(), as the
+    # classes of the actual mobase module, so that plugins inheriting from multiple
+    # interfaces initialize them separately
+    return _StubMeta(
+        name, (base or _Stub,), {"__module__": "mobase", "__init__": _stub_init}
+    )
+
+
+class _StubMeta(type):
+    def __getattr__(cls, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        stub = _stub_class(name)
+        setattr(cls, name, stub)
+        return stub
+
+    # allow combining enumeration flags at class definition
+    def __or__(cls, other: object) -> Any:
+        return cls
+
+    def __ror__(cls, other: object) -> Any:
+        return cls
+
+    def __and__(cls, other: object) -> Any:
+        return cls
+
+
+class _Stub(metaclass=_StubMeta):
+    __init__ = _stub_init
+
+
+class _StubModule(types.ModuleType):
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        stub = _stub_class(name)
+        setattr(self, name, stub)
+        return stub
+
+
+def create_module() -> types.ModuleType:
+    module = _StubModule("mobase")
+
+    # plugin interfaces checked with isinstance() by the plugin loader
+    plugin = _stub_class("IPlugin")
+    module.__dict__.update(
+        IPlugin=plugin,
+        IPluginGame=_stub_class("IPluginGame", plugin),
+        IPluginTool=_stub_class("IPluginTool", plugin),
+    )
+    return module
+
+
+def install() -> types.ModuleType:
+    """
+    Install the stub as the `mobase` module. Must be called before the plugin is
+    imported.
+    """
+    module = create_module()
+    sys.modules["mobase"] = module
+    return module
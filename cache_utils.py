@@ -0,0 +1,190 @@
+# -*- encoding: utf-8 -*-
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, cast
+
+from . import fs_utils
+from .startup_profile import startup_profile
+
+# Version of the store caches, must be incremented when the content of the cache
+# or the way providers list their sources changes:
+STORE_CACHE_VERSION = 1
+
+
+def cache_directory() -> Path:
+    """
+    Retrieve the folder containing the caches of the basic games plugin.
+
+    The folder can be overridden using the BASIC_GAMES_CACHE_DIR environment
+    variable.
+
+    Returns:
+        The path to the cache folder (the folder may not exist yet).
+    """
+    if cache_dir := os.environ.get("BASIC_GAMES_CACHE_DIR"):
+        return Path(cache_dir)
+    if local_app_data := os.environ.get("LOCALAPPDATA"):
+        return Path(local_app_data, "ModOrganizer", "basic_games")
+    return Path("~/.cache/modorganizer/basic_games").expanduser()
+
+
+def load_cache(name: str, version: int) -> Any | None:
+    """
+    Load the content of a cache file.
+
+    Args:
+        name: Name of the cache.
+        version: Expected version of the cache content.
+
+    Returns:
+        The data stored in the cache, or None if the cache does not exist, cannot
+        be read or was written with another version.
+    """
+    cache_path = cache_directory().joinpath(f"{name}.json")
+    try:
+        with open(cache_path, "r", encoding="utf-8") as fp:
+            content = json.load(fp)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f'Unable to read cache file "{cache_path}": {e}', file=sys.stderr)
+        return None
+
+    if not isinstance(content, dict):
+        return None
+
+    content = cast(dict[str, Any], content)
+    if content.get("version") != version:
+        return None
+
+    return content.get("data")
+
+
+def save_cache(name: str, version: int, data: Any) -> None:
+    """
+    Write the given data to a cache file. Failures are reported but not raised,
+    since caches are only an optimization.
+
+    Args:
+        name: Name of the cache.
+        version: Version of the cache content.
+        data: JSON-serializable data to store.
+    """
+    cache_dir = cache_directory()
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # write to a temporary file first so that a concurrent MO2 instance never
+        # reads a partial cache
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{name}.", dir=cache_dir)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fp:
+                json.dump({"version": version, "data": data}, fp)
+            os.replace(tmp_path, cache_dir.joinpath(f"{name}.json"))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        print(f'Unable to write cache "{name}" in "{cache_dir}": {e}', file=sys.stderr)
+
+
+def clear_cache(name: str) -> None:
+    """
+    Remove a cache file, forcing the cached data to be recomputed.
+
+    Args:
+        name: Name of the cache.
+    """
+    try:
+        cache_directory().joinpath(f"{name}.json").unlink()
+    except FileNotFoundError:
+        pass
+
+
+def path_signature(path: Path | str) -> tuple[int, int] | None:
+    """
+    Compute a signature of the given file or folder that changes when it is
+    modified.
+
+    Args:
+        path: Path to the file or folder.
+
+    Returns:
+        The modification time (in nanoseconds) and size of the path, or None if the
+        path does not exist.
+    """
+    try:
+        stat = fs_utils.stat(path)
+    except OSError:
+        return None
+    return stat.mtime_ns, stat.size
+
+
+def cached_find_games(
+    store: str,
+    find_games: Callable[[list[tuple[str, Exception]], list[Path]], dict[str, Path]],
+    errors: list[tuple[str, Exception]],
+    rescan: bool = False,
+) -> dict[str, Path]:
+    """
+    List the games of a store, using the on-disk cache if none of the files or
+    folders read by the previous scan changed.
+
+    Args:
+        store: Name of the store, used to name the cache and in the startup profile.
+        find_games: Function listing the games of the store. The function must
+            append errors to its first argument and the files and folders it read
+            to its second argument.
+        errors: List to append errors to.
+        rescan: If True, ignore the cache content and scan the store again.
+
+    Returns:
+        A mapping from store IDs to install locations for the store.
+    """
+    cache_name = "store_" + store.lower().replace(" ", "")
+
+    if not rescan and (data := load_cache(cache_name, STORE_CACHE_VERSION)):
+        try:
+            cached = cast(dict[str, Any], data)
+            cached_sources = cast(list[tuple[str, Any]], cached["sources"])
+            if all(
+                path_signature(path) == (tuple(signature) if signature else None)
+                for path, signature in cached_sources
+            ):
+                startup_profile.record_store(
+                    store, cached=True, files=len(cached_sources)
+                )
+                return {
+                    game_id: Path(path)
+                    for game_id, path in cast(dict[str, str], cached["games"]).items()
+                }
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Ignoring invalid {store} games cache: {e}", file=sys.stderr)
+
+    store_errors: list[tuple[str, Exception]] = []
+    sources: list[Path] = []
+    games = find_games(store_errors, sources)
+    errors.extend(store_errors)
+
+    sources = list(dict.fromkeys(sources))
+    startup_profile.record_store(store, cached=False, files=len(sources))
+
+    # stores without sources (e.g., registry-based) and failed scans are not cached,
+    # so that they are scanned (and errors reported) again on next start
+    if sources and not store_errors:
+        save_cache(
+            cache_name,
+            STORE_CACHE_VERSION,
+            {
+                "sources": [(str(path), path_signature(path)) for path in sources],
+                "games": {game_id: str(path) for game_id, path in games.items()},
+            },
+        )
+    else:
+        clear_cache(cache_name)
+
+    return games
@@ -6,12 +6,68 @@ import sys
 import xml.etree.ElementTree as et
 from configparser import NoOptionError
 from pathlib import Path
-from typing import Dict
+from typing import Dict, TypedDict, cast
 
+from . import fs_utils
+from .cache_utils import cached_find_games, load_cache, save_cache
+from .store_registry import ErrorList, StoreProvider, map_concurrently
 
-def find_games(errors: list[tuple[str, Exception]] | None = None) -> Dict[str, Path]:
+# Cache of the content ID of each installer data file:
+INSTALLER_CACHE_NAME = "eadesktop_installers"
+INSTALLER_CACHE_VERSION = 1
+
+# Maximum number of game folders read concurrently:
+SCAN_WORKERS = 8
+
+
+class _InstallerEntry(TypedDict):
+    mtime_ns: int
+    size: int
+    content_id: str | None
+
+
+def _read_content_id(installer_file: Path) -> str | None:
+    """
+    Read the content ID of a game from its installer data file. The file is parsed
+    incrementally and parsing stops at the first content ID.
+
+    For all manifest files the first content ID is the numeric ID. There are, in
+    some cases, also name IDs but we do not consider these.
+
+    Args:
+        installer_file: Path to the `installerdata.xml` file.
+
+    Returns:
+        The content ID, or None if the file does not contain one.
+    """
+    # equivalent to root.find(".//contentIDs/contentID[1]"):
+    tags: list[str] = []
+    with fs_utils.open_binary(installer_file) as fp:
+        for event, element in et.iterparse(fp, events=("start", "end")):
+            if event == "start":
+                tags.append(element.tag)
+                continue
+            tags.pop()
+            if element.tag == "contentID" and tags and tags[-1] == "contentIDs":
+                return element.text or None
+    return None
+
+
+def find_games(
+    errors: list[tuple[str, Exception]] | None = None,
+    sources: list[Path] | None = None,
+    use_cache: bool = True,
+) -> Dict[str, Path]:
     """
-    Find the list of EA Desktop games installed.
+    Find the list of EA Desktop games installed. Game folders are read
+    concurrently, and installer data files that did not change since the previous
+    call are not read again.
+
+    Args:
+        errors (optional): List to append parsing errors to.
+        sources (optional): List to append the files and folders read to.
+        use_cache (optional): If False, ignore the content IDs cached for each
+            installer data file and read all of them.
 
     Returns:
         A mapping from EA Desktop content IDs to install locations for available
@@ -24,18 +80,23 @@ def find_games(errors: list[tuple[str, Exception]] | None = None) -> Dict[str, P
         "Electronic Arts", "EA Desktop"
     )
 
-    if not ea_desktop_settings_path.exists():
+    if sources is not None:
+        sources.append(ea_desktop_settings_path)
+
+    if not fs_utils.exists(ea_desktop_settings_path):
         return games
 
     try:
-        user_ini, *_ = list(ea_desktop_settings_path.glob("user_*.ini"))
+        user_ini, *_ = fs_utils.glob(ea_desktop_settings_path, "user_*.ini")
     except ValueError:
         return games
 
+    if sources is not None:
+        sources.append(user_ini)
+
     # The INI file in its current form has no section headers.
     # So we wrangle the input to add it all under a fake section.
-    with open(user_ini) as f:
-        ini_content = "[mod_organizer]\n" + f.read()
+    ini_content = "[mod_organizer]\n" + fs_utils.read_text(user_ini, encoding=None)
 
     config = configparser.ConfigParser()
     try:
@@ -56,29 +117,78 @@ def find_games(errors: list[tuple[str, Exception]] | None = None) -> Dict[str, P
         install_path = Path(os.environ["ProgramW6432"]) / "EA Games"
         config.set("mod_organizer", "user.downloadinplacedir", install_path.__str__())
 
-    if not install_path.exists():
+    if sources is not None:
+        sources.append(install_path)
+
+    if not fs_utils.exists(install_path):
         return games
 
-    for game_dir in install_path.iterdir():
-        try:
-            installer_file = game_dir.joinpath("__Installer", "installerdata.xml")
-            xml_tree = et.parse(installer_file)
-            root = xml_tree.getroot()
+    cache = cast(
+        dict[str, _InstallerEntry],
+        (use_cache and load_cache(INSTALLER_CACHE_NAME, INSTALLER_CACHE_VERSION)) or {},
+    )
+    updated_cache: dict[str, _InstallerEntry] = {}
 
-            # For all manifest files the following XPath expression returns the
-            # numeric ID. There are, in some cases, also name IDs but we do not
-            # consider these.
-            content_id = root.find(".//contentIDs/contentID[1]")
+    def read_game_dir(game_dir: Path) -> str | None:
+        installer_file = game_dir.joinpath("__Installer", "installerdata.xml")
+        try:
+            stat = fs_utils.stat(installer_file)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+
+        key = str(installer_file)
+        entry = cache.get(key)
+        if (
+            entry is None
+            or entry["mtime_ns"] != stat.mtime_ns
+            or entry["size"] != stat.size
+        ):
+            entry = _InstallerEntry(
+                mtime_ns=stat.mtime_ns,
+                size=stat.size,
+                content_id=_read_content_id(installer_file),
+            )
+        updated_cache[key] = entry
+        return entry["content_id"]
+
+    game_dirs = fs_utils.iterdir(install_path)
+    futures = map_concurrently(
+        "basic_games-eadesktop", read_game_dir, game_dirs, SCAN_WORKERS
+    )
+    for game_dir, future in zip(game_dirs, futures, strict=True):
+        if sources is not None:
+            sources.append(game_dir.joinpath("__Installer", "installerdata.xml"))
+        if game_id := future.result():
+            games[game_id] = game_dir
 
-            if content_id is not None and content_id.text:
-                game_id = content_id.text
-                games[game_id] = game_dir
-        except FileNotFoundError:
-            pass
+    if updated_cache != cache:
+        save_cache(INSTALLER_CACHE_NAME, INSTALLER_CACHE_VERSION, updated_cache)
 
     return games
 
 
+class EaDesktopStore(StoreProvider):
+    name = "EA Desktop"
+    mapping = "eaDesktopContentId"
+
+    def __init__(self, rescan: bool = False):
+        """
+        Args:
+            rescan (optional): If True, ignore the cached games and installer data.
+        """
+        self._rescan = rescan
+
+    def detect(self, errors: ErrorList) -> dict[str, Path]:
+        return cached_find_games(
+            self.name,
+            lambda errors, sources: find_games(
+                errors, sources, use_cache=not self._rescan
+            ),
+            errors,
+            self._rescan,
+        )
+
+
 if __name__ == "__main__":
     games = find_games()
     for k, v in games.items():
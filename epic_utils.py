@@ -1,19 +1,218 @@
 # -*- encoding: utf-8 -*-
 from __future__ import annotations
 
-import itertools
 import json
 import os
+import re
 import sys
 import winreg
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable
 from pathlib import Path
+from typing import Any, TypedDict, cast
+
+from . import fs_utils
+from .cache_utils import cached_find_games, load_cache, save_cache
+from .store_registry import StoreProvider, map_concurrently
 
 ErrorList = list[tuple[str, Exception]]
 
+# Cache of the games read from each manifest, see _ManifestCache:
+MANIFEST_CACHE_NAME = "epic_manifests"
+MANIFEST_CACHE_VERSION = 1
+
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+_json_decoder = json.JSONDecoder()
+
+# decode the JSON string starting after the opening quote at the given position,
+# not part of the typed API of the json module:
+_scanstring = cast(
+    Callable[[str, int], tuple[str, int]],
+    json.decoder.scanstring,  # pyright: ignore[reportAttributeAccessIssue, reportUnknownMemberType]
+)
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    return cast(re.Match[str], _JSON_WHITESPACE.match(text, pos)).end()
+
+
+def _read_json_object(
+    text: str, pos: int, on_value: Callable[[str, int], int | None]
+) -> int | None:
+    """
+    Read the JSON object starting at the given position, without decoding its
+    values: `on_value` is called with each key and the start position of its value,
+    and must return the end position of the value, or None to stop reading.
+
+    Returns:
+        The end position of the object, or None if reading was stopped.
+
+    Raises:
+        ValueError: If the text is not a valid JSON object.
+    """
+    if text[pos : pos + 1] != "{":
+        raise ValueError(f"Expected JSON object at position {pos}")
+
+    pos = _skip_whitespace(text, pos + 1)
+    if text[pos : pos + 1] == "}":
+        return pos + 1
+
+    while True:
+        if text[pos : pos + 1] != '"':
+            raise ValueError(f"Expected JSON key at position {pos}")
+        key, pos = _scanstring(text, pos + 1)
+        pos = _skip_whitespace(text, pos)
+        if text[pos : pos + 1] != ":":
+            raise ValueError(f"Expected ':' at position {pos}")
+
+        end = on_value(key, _skip_whitespace(text, pos + 1))
+        if end is None:
+            return None
+
+        pos = _skip_whitespace(text, end)
+        char = text[pos : pos + 1]
+        if char == "}":
+            return pos + 1
+        if char != ",":
+            raise ValueError(f"Expected ',' or '}}' at position {pos}")
+        pos = _skip_whitespace(text, pos + 1)
+
+
+def _read_json_fields(text: str, pos: int, keys: tuple[str, ...]) -> dict[str, Any]:
+    """
+    Decode the given fields of the JSON object starting at the given position,
+    stopping as soon as all the fields are found. Fields before the last field found
+    are decoded and dropped, fields after it are not read at all.
+
+    Args:
+        text: The JSON text.
+        pos: Start position of the object.
+        keys: Keys of the fields to decode.
+
+    Returns:
+        The decoded fields.
+    """
+    fields: dict[str, Any] = {}
+
+    def on_value(key: str, pos: int) -> int | None:
+        # values are decoded by the C decoder, skipping them in Python is several
+        # times slower
+        value, end = _json_decoder.raw_decode(text, pos)
+        if key in keys:
+            fields[key] = value
+            if len(fields) == len(keys):
+                return None
+        return end
+
+    _read_json_object(text, pos, on_value)
+    return fields
+
+
+def _read_epic_manifest(text: str) -> list[tuple[str, str]]:
+    """
+    Read the game from the content of an Epic Games launcher manifest. Reading stops
+    after the required fields, manifests can end with large lists of chunks.
+    """
+    try:
+        fields = _read_json_fields(
+            text, _skip_whitespace(text, 0), ("AppName", "InstallLocation")
+        )
+        return [(fields["AppName"], fields["InstallLocation"])]
+    except (ValueError, KeyError):
+        # malformed manifest, let json report the error
+        data = json.loads(text)
+        return [(data["AppName"], data["InstallLocation"])]
+
+
+def _read_legendary_installed(text: str) -> list[tuple[str, str]]:
+    """
+    Read the games from the content of a Legendary `installed.json` file. The file
+    only contains small entries for each game, so it is decoded at once (reading it
+    field by field is slower), and the result is cached by `_ManifestCache`.
+    """
+    installed_games = json.loads(text)
+    return [
+        (game["app_name"], game["install_path"]) for game in installed_games.values()
+    ]
+
+
+class _CacheEntry(TypedDict):
+    mtime_ns: int
+    size: int
+    games: list[tuple[str, str]]
+
+
+class _ManifestCache:
+    """
+    Games read from each manifest file, reused while the modification time and size
+    of the file do not change.
+    """
+
+    def __init__(self, entries: dict[str, _CacheEntry] | None = None):
+        self._entries = entries or {}
+        self._read: set[str] = set()
+        self.updated = False
+
+    def read(
+        self, path: Path, reader: Callable[[str], list[tuple[str, str]]]
+    ) -> list[tuple[str, Path]]:
+        """
+        Read the games from the given manifest, using the cached games if the
+        manifest did not change.
+
+        Args:
+            path: Path to the manifest.
+            reader: Function reading the games from the content of the manifest.
+
+        Returns:
+            The games of the manifest, as (app name, install location) pairs.
+        """
+        stat = fs_utils.stat(path)
+        key = str(path)
+        self._read.add(key)
+
+        entry = self._entries.get(key)
+        if (
+            entry is None
+            or entry["mtime_ns"] != stat.mtime_ns
+            or entry["size"] != stat.size
+        ):
+            games = reader(fs_utils.read_text(path))
+            entry = _CacheEntry(mtime_ns=stat.mtime_ns, size=stat.size, games=games)
+            self._entries[key] = entry
+            self.updated = True
+
+        return [(app_name, Path(location)) for app_name, location in entry["games"]]
+
+    def entries(self) -> dict[str, _CacheEntry]:
+        """
+        Returns:
+            The entries of the manifests read, without the entries of the manifests
+            that were not read (e.g., removed manifests).
+        """
+        return {k: v for k, v in self._entries.items() if k in self._read}
+
+    def pruned(self) -> bool:
+        return len(self._read) != len(self._entries)
+
+
+def _read_manifest(
+    path: Path,
+    reader: Callable[[str], list[tuple[str, str]]],
+    cache: _ManifestCache | None,
+) -> list[tuple[str, Path]]:
+    if cache is not None:
+        return cache.read(path, reader)
+    return [
+        (app_name, Path(location))
+        for app_name, location in reader(fs_utils.read_text(path))
+    ]
+
 
 def find_epic_games(
     errors: ErrorList | None = None,
+    sources: list[Path] | None = None,
+    cache: _ManifestCache | None = None,
 ) -> Iterable[tuple[str, Path]]:
     try:
         with winreg.OpenKey(
@@ -25,14 +224,16 @@ def find_epic_games(
         epic_data_path = r"%ProgramData%\Epic\EpicGamesLauncher\Data"
 
     manifests_path = Path(os.path.expandvars(epic_data_path)).joinpath("Manifests")
-    if manifests_path.exists():
-        for manifest_file_path in manifests_path.glob("*.item"):
+    if sources is not None:
+        sources.append(manifests_path)
+
+    if fs_utils.exists(manifests_path):
+        for manifest_file_path in fs_utils.glob(manifests_path, "*.item"):
+            if sources is not None:
+                sources.append(manifest_file_path)
             try:
-                with open(manifest_file_path, encoding="utf-8") as manifest_file:
-                    manifest_file_data = json.load(manifest_file)
-                yield (
-                    manifest_file_data["AppName"],
-                    Path(manifest_file_data["InstallLocation"]),
+                yield from _read_manifest(
+                    manifest_file_path, _read_epic_manifest, cache
                 )
             except (json.JSONDecodeError, KeyError) as e:
                 error_message = (
@@ -49,7 +250,10 @@ def find_epic_games(
 
 
 def find_legendary_games(
-    config_path: str | None = None, errors: ErrorList | None = None
+    config_path: str | None = None,
+    errors: ErrorList | None = None,
+    sources: list[Path] | None = None,
+    cache: _ManifestCache | None = None,
 ) -> Iterable[tuple[str, Path]]:
     # Based on legendary source:
     # https://github.com/derrod/legendary/blob/master/legendary/lfs/lgndry.py
@@ -59,12 +263,12 @@ def find_legendary_games(
         legendary_config_path = Path("~/.config/legendary").expanduser()
 
     installed_path = legendary_config_path / "installed.json"
-    if installed_path.exists():
+    if sources is not None:
+        sources.append(installed_path)
+
+    if fs_utils.exists(installed_path):
         try:
-            with open(installed_path, encoding="utf-8") as installed_file:
-                installed_games = json.load(installed_file)
-            for game in installed_games.values():
-                yield game["app_name"], Path(game["install_path"])
+            yield from _read_manifest(installed_path, _read_legendary_installed, cache)
         except (json.JSONDecodeError, AttributeError, KeyError) as e:
             error_message = (
                 f'Unable to parse installed games from Legendary/Heroic launcher: "{installed_path}"\n'
@@ -79,21 +283,96 @@ def find_legendary_games(
                 errors.append((error_message, e))
 
 
-def find_heroic_games(errors: ErrorList | None = None):
+def find_heroic_games(
+    errors: ErrorList | None = None,
+    sources: list[Path] | None = None,
+    cache: _ManifestCache | None = None,
+):
     return find_legendary_games(
-        os.path.expandvars(r"%AppData%\heroic\legendaryConfig"), errors
+        os.path.expandvars(r"%AppData%\heroic\legendaryConfig"), errors, sources, cache
     )
 
 
-def find_games(errors: ErrorList | None = None) -> dict[str, Path]:
-    return dict(
-        itertools.chain(
-            find_epic_games(errors=errors),
-            find_legendary_games(errors=errors),
-            find_heroic_games(errors=errors),
+def find_games(
+    errors: ErrorList | None = None,
+    sources: list[Path] | None = None,
+    use_cache: bool = True,
+) -> dict[str, Path]:
+    """
+    Find the games installed through the Epic Games launcher, Legendary or Heroic.
+    The three launchers are read concurrently, and manifests that did not change
+    since the previous call are not read again.
+
+    Args:
+        errors (optional): List to append errors to.
+        sources (optional): List to append the files and folders read to.
+        use_cache (optional): If False, ignore the games cached for each manifest
+            and read all manifests.
+
+    Returns:
+        A mapping from Epic Games application name to install locations.
+    """
+    cache = _ManifestCache(
+        cast(
+            dict[str, _CacheEntry] | None,
+            (use_cache and load_cache(MANIFEST_CACHE_NAME, MANIFEST_CACHE_VERSION))
+            or None,
         )
     )
 
+    def run(
+        find: Callable[..., Iterable[tuple[str, Path]]],
+    ) -> tuple[list[tuple[str, Path]], ErrorList, list[Path]]:
+        find_errors: ErrorList = []
+        find_sources: list[Path] = []
+        games = list(find(errors=find_errors, sources=find_sources, cache=cache))
+        return games, find_errors, find_sources
+
+    futures = map_concurrently(
+        "basic_games-epic",
+        run,
+        [find_epic_games, find_legendary_games, find_heroic_games],
+        3,
+    )
+
+    # results are merged in a fixed order, so that the result does not depend on
+    # which launcher is read first
+    games: dict[str, Path] = {}
+    for future in futures:
+        found_games, found_errors, found_sources = future.result()
+        games.update(found_games)
+        if errors is not None:
+            errors.extend(found_errors)
+        if sources is not None:
+            sources.extend(found_sources)
+
+    if cache.updated or cache.pruned():
+        save_cache(MANIFEST_CACHE_NAME, MANIFEST_CACHE_VERSION, cache.entries())
+
+    return games
+
+
+class EpicGamesStore(StoreProvider):
+    name = "Epic Games"
+    mapping = "epicAPPId"
+
+    def __init__(self, rescan: bool = False):
+        """
+        Args:
+            rescan (optional): If True, ignore the cached games and manifests.
+        """
+        self._rescan = rescan
+
+    def detect(self, errors: ErrorList) -> dict[str, Path]:
+        return cached_find_games(
+            self.name,
+            lambda errors, sources: find_games(
+                errors, sources, use_cache=not self._rescan
+            ),
+            errors,
+            self._rescan,
+        )
+
 
 if __name__ == "__main__":
     games = find_games()
@@ -0,0 +1,283 @@
+# -*- encoding: utf-8 -*-
+
+"""
+Filesystem access for the store utilities.
+
+The store utilities do not access the filesystem directly but through the functions
+of this module, which use the filesystem of the current detection pass (see
+`detection_pass()`). During a detection pass, folder listings and file metadata are
+cached, so that locations read by several stores (or several times by the same
+store) are only read once. A fake filesystem can also be given to run the store
+utilities without the launchers installed.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import fnmatch
+import io
+import os
+import threading
+from collections import Counter
+from collections.abc import Generator
+from contextlib import contextmanager
+from pathlib import Path
+from stat import S_ISDIR
+from typing import BinaryIO, NamedTuple
+
+
+class FileStat(NamedTuple):
+    mtime_ns: int
+    size: int
+    is_dir: bool
+
+
+class FileEntry(NamedTuple):
+    name: str
+    is_dir: bool
+
+    # metadata of the entry, if it was retrieved while listing the folder:
+    stat: FileStat | None = None
+
+
+def _file_stat(stat: os.stat_result) -> FileStat:
+    return FileStat(stat.st_mtime_ns, stat.st_size, S_ISDIR(stat.st_mode))
+
+
+class FileSystem:
+    """
+    The actual filesystem. Subclasses can override the methods to provide a fake
+    filesystem.
+    """
+
+    def stat(self, path: str) -> FileStat:
+        """
+        Retrieve the metadata of a file or folder.
+
+        Raises:
+            OSError: If the path does not exist or cannot be accessed.
+        """
+        return _file_stat(os.stat(path))
+
+    def scandir(self, path: str) -> list[FileEntry]:
+        """
+        List the content of a folder.
+
+        Raises:
+            OSError: If the folder does not exist or cannot be listed.
+        """
+        with os.scandir(path) as it:
+            return [
+                FileEntry(
+                    entry.name,
+                    entry.is_dir(),
+                    # on Windows, the metadata is retrieved with the listing:
+                    _file_stat(entry.stat()) if os.name == "nt" else None,
+                )
+                for entry in it
+            ]
+
+    def open(self, path: str) -> BinaryIO:
+        """
+        Open a file for reading, in binary mode.
+
+        Raises:
+            OSError: If the file does not exist or cannot be read.
+        """
+        return open(path, "rb")
+
+
+class CachedFileSystem(FileSystem):
+    """
+    Filesystem caching the listings and metadata retrieved from another filesystem,
+    including failures. File contents are not cached.
+    """
+
+    def __init__(self, base: FileSystem):
+        self._base = base
+        self._lock = threading.Lock()
+        self._stats: dict[str, FileStat | OSError] = {}
+        self._listings: dict[str, list[FileEntry] | OSError] = {}
+
+        # number of cached and non-cached calls, by operation (stat, scandir):
+        self.hits: Counter[str] = Counter()
+        self.misses: Counter[str] = Counter()
+
+        # number of files opened:
+        self.reads = 0
+
+    def _count(self, counter: Counter[str], operation: str):
+        with self._lock:
+            counter[operation] += 1
+
+    def stat(self, path: str) -> FileStat:
+        key = os.path.normcase(path)
+        if (result := self._stats.get(key)) is not None:
+            self._count(self.hits, "stat")
+        else:
+            self._count(self.misses, "stat")
+            try:
+                result = self._base.stat(path)
+            except OSError as e:
+                result = e
+            self._stats[key] = result
+
+        if isinstance(result, OSError):
+            raise result.with_traceback(None)
+        return result
+
+    def scandir(self, path: str) -> list[FileEntry]:
+        key = os.path.normcase(path)
+        if (result := self._listings.get(key)) is not None:
+            self._count(self.hits, "scandir")
+        else:
+            self._count(self.misses, "scandir")
+            try:
+                result = self._base.scandir(path)
+            except OSError as e:
+                result = e
+            else:
+                for entry in result:
+                    if entry.stat is not None:
+                        self._stats.setdefault(
+                            os.path.normcase(os.path.join(path, entry.name)),
+                            entry.stat,
+                        )
+            self._listings[key] = result
+
+        if isinstance(result, OSError):
+            raise result.with_traceback(None)
+        return list(result)
+
+    def open(self, path: str) -> BinaryIO:
+        with self._lock:
+            self.reads += 1
+        return self._base.open(path)
+
+    def counters(self) -> dict[str, int]:
+        """
+        Returns:
+            The hit and miss counters of each operation and the number of files
+            read, e.g., for the startup profile.
+        """
+        with self._lock:
+            return {
+                **{
+                    f"{operation}_hits": count for operation, count in self.hits.items()
+                },
+                **{
+                    f"{operation}_misses": count
+                    for operation, count in self.misses.items()
+                },
+                "reads": self.reads,
+            }
+
+
+_default_filesystem = FileSystem()
+_filesystem: contextvars.ContextVar[FileSystem] = contextvars.ContextVar(
+    "basic_games_filesystem", default=_default_filesystem
+)
+
+
+def filesystem() -> FileSystem:
+    """
+    Returns:
+        The filesystem of the current detection pass, or the actual filesystem
+        outside of detection passes.
+    """
+    return _filesystem.get()
+
+
+@contextmanager
+def detection_pass(
+    base: FileSystem | None = None,
+) -> Generator[CachedFileSystem, None, None]:
+    """
+    Cache the filesystem accesses of the store utilities in the context.
+
+    The filesystem of the pass is only used in the current context, other threads
+    keep using the actual filesystem unless they run in a copy of the context (as the
+    threads started by `store_registry` do). The context should only cover a single
+    scan of the stores, since changes made to the filesystem in the context are not
+    seen.
+
+    Args:
+        base (optional): Filesystem to cache, defaults to the current filesystem.
+            This can be used to run the store utilities on a fake filesystem.
+
+    Returns:
+        The cached filesystem, to retrieve the counters.
+    """
+    cached = CachedFileSystem(base or filesystem())
+    token = _filesystem.set(cached)
+    try:
+        yield cached
+    finally:
+        _filesystem.reset(token)
+
+
+def stat(path: Path | str) -> FileStat:
+    return filesystem().stat(str(path))
+
+
+def exists(path: Path | str) -> bool:
+    try:
+        filesystem().stat(str(path))
+    except OSError:
+        return False
+    return True
+
+
+def is_dir(path: Path | str) -> bool:
+    try:
+        return filesystem().stat(str(path)).is_dir
+    except OSError:
+        return False
+
+
+def scandir(path: Path | str) -> list[FileEntry]:
+    return filesystem().scandir(str(path))
+
+
+def iterdir(path: Path | str) -> list[Path]:
+    """
+    List the content of a folder, sorted by name.
+    """
+    path = Path(path)
+    return [path.joinpath(entry.name) for entry in sorted(scandir(path))]
+
+
+def glob(path: Path | str, pattern: str) -> list[Path]:
+    """
+    List the files and folders of a folder whose name matches the given pattern,
+    sorted by name. Unlike `Path.glob()`, patterns cannot contain separators.
+
+    Returns:
+        The matching paths, or an empty list if the folder cannot be listed.
+    """
+    path = Path(path)
+    try:
+        entries = scandir(path)
+    except OSError:
+        return []
+    return [
+        path.joinpath(entry.name)
+        for entry in sorted(entries)
+        if fnmatch.fnmatch(entry.name, pattern)
+    ]
+
+
+def open_binary(path: Path | str) -> BinaryIO:
+    return filesystem().open(str(path))
+
+
+def read_text(path: Path | str, encoding: str | None = "utf-8") -> str:
+    """
+    Read the content of a text file, with universal newlines like `open()`.
+
+    Args:
+        path: Path to the file.
+        encoding (optional): Encoding of the file, None for the locale encoding.
+    """
+    with io.TextIOWrapper(open_binary(path), encoding=encoding) as fp:
+        return fp.read()
@@ -13,6 +13,7 @@ class BG3ModDataChecker(BasicModDataChecker):
                 valid=[
                     "*.pak",
                     str(Path("Mods") / "*.pak"),  # standard mods
+                    str(Path("*") / "*.pak"),  # paks are mapped from any folder
                     "bin",  # native mods / Script Extender
                     "Script Extender",  # mods which are configured via jsons in this folder
                     "Data",  # loose file mods
@@ -34,23 +35,26 @@ class BG3ModDataChecker(BasicModDataChecker):
         status = mobase.ModDataChecker.INVALID
         rp = self._regex_patterns
         for entry in filetree:
-            name = entry.name().casefold()
-            if rp.unfold.match(name):
+            category = rp.classify(entry.name().casefold())
+            if category is not None and category[0] == "unfold":
                 if utils.is_directory(entry):
                     status = self.dataLooksValid(entry)
                 else:
                     status = mobase.ModDataChecker.INVALID
                     break
-            elif rp.valid.match(name):
+            elif category is not None and category[0] == "valid":
                 if status is mobase.ModDataChecker.INVALID:
                     status = mobase.ModDataChecker.VALID
             elif isinstance(entry, mobase.IFileTree):
+                # the patterns are matched while walking the folder, so the first child
+                # of a folder that no pattern starts with fails immediately
+                state = rp.valid_paths.step(rp.valid_paths.root, entry.name())
                 status = (
                     mobase.ModDataChecker.VALID
-                    if all(rp.valid.match(e.pathFrom(filetree)) for e in entry)
+                    if all(rp.valid_paths.accepts_child(state, e.name()) for e in entry)
                     else mobase.ModDataChecker.INVALID
                 )
-            elif rp.delete.match(name) or rp.move_match(name) is not None:
+            elif category is not None and category[0] in ("delete", "move"):
                 status = mobase.ModDataChecker.FIXABLE
             else:
                 status = mobase.ModDataChecker.INVALID
@@ -4,7 +4,7 @@ import mobase
 
 from ..basic_features import BasicLocalSavegames
 from ..basic_game import BasicGame
-from ..steam_utils import find_steam_path
+from ..steam_utils import steam_userdata
 
 
 # Lifted from https://github.com/ModOrganizer2/modorganizer-basic_games/blob/71dbb8c557d43cba9d290674a332e7ecd1650261/games/game_darkestdungeon.py
@@ -55,18 +55,11 @@ class ArkhamCityGame(BasicGame):
     def savesDirectory(self) -> QDir:
         docSaves = QDir(self.documentsDirectory().cleanPath("../../SaveData"))
         if self.is_steam():
-            if (steamDir := find_steam_path()) is None:
-                return docSaves
-            for child in steamDir.joinpath("userdata").iterdir():
-                if not child.is_dir() or child.name == "0":
-                    continue
-                steamSaves = child.joinpath("200260", "remote")
-                if steamSaves.is_dir():
+            for steamSaves in steam_userdata.cloud_save_directories(200260):
+                # skip the anonymous user
+                if steamSaves.parent.parent.name != "0":
                     return QDir(str(steamSaves))
-            else:
-                return docSaves
-        else:
-            return docSaves
+        return docSaves
 
     def init(self, organizer: mobase.IOrganizer) -> bool:
         super().init(organizer)
@@ -6,7 +6,7 @@ from PyQt6.QtCore import QDir, QFileInfo
 import mobase
 
 from ..basic_game import BasicGame, BasicGameSaveGame
-from ..steam_utils import find_steam_path
+from ..steam_utils import find_cloud_save_directory
 
 
 class DarkestDungeonModDataChecker(mobase.ModDataChecker):
@@ -203,23 +203,10 @@ class DarkestDungeonGame(BasicGame):
 
     @staticmethod
     def getCloudSaveDirectory() -> str | None:
-        steamPath = find_steam_path()
-        if steamPath is None:
+        cloudSaves = find_cloud_save_directory(262060)
+        if cloudSaves is None:
             return None
-
-        userData = steamPath.joinpath("userdata")
-        for child in userData.iterdir():
-            name = child.name
-            try:
-                userID = int(name)
-            except ValueError:
-                userID = -1
-            if userID == -1:
-                continue
-            cloudSaves = child.joinpath("262060", "remote")
-            if cloudSaves.exists() and cloudSaves.is_dir():
-                return str(cloudSaves)
-        return None
+        return str(cloudSaves)
 
     def savesDirectory(self) -> QDir:
         documentsSaves = self.documentsDirectory()
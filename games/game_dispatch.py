@@ -7,7 +7,7 @@ import mobase
 from ..basic_features import BasicLocalSavegames, BasicModDataChecker, GlobPatterns
 from ..basic_features.basic_save_game_info import BasicGameSaveGame
 from ..basic_game import BasicGame
-from ..steam_utils import find_steam_path
+from ..steam_utils import find_cloud_save_directory
 
 
 class DispatchModDataChecker(BasicModDataChecker):
@@ -63,22 +63,10 @@ class Dispatch(BasicGame, mobase.IPluginFileMapper):
     # credit to game.darkestdungeon.py
     @staticmethod
     def getCloudSaveDirectory() -> str | None:
-        steamPath = find_steam_path()
-        if steamPath is None:
+        cloudSaves = find_cloud_save_directory(2592160)
+        if cloudSaves is None:
             return None
-
-        userData = steamPath.joinpath("userdata")
-        for child in userData.iterdir():
-            name = child.name
-            try:
-                int(name)
-            except ValueError:
-                continue
-
-            cloudSaves = child.joinpath("2592160/remote")
-            if cloudSaves.exists() and cloudSaves.is_dir():
-                return str(cloudSaves)
-        return None
+        return str(cloudSaves)
 
     def savesDirectory(self) -> QDir:
         return QDir(self.getCloudSaveDirectory())
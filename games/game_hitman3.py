@@ -1,11 +1,14 @@
 import os
-import shutil
 import json
 import mobase
 
 from pathlib import Path
 from functools import cached_property
 
+from ..basic_features.archive_restructurer import (
+    ArchiveRestructurer,
+    move_overwrite_merge,
+)
 from ..basic_game import BasicGame
 
 from PyQt6.QtCore import QDir, QFileInfo
@@ -18,19 +21,6 @@ class Hitman3ModDataChecker(mobase.ModDataChecker):
         self.organizer.modList().onModInstalled(self._Fix_Installed_Mod)
         self.needsNameFix = False
 
-    def move_overwrite_merge(self, source, destination):
-        if not os.path.exists(destination):
-            shutil.move(source, destination)
-            return
-        if os.path.isfile(source):
-            os.replace(source, destination)
-            return
-        for item in os.listdir(source):
-            s_item = os.path.join(source, item)
-            d_item = os.path.join(destination, item)
-            self.move_overwrite_merge(s_item, d_item)
-        os.rmdir(source)
-
     def _Fix_Installed_Mod(self, mod: mobase.IModInterface):
         if not self.needsNameFix:
             return
@@ -44,7 +34,7 @@ class Hitman3ModDataChecker(mobase.ModDataChecker):
             modname = mod_data["id"]
             old_path = os.path.join(path, GameSMMPath + "/Mods/FOLDERNAME")
             new_path = os.path.join(path, GameSMMPath + f"/Mods/{modname}")
-            self.move_overwrite_merge(old_path, new_path)
+            move_overwrite_merge(old_path, new_path)
             fixed = True
         if not fixed:
             return
@@ -55,37 +45,20 @@ class Hitman3ModDataChecker(mobase.ModDataChecker):
             return mobase.ModDataChecker.VALID
         return mobase.ModDataChecker.FIXABLE
 
-    def fileExistsInNextSubDir(self, filetree: mobase.IFileTree, name: str):
-        for branch in filetree:
-            if branch is not None and branch.isDir():
-                for e in branch:
-                    if e is not None and e.name() == name:
-                        return True
-        return False
-
-    def allMoveTo(self, filetree: mobase.IFileTree, toMoveTo: str):
-        entriesToMove: list[mobase.FileTreeEntry] = []
-        retVal = 0
-        for e in filetree:
-            if e is not None:
-                entriesToMove.append(e)
-        for e in entriesToMove:
-            filetree.move(e, toMoveTo, mobase.IFileTree.MERGE)
-            retVal = 1
-        return retVal
-
     def fix(self, filetree: mobase.IFileTree) -> mobase.IFileTree:
         GameSMMPath = self.organizer.managedGame().GameSMMPath
         treefixed = 0
-        if filetree.exists("manifest.json", mobase.IFileTree.FILE):
-            treefixed = self.allMoveTo(filetree, GameSMMPath + "/Mods/FOLDERNAME/")
-            if treefixed == 1:
+        restructurer = ArchiveRestructurer(filetree)
+        if restructurer.index.has_file("manifest.json"):
+            if restructurer.move_all(GameSMMPath + "/Mods/FOLDERNAME/"):
+                treefixed = 1
                 self.needsNameFix = True
         if treefixed == 0:
-            if len(filetree) == 1:
-                filetree = filetree.find(filetree[0].path("/"))
-                treefixed = self.allMoveTo(filetree, GameSMMPath + "/Mods/FOLDERNAME/")
-                if treefixed == 1:
+            if len(restructurer.index.entries) == 1:
+                filetree = filetree.find(restructurer.index.entries[0].path("/"))
+                restructurer = ArchiveRestructurer(filetree)
+                if restructurer.move_all(GameSMMPath + "/Mods/FOLDERNAME/"):
+                    treefixed = 1
                     self.needsNameFix = True
         if treefixed == 0:
             return None
@@ -1,11 +1,14 @@
 from functools import cached_property
 from pathlib import Path
 import os
-import shutil
 
 import mobase
 from PyQt6.QtCore import QDir, QFileInfo
 
+from ..basic_features.archive_restructurer import (
+    ArchiveRestructurer,
+    move_overwrite_merge,
+)
 from ..basic_game import BasicGame
 
 
@@ -16,19 +19,6 @@ class NoitaModDataChecker(mobase.ModDataChecker):
         self.organizer.modList().onModInstalled(self._Fix_Installed_Mod)
         self.needsNameFix = False
 
-    def move_overwrite_merge(self, source, destination):
-        if not os.path.exists(destination):
-            shutil.move(source, destination)
-            return
-        if os.path.isfile(source):
-            os.replace(source, destination)
-            return
-        for item in os.listdir(source):
-            s_item = os.path.join(source, item)
-            d_item = os.path.join(destination, item)
-            self.move_overwrite_merge(s_item, d_item)
-        os.rmdir(source)
-
     def _Fix_Installed_Mod(self, mod: mobase.IModInterface):
         if not self.needsNameFix:
             return
@@ -42,7 +32,7 @@ class NoitaModDataChecker(mobase.ModDataChecker):
             path = mod.absolutePath()
             old_path = os.path.join(path, GameModsPath + "/FOLDERNAME")
             new_path = os.path.join(path, GameModsPath + f"/{modname}")
-            self.move_overwrite_merge(old_path, new_path)
+            move_overwrite_merge(old_path, new_path)
             fixed = True
         if not fixed:
             return
@@ -55,33 +45,15 @@ class NoitaModDataChecker(mobase.ModDataChecker):
             return mobase.ModDataChecker.VALID
         return mobase.ModDataChecker.FIXABLE
 
-    def fileExistsInNextSubDir(self, filetree: mobase.IFileTree, name: str):
-        for branch in filetree:
-            if branch is not None and branch.isDir():
-                for e in branch:
-                    if e is not None and e.name() == name:
-                        return True
-        return False
-
-    def allMoveTo(self, filetree: mobase.IFileTree, toMoveTo: str):
-        entriesToMove: list[mobase.FileTreeEntry] = []
-        retVal = 0
-        for e in filetree:
-            if e is not None:
-                entriesToMove.append(e)
-        for e in entriesToMove:
-            filetree.move(e, toMoveTo, mobase.IFileTree.MERGE)
-            retVal = 1
-        return retVal
-
     def fix(self, filetree: mobase.IFileTree) -> mobase.IFileTree:
         GameModsPath = self.organizer.managedGame().GameModsPath
         treefixed = 0
-        if filetree.exists("mod.xml", mobase.IFileTree.FILE):
-            treefixed = self.allMoveTo(filetree, GameModsPath + "/FOLDERNAME/")
-            if treefixed == 1:
+        restructurer = ArchiveRestructurer(filetree)
+        if restructurer.index.has_file("mod.xml"):
+            if restructurer.move_all(GameModsPath + "/FOLDERNAME/"):
+                treefixed = 1
                 self.needsNameFix = True
-        if self.fileExistsInNextSubDir(filetree, "mod.xml"):
+        if restructurer.index.in_subdirectory("mod.xml"):
             filetree.move(filetree[0], GameModsPath + "/", mobase.IFileTree.MERGE)
             treefixed = 1
         if treefixed == 0:
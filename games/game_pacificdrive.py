@@ -9,6 +9,7 @@ import mobase
 from PyQt6.QtCore import QDir, QFileInfo
 from PyQt6.QtWidgets import QMainWindow, QTabWidget, QWidget
 
+from ..basic_features.archive_restructurer import ArchiveRestructurer
 from ..basic_game import BasicGame
 from .unreal_tabs.constants import DEFAULT_UE4SS_MODS, UE4SSModInfo
 from .unreal_tabs.manage_paks.widget import PaksTabWidget
@@ -68,19 +69,6 @@ class PacificDriveModDataChecker(mobase.ModDataChecker):
         super().__init__()
         self.organizer: mobase.IOrganizer = organizer
 
-    def move_overwrite_merge(self, source, destination):
-        if not os.path.exists(destination):
-            shutil.move(source, destination)
-            return
-        if os.path.isfile(source):
-            os.replace(source, destination)
-            return
-        for item in os.listdir(source):
-            s_item = os.path.join(source, item)
-            d_item = os.path.join(destination, item)
-            self.move_overwrite_merge(s_item, d_item)
-        os.rmdir(source)
-
     def dataLooksValid(self, filetree: mobase.IFileTree) -> mobase.ModDataChecker.CheckReturn:
         GameDataUE4SSMods = self.organizer.managedGame().GameDataUE4SSMods
         GameDataPakMods = self.organizer.managedGame().GameDataPakMods
@@ -93,75 +81,49 @@ class PacificDriveModDataChecker(mobase.ModDataChecker):
             return mobase.ModDataChecker.VALID
         return mobase.ModDataChecker.FIXABLE
 
-    def fileExistsInNextSubDir(self, filetree: mobase.IFileTree, name: str):
-        for branch in filetree:
-            if branch is not None and branch.isDir():
-                for e in branch:
-                    if e is not None and e.name() == name:
-                        return True
-        return False
-
-    def allMoveTo(self, filetree: mobase.IFileTree, toMoveTo: str):
-        entriesToMove: list[mobase.FileTreeEntry] = []
-        retVal = 0
-        for e in filetree:
-            if e is not None:
-                entriesToMove.append(e)
-        for e in entriesToMove:
-            filetree.move(e, toMoveTo, mobase.IFileTree.MERGE)
-            retVal = 1
-        return retVal
-
     def fix(self, filetree: mobase.IFileTree) -> mobase.IFileTree:
         GameDataUE4SSMods = self.organizer.managedGame().GameDataUE4SSMods + "/"
         GameDataPakMods = self.organizer.managedGame().GameDataPakMods + "/"
         GameDataMovies = self.organizer.managedGame().GameDataMovieMods + "/"
         treefixed = 0
-        if filetree.exists("UE4SS.dll", mobase.IFileTree.FILE):
-            treefixed = self.allMoveTo(filetree, os.path.dirname(os.path.dirname(GameDataUE4SSMods)) + "/")
-            if treefixed == 1:
+        restructurer = ArchiveRestructurer(filetree)
+        index = restructurer.index
+        if index.has_file("UE4SS.dll"):
+            if restructurer.move_all(os.path.dirname(os.path.dirname(GameDataUE4SSMods)) + "/"):
                 return filetree
-        if filetree.exists("Scripts", mobase.IFileTree.DIRECTORY) or filetree.exists("dlls", mobase.IFileTree.DIRECTORY):
-            treefixed = self.allMoveTo(filetree, GameDataUE4SSMods)
-            if treefixed == 1:
+        if index.has_directory("Scripts") or index.has_directory("dlls"):
+            if restructurer.move_all(GameDataUE4SSMods):
                 return filetree
         if treefixed == 0:
             allowedUnzippedExt = ["pak", "utoc", "ucas", "bk2", "dll"]
+            unzippedTargets = {
+                "pak": GameDataPakMods,
+                "utoc": GameDataPakMods,
+                "ucas": GameDataPakMods,
+                "dll": os.path.dirname(GameDataUE4SSMods) + "/",
+                "bk2": GameDataMovies,
+            }
             entriesToMove: list[mobase.FileTreeEntry] = []
-            for e in filetree:
-                if e is not None:
-                    if e.isFile():
-                        fileext = e.suffix().casefold()
-                        if fileext in allowedUnzippedExt:
-                            mod_name = filetree.name()
-                            if mod_name == "":
-                                mod_name = e.name()
-                            mod_path = os.path.join(self.organizer.modsPath(), mod_name)
-                            if filetree.createOrphanTree("OrphanTree") is None and os.path.exists(mod_path):
-                                match e.suffix().casefold():
-                                    case "pak" | "utoc" | "ucas":
-                                        os.makedirs(os.path.join(mod_path, GameDataPakMods), exist_ok=True)
-                                        shutil.move(os.path.join(mod_path, e.name()), os.path.join(mod_path, GameDataPakMods, e.name()))
-                                    case "bk2":
-                                        os.makedirs(os.path.join(mod_path, GameDataMovies), exist_ok=True)
-                                        shutil.move(os.path.join(mod_path, e.name()), os.path.join(mod_path, GameDataMovies, e.name()))
-                                    case _:
-                                        pass
-                                treefixed = 1
-                            else:
-                                entriesToMove.append(e)
-            if entriesToMove is not None:
-                for e in entriesToMove:
+            for e in restructurer.index.files_with_suffix(*allowedUnzippedExt):
+                mod_name = filetree.name()
+                if mod_name == "":
+                    mod_name = e.name()
+                mod_path = os.path.join(self.organizer.modsPath(), mod_name)
+                if filetree.createOrphanTree("OrphanTree") is None and os.path.exists(mod_path):
                     match e.suffix().casefold():
                         case "pak" | "utoc" | "ucas":
-                            filetree.move(e, GameDataPakMods, mobase.IFileTree.MERGE)
-                        case "dll":
-                            filetree.move(e, os.path.dirname(GameDataUE4SSMods) + "/", mobase.IFileTree.MERGE)
+                            os.makedirs(os.path.join(mod_path, GameDataPakMods), exist_ok=True)
+                            shutil.move(os.path.join(mod_path, e.name()), os.path.join(mod_path, GameDataPakMods, e.name()))
                         case "bk2":
-                            filetree.move(e, GameDataMovies, mobase.IFileTree.MERGE)
+                            os.makedirs(os.path.join(mod_path, GameDataMovies), exist_ok=True)
+                            shutil.move(os.path.join(mod_path, e.name()), os.path.join(mod_path, GameDataMovies, e.name()))
                         case _:
                             pass
-                treefixed = 1
+                    treefixed = 1
+                else:
+                    entriesToMove.append(e)
+            restructurer.execute((e, unzippedTargets[e.suffix().casefold()]) for e in entriesToMove)
+            treefixed = 1
         if treefixed == 0:
             return None
         return filetree
@@ -7,6 +7,10 @@ import shutil
 import mobase
 from PyQt6.QtCore import QDir, QFileInfo
 
+from ..basic_features.archive_restructurer import (
+    ArchiveRestructurer,
+    move_overwrite_merge,
+)
 from ..basic_game import BasicGame
 
 class Content(IntEnum):
@@ -64,19 +68,6 @@ class Payday2ModDataChecker(mobase.ModDataChecker):
         self.organizer.modList().onModInstalled(self._Fix_Installed_Mod)
         self.needsNameFix = False
 
-    def move_overwrite_merge(self, source, destination):
-        if not os.path.exists(destination):
-            shutil.move(source, destination)
-            return
-        if os.path.isfile(source):
-            os.replace(source, destination)
-            return
-        for item in os.listdir(source):
-            s_item = os.path.join(source, item)
-            d_item = os.path.join(destination, item)
-            self.move_overwrite_merge(s_item, d_item)
-        os.rmdir(source)
-
     def _Fix_Installed_Mod(self, mod: mobase.IModInterface):
         if not self.needsNameFix:
             return
@@ -87,19 +78,19 @@ class Payday2ModDataChecker(mobase.ModDataChecker):
             path = mod.absolutePath()
             old_path = os.path.join(path, "mods/FOLDERNAME")
             new_path = os.path.join(path, f"mods/{modname}")
-            self.move_overwrite_merge(old_path, new_path)
+            move_overwrite_merge(old_path, new_path)
             fixed = True
         elif filetree is not None and filetree.exists("assets/mod_overrides/FOLDERNAME", mobase.IFileTree.DIRECTORY):
             path = mod.absolutePath()
             old_path = os.path.join(path, "assets/mod_overrides/FOLDERNAME")
             new_path = os.path.join(path, f"assets/mod_overrides/{modname}")
-            self.move_overwrite_merge(old_path, new_path)
+            move_overwrite_merge(old_path, new_path)
             fixed = True
         elif filetree is not None and filetree.exists("maps/FOLDERNAME", mobase.IFileTree.DIRECTORY):
             path = mod.absolutePath()
             old_path = os.path.join(path, "maps/FOLDERNAME")
             new_path = os.path.join(path, f"maps/{modname}")
-            self.move_overwrite_merge(old_path, new_path)
+            move_overwrite_merge(old_path, new_path)
             fixed = True
         if not fixed:
             return
@@ -118,51 +109,33 @@ class Payday2ModDataChecker(mobase.ModDataChecker):
             return mobase.ModDataChecker.VALID
         return mobase.ModDataChecker.FIXABLE
 
-    def fileExistsInNextSubDir(self, filetree: mobase.IFileTree, name: str):
-        for branch in filetree:
-            if branch is not None and branch.isDir():
-                for e in branch:
-                    if e is not None and e.name() == name:
-                        return True
-        return False
-
-    def allMoveTo(self, filetree: mobase.IFileTree, toMoveTo: str):
-        entriesToMove: list[mobase.FileTreeEntry] = []
-        retVal = 0
-        for e in filetree:
-            if e is not None:
-                entriesToMove.append(e)
-        for e in entriesToMove:
-            filetree.move(e, toMoveTo, mobase.IFileTree.MERGE)
-            retVal = 1
-        return retVal
-
     def fix(self, filetree: mobase.IFileTree) -> mobase.IFileTree:
         treefixed = 0
 
-        if filetree.exists("mod.txt", mobase.IFileTree.FILE):
-            treefixed = self.allMoveTo(filetree, "mods/FOLDERNAME/")
-            if treefixed == 1:
+        restructurer = ArchiveRestructurer(filetree)
+        index = restructurer.index
+        if index.has_file("mod.txt"):
+            if restructurer.move_all("mods/FOLDERNAME/"):
+                treefixed = 1
                 self.needsNameFix = True
-        elif self.fileExistsInNextSubDir(filetree, "mod.txt"):
+        elif index.in_subdirectory("mod.txt"):
             filetree.move(filetree[0], "mods/", mobase.IFileTree.MERGE)
             treefixed = 1
-        elif self.fileExistsInNextSubDir(filetree, "main.xml"):
-            if self.fileExistsInNextSubDir(filetree, "levels"):
+        elif index.in_subdirectory("main.xml"):
+            if index.in_subdirectory("levels"):
                 filetree.move(filetree[0], "maps/", mobase.IFileTree.MERGE)
                 treefixed = 1
             else:
                 filetree.move(filetree[0], "assets/mod_overrides/", mobase.IFileTree.MERGE)
                 treefixed = 1
-        elif filetree.exists("main.xml", mobase.IFileTree.FILE):
-            if filetree.exists("levels", mobase.IFileTree.DIRECTORY):
-                treefixed = self.move_overwrite_merge(filetree, "maps/FOLDERNAME")
-                if treefixed == 1:
-                    self.needsNameFix = True
+        elif index.has_file("main.xml"):
+            if index.has_directory("levels"):
+                target = "maps/FOLDERNAME/"
             else:
-                treefixed = self.allMoveTo(filetree, "assets/mod_overrides/FOLDERNAME/")
-                if treefixed == 1:
-                    self.needsNameFix = True
+                target = "assets/mod_overrides/FOLDERNAME/"
+            if restructurer.move_all(target):
+                treefixed = 1
+                self.needsNameFix = True
         else:
             try:
                 if filetree[0][0].exists("mod.txt", mobase.IFileTree.FILE):
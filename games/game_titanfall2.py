@@ -3,11 +3,14 @@ from functools import cached_property
 import json
 from pathlib import Path
 import os
-import shutil
 
 import mobase
 from PyQt6.QtCore import QDir, QFileInfo
 
+from ..basic_features.archive_restructurer import (
+    ArchiveRestructurer,
+    move_overwrite_merge,
+)
 from ..basic_game import BasicGame
 
 
@@ -77,19 +80,6 @@ class Titanfall2ModDataChecker(mobase.ModDataChecker):
         self.organizer.modList().onModInstalled(self._Fix_Installed_Mod)
         self.needsNameFix = False
 
-    def move_overwrite_merge(self, source, destination):
-        if not os.path.exists(destination):
-            shutil.move(source, destination)
-            return
-        if os.path.isfile(source):
-            os.replace(source, destination)
-            return
-        for item in os.listdir(source):
-            s_item = os.path.join(source, item)
-            d_item = os.path.join(destination, item)
-            self.move_overwrite_merge(s_item, d_item)
-        os.rmdir(source)
-
     def _Fix_Installed_Mod(self, mod: mobase.IModInterface):
         if not self.needsNameFix:
             return
@@ -106,7 +96,7 @@ class Titanfall2ModDataChecker(mobase.ModDataChecker):
             modname = mod_data["name"]
             old_path = os.path.join(path, northstarModPath + "FOLDERNAME")
             new_path = os.path.join(path, northstarModPath + f"{modname}")
-            self.move_overwrite_merge(old_path, new_path)
+            move_overwrite_merge(old_path, new_path)
             fixed = True
         elif filetree is not None and filetree.exists(
             northstarModPath + "FOLDERNAME_NAME", mobase.IFileTree.DIRECTORY
@@ -114,7 +104,7 @@ class Titanfall2ModDataChecker(mobase.ModDataChecker):
             path = mod.absolutePath()
             old_path = os.path.join(path, northstarModPath + "FOLDERNAME_NAME")
             new_path = os.path.join(path, northstarModPath + f"{modname}")
-            self.move_overwrite_merge(old_path, new_path)
+            move_overwrite_merge(old_path, new_path)
             fixed = True
         if not fixed:
             return
@@ -127,33 +117,15 @@ class Titanfall2ModDataChecker(mobase.ModDataChecker):
             return mobase.ModDataChecker.VALID
         return mobase.ModDataChecker.FIXABLE
 
-    def fileExistsInNextSubDir(self, filetree: mobase.IFileTree, name: str):
-        for branch in filetree:
-            if branch is not None and branch.isDir():
-                for e in branch:
-                    if e is not None and e.name() == name:
-                        return True
-        return False
-
-    def allMoveTo(self, filetree: mobase.IFileTree, toMoveTo: str):
-        entriesToMove: list[mobase.FileTreeEntry] = []
-        retVal = 0
-        for e in filetree:
-            if e is not None:
-                entriesToMove.append(e)
-        for e in entriesToMove:
-            filetree.move(e, toMoveTo, mobase.IFileTree.MERGE)
-            retVal = 1
-        return retVal
-
     def fix(self, filetree: mobase.IFileTree) -> mobase.IFileTree:
         northstarModPath = self.organizer.managedGame().GameNorthstarPath + "/"
         treefixed = 0
-        if filetree.exists("mod.json", mobase.IFileTree.FILE):
-            treefixed = self.allMoveTo(filetree, northstarModPath + "FOLDERNAME/")
-            if treefixed == 1:
+        restructurer = ArchiveRestructurer(filetree)
+        if restructurer.index.has_file("mod.json"):
+            if restructurer.move_all(northstarModPath + "FOLDERNAME/"):
+                treefixed = 1
                 self.needsNameFix = True
-        elif self.fileExistsInNextSubDir(filetree, "mod.json"):
+        elif restructurer.index.in_subdirectory("mod.json"):
             filetree.move(filetree[0], northstarModPath, mobase.IFileTree.MERGE)
             treefixed = 1
         else:
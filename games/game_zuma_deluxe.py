@@ -3,12 +3,16 @@ from functools import cached_property
 from pathlib import Path
 import os
 import re
-import shutil
 
 import mobase
 from PyQt6.QtCore import QDir, QFileInfo
 
 from ..basic_features import BasicGameSaveGameInfo
+from ..basic_features.archive_restructurer import (
+    ArchiveRestructurer,
+    FileTreeIndex,
+    move_overwrite_merge,
+)
 from ..basic_game import BasicGame
 
 
@@ -70,19 +74,6 @@ class ZumaModDataChecker(mobase.ModDataChecker):
         self.organizer.modList().onModInstalled(self._Fix_Installed_Mod)
         self.needsNameFix = False
 
-    def move_overwrite_merge(self, source, destination):
-        if not os.path.exists(destination):
-            shutil.move(source, destination)
-            return
-        if os.path.isfile(source):
-            os.replace(source, destination)
-            return
-        for item in os.listdir(source):
-            s_item = os.path.join(source, item)
-            d_item = os.path.join(destination, item)
-            self.move_overwrite_merge(s_item, d_item)
-        os.rmdir(source)
-
     def _Fix_Installed_Mod(self, mod: mobase.IModInterface):
         if not self.needsNameFix:
             return
@@ -95,7 +86,7 @@ class ZumaModDataChecker(mobase.ModDataChecker):
             path = mod.absolutePath()
             old_path = os.path.join(path, "mods/FOLDERNAME")
             new_path = os.path.join(path, f"mods/{modname}")
-            self.move_overwrite_merge(old_path, new_path)
+            move_overwrite_merge(old_path, new_path)
             fixed = True
         if not fixed:
             return
@@ -114,38 +105,13 @@ class ZumaModDataChecker(mobase.ModDataChecker):
             "userdata",
         ]
         validFiles = ["exe"]
-        for e in filetree:
-            if e.isDir():
-                for folder in validFolders:
-                    if filetree.exists(folder, mobase.IFileTree.DIRECTORY):
-                        return mobase.ModDataChecker.VALID
-            elif e.isFile():
-                for ext in validFiles:
-                    if e.suffix().lower() == ext:
-                        return mobase.ModDataChecker.VALID
-            else:
-                pass
+        index = FileTreeIndex(filetree)
+        if any(index.has_directory(folder) for folder in validFolders):
+            return mobase.ModDataChecker.VALID
+        if index.files_with_suffix(*validFiles):
+            return mobase.ModDataChecker.VALID
         return mobase.ModDataChecker.FIXABLE
 
-    def fileExistsInNextSubDir(self, filetree: mobase.IFileTree, name: str):
-        for branch in filetree:
-            if branch is not None and branch.isDir():
-                for e in branch:
-                    if e is not None and e.name() == name:
-                        return True
-        return False
-
-    def allMoveTo(self, filetree: mobase.IFileTree, toMoveTo: str):
-        entriesToMove: list[mobase.FileTreeEntry] = []
-        retVal = 0
-        for e in filetree:
-            if e is not None:
-                entriesToMove.append(e)
-        for e in entriesToMove:
-            filetree.move(e, toMoveTo, mobase.IFileTree.MERGE)
-            retVal = 1
-        return retVal
-
     def fix(self, filetree: mobase.IFileTree) -> mobase.IFileTree:
         GameLevelsPath = self.organizer.managedGame().GameLevelsPath
         validFolders = [
@@ -157,31 +123,21 @@ class ZumaModDataChecker(mobase.ModDataChecker):
             "properties",
             "userdata",
         ]
-        entriesToMove: list[mobase.FileTreeEntry] = []
         treefixed = 0
-        if filetree.exists("map.txt", mobase.IFileTree.FILE):
-            treefixed = self.allMoveTo(filetree, GameLevelsPath + "/FOLDERNAME/")
-            if treefixed == 1:
+        restructurer = ArchiveRestructurer(filetree)
+        index = restructurer.index
+        if index.has_file("map.txt"):
+            if restructurer.move_all(GameLevelsPath + "/FOLDERNAME/"):
+                treefixed = 1
                 self.needsNameFix = True
-        elif self.fileExistsInNextSubDir(filetree, "map.txt"):
+        elif index.in_subdirectory("map.txt"):
             filetree.move(filetree[0], GameLevelsPath, mobase.IFileTree.MERGE)
             treefixed = 1
-        else:
-            moveonce = 0
-            for branch in filetree:
-                if branch is not None and branch.isDir():
-                    for entry in branch:
-                        for folder in validFolders:
-                            if entry is not None and entry.name() == folder:
-                                moveonce = 1
-            if moveonce == 1:
-                for branch in filetree:
-                    if branch is not None and branch.isDir():
-                        for entry in branch:
-                            entriesToMove.append(entry)
-        if entriesToMove is not None:
-            for e in entriesToMove:
-                filetree.move(e, "", mobase.IFileTree.MERGE)
+        elif any(index.in_subdirectory(folder) for folder in validFolders):
+            # move the content of the folders to the root
+            if restructurer.execute(
+                (entry, "") for entry in index.subdirectory_entries()
+            ):
                 treefixed = 1
         for branch in filetree:
             if branch is not None and branch.isDir():
@@ -4,6 +4,8 @@
 import winreg
 from pathlib import Path
 
+from .store_registry import ErrorList, NumericIdStoreProvider
+
 
 def find_games() -> dict[str, Path]:
     # List the game IDs from the registry:
@@ -33,3 +35,12 @@ def find_games() -> dict[str, Path]:
             pass
 
     return games
+
+
+class GogStore(NumericIdStoreProvider):
+    name = "GOG"
+    mapping = "gogAPPId"
+
+    def detect(self, errors: ErrorList) -> dict[str, Path]:
+        # GOG games are read from the registry, which is cheap, so not cached
+        return find_games()
@@ -3,14 +3,30 @@
 # Heavily influenced by https://github.com/erri120/GameFinder
 
 import os
+import sys
 import threading
 import time
 from collections.abc import Sequence
 from pathlib import Path
+from typing import Any, cast
 from urllib import parse
 
 import psutil
 
+from . import fs_utils
+from .cache_utils import cached_find_games, load_cache, path_signature, save_cache
+from .store_registry import ErrorList, StoreProvider
+
+# Maximum depth of the manifests in the LocalContent folder (1 being the files directly
+# in LocalContent), manifests are usually stored as LocalContent/<game>/<id>.mfst or
+# LocalContent/<game>/<sub>/<id>.mfst and deeper folders only contain downloaded
+# content:
+MANIFEST_MAX_DEPTH = 3
+
+# Cache of the manifests found in the LocalContent folder, see find_manifests:
+MANIFEST_CACHE_NAME = "origin_manifests"
+MANIFEST_CACHE_VERSION = 1
+
 
 class OriginWatcher:
     """
@@ -62,10 +78,117 @@ class OriginWatcher:
             time.sleep(1)
 
 
-def find_games() -> dict[str, Path]:
+def _walk_manifests(
+    local_content_path: Path, max_depth: int | None
+) -> tuple[list[Path], dict[str, tuple[int, int] | None]]:
+    """
+    List the manifests in the given folder, up to the given depth (1 being the files
+    directly in the folder). With a maximum depth, subfolders of a folder containing
+    manifests are not walked, except for the given folder itself.
+
+    Returns:
+        The manifests found, and the signature of each folder walked.
+    """
+    manifests: list[Path] = []
+    folders: dict[str, tuple[int, int] | None] = {}
+
+    def walk(path: str, depth: int):
+        # the signature is computed before listing, so that a change made during the
+        # walk is detected on the next call
+        folders[path] = path_signature(path)
+        try:
+            entries = sorted(fs_utils.scandir(path))
+        except OSError:
+            return
+
+        found = [
+            Path(path, entry.name)
+            for entry in entries
+            if entry.name.lower().endswith(".mfst") and not entry.is_dir
+        ]
+        manifests.extend(found)
+        if max_depth is not None and ((found and depth > 1) or depth >= max_depth):
+            return
+
+        for entry in entries:
+            if entry.is_dir:
+                walk(os.path.join(path, entry.name), depth + 1)
+
+    walk(str(local_content_path), 1)
+    return manifests, folders
+
+
+def find_manifests(
+    local_content_path: Path,
+    max_depth: int | None = MANIFEST_MAX_DEPTH,
+    use_cache: bool = True,
+) -> tuple[list[Path], list[Path]]:
+    """
+    Find the Origin manifests in the given folder.
+
+    With a maximum depth, only the folders up to that depth are walked and the list
+    of manifests is cached until one of the walked folders changes. Without, the
+    whole folder is walked, including downloaded content.
+
+    Args:
+        local_content_path: Path to the Origin LocalContent folder.
+        max_depth (optional): Maximum depth of the manifests, or None to look for
+            manifests in all subfolders.
+        use_cache (optional): If False, ignore the cached list of manifests and walk
+            the folder again (the new list is still cached).
+
+    Returns:
+        The manifests found, and the folders walked to find them (including the given
+        folder), whose changes can add or remove manifests.
+    """
+    if max_depth is None:
+        manifests, folders = _walk_manifests(local_content_path, None)
+        return manifests, [Path(folder) for folder in folders]
+
+    key = [str(local_content_path), max_depth]
+    if use_cache and (data := load_cache(MANIFEST_CACHE_NAME, MANIFEST_CACHE_VERSION)):
+        try:
+            cached = cast(dict[str, Any], data)
+            folders = cast(dict[str, list[int] | None], cached["folders"])
+            if cached["key"] == key and all(
+                path_signature(path) == (tuple(signature) if signature else None)
+                for path, signature in folders.items()
+            ):
+                return (
+                    [Path(path) for path in cast(list[str], cached["manifests"])],
+                    [Path(folder) for folder in folders],
+                )
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Ignoring invalid Origin manifests cache: {e}", file=sys.stderr)
+
+    manifests, folders = _walk_manifests(local_content_path, max_depth)
+    save_cache(
+        MANIFEST_CACHE_NAME,
+        MANIFEST_CACHE_VERSION,
+        {
+            "key": key,
+            "folders": folders,
+            "manifests": [str(manifest) for manifest in manifests],
+        },
+    )
+    return manifests, [Path(folder) for folder in folders]
+
+
+def find_games(
+    sources: list[Path] | None = None,
+    max_depth: int | None = MANIFEST_MAX_DEPTH,
+    use_cache: bool = True,
+) -> dict[str, Path]:
     """
     Find the list of Origin games installed.
 
+    Args:
+        sources (optional): List to append the files and folders read to.
+        max_depth (optional): Maximum depth of the manifests in the LocalContent
+            folder, or None to look for manifests in all subfolders. See
+            `find_manifests()`.
+        use_cache (optional): If False, ignore the cached list of manifests.
+
     Returns:
         A mapping from Origin manifest IDs to install locations for available
         Origin games.
@@ -74,14 +197,23 @@ def find_games() -> dict[str, Path]:
 
     program_data_path = os.path.expandvars("%PROGRAMDATA%")
     local_content_path = Path(program_data_path).joinpath("Origin", "LocalContent")
-    for manifest in local_content_path.glob("**/*.mfst"):
+    manifests, folders = find_manifests(local_content_path, max_depth, use_cache)
+
+    # a manifest added to any of the walked folders must invalidate the cached games,
+    # not only to LocalContent or the folders of the manifests already found
+    if sources is not None:
+        sources.extend(folders)
+
+    for manifest in manifests:
         # Skip any manifest file with '@steam'
         if "@steam" in manifest.name.lower():
             continue
 
+        if sources is not None:
+            sources.append(manifest)
+
         # Read the file and look for &id= and &dipinstallpath=
-        with open(manifest, "r") as f:
-            manifest_query = f.read()
+        manifest_query = fs_utils.read_text(manifest, encoding=None)
         url = parse.urlparse(manifest_query)
         query = parse.parse_qs(url.query)
         if "id" not in query:
@@ -98,6 +230,28 @@ def find_games() -> dict[str, Path]:
     return games
 
 
+class OriginStore(StoreProvider):
+    name = "Origin"
+    mapping = "originManifestIds"
+
+    def __init__(self, rescan: bool = False):
+        """
+        Args:
+            rescan (optional): If True, ignore the cached games and manifests.
+        """
+        self._rescan = rescan
+
+    def detect(self, errors: ErrorList) -> dict[str, Path]:
+        return cached_find_games(
+            self.name,
+            lambda errors, sources: find_games(
+                sources=sources, use_cache=not self._rescan
+            ),
+            errors,
+            self._rescan,
+        )
+
+
 if __name__ == "__main__":
     games = find_games()
     for k, v in games.items():
@@ -0,0 +1,379 @@
+# -*- encoding: utf-8 -*-
+
+"""
+Static index of the python game plugins from the `games` folder.
+
+The manifest is built by parsing (not importing) each `games/*.py` module and
+is cached on disk until one of the modules changes. Game plugins that are only
+made of constant attributes (e.g. `GameName = "..."`) can be created directly from
+the manifest, so their module is never imported.
+
+INI game definitions (`games/*.ini`) are compiled and validated in the same way, so
+they are only read again when they change.
+"""
+
+from __future__ import annotations
+
+import ast
+import configparser
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, TypeVar, cast
+
+from .cache_utils import load_cache, save_cache
+
+MANIFEST_CACHE_NAME = "plugin_manifest"
+MANIFEST_VERSION = 1
+
+INI_GAMES_CACHE_NAME = "ini_games"
+INI_GAMES_VERSION = 1
+
+# keys without default values in BasicGameMappings, that INI games must define:
+_REQUIRED_INI_KEYS = (
+    "Name",
+    "Author",
+    "Version",
+    "GameName",
+    "GameShortName",
+    "GameBinary",
+    "GameDataPath",
+)
+
+_E = TypeVar("_E", "GameModuleManifest", "IniGameManifest")
+
+# imports allowed in modules whose plugins can be created without importing them
+_DECLARATIVE_IMPORTS = {("basic_game", "BasicGame")}
+
+
+@dataclass
+class GameClassManifest:
+    """Manifest entry for a class defined in a game module."""
+
+    name: str
+    bases: list[str]
+
+    # constant class attributes, e.g. GameName, GameBinary or GameSteamId:
+    attributes: dict[str, Any] = field(default_factory=dict[str, Any])
+
+    # True if the class only contains constant attributes:
+    declarative: bool = False
+
+    def is_game(self) -> bool:
+        return "BasicGame" in self.bases
+
+
+@dataclass
+class GameModuleManifest:
+    """Manifest entry for a `games/*.py` module."""
+
+    module: str
+    path: str
+    mtime_ns: int
+    size: int
+    classes: list[GameClassManifest] = field(default_factory=list[GameClassManifest])
+
+    # True if the module only imports BasicGame and defines declarative games:
+    declarative: bool = False
+
+    def game_classes(self) -> list[GameClassManifest]:
+        return [cls for cls in self.classes if cls.is_game()]
+
+    @staticmethod
+    def from_dict(data: dict[str, Any]) -> GameModuleManifest:
+        return GameModuleManifest(
+            module=data["module"],
+            path=data["path"],
+            mtime_ns=data["mtime_ns"],
+            size=data["size"],
+            classes=[GameClassManifest(**c) for c in data["classes"]],
+            declarative=data["declarative"],
+        )
+
+
+@dataclass
+class IniGameManifest:
+    """Compiled `games/*.ini` game definition."""
+
+    path: str
+    mtime_ns: int
+    size: int
+
+    # values from the DEFAULT section of the file:
+    attributes: dict[str, str] = field(default_factory=dict[str, str])
+
+    # reason why the definition is invalid, if any:
+    error: str | None = None
+
+    @staticmethod
+    def from_dict(data: dict[str, Any]) -> IniGameManifest:
+        return IniGameManifest(
+            path=data["path"],
+            mtime_ns=data["mtime_ns"],
+            size=data["size"],
+            attributes=data["attributes"],
+            error=data["error"],
+        )
+
+
+def _base_name(node: ast.expr) -> str:
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Name):
+        return node.id
+    return ast.unparse(node)
+
+
+def _parse_class(node: ast.ClassDef) -> GameClassManifest:
+    manifest = GameClassManifest(
+        name=node.name, bases=[_base_name(base) for base in node.bases]
+    )
+
+    declarative = manifest.bases == ["BasicGame"] and not node.keywords
+    for index, stmt in enumerate(node.body):
+        # docstring
+        if (
+            index == 0
+            and isinstance(stmt, ast.Expr)
+            and isinstance(stmt.value, ast.Constant)
+        ):
+            continue
+
+        if isinstance(stmt, ast.Assign) and len(stmt.targets) == 1:
+            target, value = stmt.targets[0], stmt.value
+        elif isinstance(stmt, ast.AnnAssign) and stmt.value is not None:
+            target, value = stmt.target, stmt.value
+        else:
+            declarative = False
+            continue
+
+        if not isinstance(target, ast.Name):
+            declarative = False
+            continue
+
+        try:
+            # the manifest is stored as JSON, so values must be serializable
+            attribute = ast.literal_eval(value)
+            json.dumps(attribute)
+        except (ValueError, TypeError):
+            declarative = False
+        else:
+            manifest.attributes[target.id] = attribute
+
+    manifest.declarative = declarative
+    return manifest
+
+
+def parse_game_module(path: Path) -> GameModuleManifest:
+    """
+    Build the manifest entry for the given game module without importing it.
+
+    Args:
+        path: Path to the python module.
+
+    Returns:
+        The manifest entry for the module.
+    """
+    stat = path.stat()
+    manifest = GameModuleManifest(
+        module=path.stem, path=str(path), mtime_ns=stat.st_mtime_ns, size=stat.st_size
+    )
+
+    with open(path, "rb") as fp:
+        tree = ast.parse(fp.read(), str(path))
+
+    declarative = True
+    for index, stmt in enumerate(tree.body):
+        if isinstance(stmt, ast.ClassDef):
+            manifest.classes.append(_parse_class(stmt))
+        elif isinstance(stmt, ast.ImportFrom):
+            if stmt.level != 2 or any(
+                (stmt.module, alias.name) not in _DECLARATIVE_IMPORTS
+                or alias.asname is not None
+                for alias in stmt.names
+            ):
+                declarative = False
+        elif not (
+            index == 0
+            and isinstance(stmt, ast.Expr)
+            and isinstance(stmt.value, ast.Constant)
+        ):
+            declarative = False
+
+    game_classes = manifest.game_classes()
+    manifest.declarative = (
+        declarative
+        and bool(game_classes)
+        and len(game_classes) == len(manifest.classes)
+        and all(cls.declarative for cls in game_classes)
+    )
+
+    return manifest
+
+
+def compile_ini_game(path: Path) -> IniGameManifest:
+    """
+    Read and validate the given INI game definition.
+
+    Args:
+        path: Path to the INI file.
+
+    Returns:
+        The compiled definition. Invalid definitions have their `error` set instead
+        of raising.
+    """
+    stat = path.stat()
+    manifest = IniGameManifest(
+        path=str(path), mtime_ns=stat.st_mtime_ns, size=stat.st_size
+    )
+
+    config = configparser.ConfigParser()
+    config.optionxform = str  # type: ignore
+    try:
+        config.read(path)
+        manifest.attributes = dict(config["DEFAULT"].items())
+    except (configparser.Error, UnicodeDecodeError) as e:
+        manifest.error = str(e)
+        return manifest
+
+    if missing := [k for k in _REQUIRED_INI_KEYS if k not in manifest.attributes]:
+        manifest.error = "missing {}".format(", ".join(missing))
+    elif "GameNexusId" in manifest.attributes:
+        try:
+            int(manifest.attributes["GameNexusId"])
+        except ValueError:
+            manifest.error = "invalid GameNexusId {!r}".format(
+                manifest.attributes["GameNexusId"]
+            )
+
+    return manifest
+
+
+def _load_entries(
+    cache_name: str,
+    cache_version: int,
+    games_path: Path,
+    suffix: str,
+    parse: Callable[[Path, os.stat_result], _E],
+    from_dict: Callable[[dict[str, Any]], _E],
+) -> list[_E]:
+    """
+    Retrieve the entries of the files with the given suffix in the given folder,
+    using the cached entries for files that did not change since they were parsed.
+    """
+    # the cache is shared by all MO2 installations, so entries are grouped by
+    # games folder:
+    data = cast(
+        dict[str, list[dict[str, Any]]],
+        load_cache(cache_name, cache_version) or {},
+    )
+
+    cached: dict[str, _E] = {}
+    try:
+        for item in data.get(str(games_path), []):
+            entry = from_dict(item)
+            cached[entry.path] = entry
+    except (TypeError, KeyError) as e:
+        print(f"Ignoring invalid {cache_name} cache: {e}", file=sys.stderr)
+        cached = {}
+
+    entries: list[_E] = []
+    updated = False
+    with os.scandir(games_path) as it:
+        files = sorted(
+            (f for f in it if f.name.endswith(suffix) and f.name != "__init__.py"),
+            key=lambda f: f.name,
+        )
+
+    for file in files:
+        stat = file.stat()
+        entry = cached.pop(file.path, None)
+        if (
+            entry is None
+            or entry.mtime_ns != stat.st_mtime_ns
+            or entry.size != stat.st_size
+        ):
+            entry = parse(Path(file.path), stat)
+            updated = True
+        entries.append(entry)
+
+    # removed files
+    if cached:
+        updated = True
+
+    if updated:
+        data[str(games_path)] = [asdict(e) for e in entries]
+        save_cache(cache_name, cache_version, data)
+
+    return entries
+
+
+def load_manifest(games_path: Path) -> list[GameModuleManifest]:
+    """
+    Retrieve the manifest of the game modules in the given folder, using the cached
+    manifest for modules that did not change since it was written.
+
+    Args:
+        games_path: Path to the folder containing the game modules.
+
+    Returns:
+        The manifest entries for all game modules, sorted by module name.
+    """
+
+    def parse(path: Path, stat: os.stat_result) -> GameModuleManifest:
+        try:
+            return parse_game_module(path)
+        except (OSError, SyntaxError, ValueError) as e:
+            print(f"Failed to index module {path.name}: {e}", file=sys.stderr)
+
+            # keep an entry so that createPlugins reports the actual import error
+            return GameModuleManifest(
+                module=path.stem,
+                path=str(path),
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+            )
+
+    return _load_entries(
+        MANIFEST_CACHE_NAME,
+        MANIFEST_VERSION,
+        games_path,
+        ".py",
+        parse,
+        GameModuleManifest.from_dict,
+    )
+
+
+def load_ini_games(games_path: Path) -> list[IniGameManifest]:
+    """
+    Retrieve the compiled INI game definitions in the given folder, using the cached
+    definitions for files that did not change since they were compiled.
+
+    Args:
+        games_path: Path to the folder containing the INI files.
+
+    Returns:
+        The compiled definitions, sorted by file name.
+    """
+
+    def parse(path: Path, stat: os.stat_result) -> IniGameManifest:
+        try:
+            return compile_ini_game(path)
+        except OSError as e:
+            return IniGameManifest(
+                path=str(path),
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+                error=str(e),
+            )
+
+    return _load_entries(
+        INI_GAMES_CACHE_NAME,
+        INI_GAMES_VERSION,
+        games_path,
+        ".ini",
+        parse,
+        IniGameManifest.from_dict,
+    )
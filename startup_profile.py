@@ -0,0 +1,141 @@
+# -*- encoding: utf-8 -*-
+
+"""
+Opt-in profiling of the basic games startup.
+
+Profiling is enabled by setting the BASIC_GAMES_PROFILE environment variable. The
+report is written as JSON to `basic_games_startup.json` in the MO2 logs folder of
+the instance, or in the given folder if BASIC_GAMES_PROFILE is a path to an existing
+folder.
+
+The report contains the following sections, all timings being in seconds:
+  - stages: time spent in the main startup stages (setup, manifest, createPlugins).
+  - imports: time spent importing each game module.
+  - instantiations: time spent creating each game plugin.
+  - mappings: time spent in BasicGameMappings.__init__ for each game plugin.
+  - stores: scan time, number of games and number of files touched by each store.
+  - filesystem: hit and miss counters of the filesystem cache of the store scans.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+REPORT_FILENAME = "basic_games_startup.json"
+REPORT_VERSION = 1
+
+
+class StartupProfile:
+    def __init__(self, enabled: bool, output_directory: Path | None = None):
+        self.enabled = enabled
+        self._output_directory = output_directory
+        self._lock = threading.Lock()
+        self._report: dict[str, dict[str, Any]] = {
+            "stages": {},
+            "imports": {},
+            "instantiations": {},
+            "mappings": {},
+            "stores": {},
+            "filesystem": {},
+        }
+
+    @contextmanager
+    def measure(self, category: str, name: str) -> Generator[None, None, None]:
+        """
+        Measure the time spent in the context and record it under the given category
+        and name.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(category, name, time.perf_counter() - start)
+
+    def record(self, category: str, name: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._report[category][name] = seconds
+
+    def record_store(self, store: str, **values: Any) -> None:
+        """
+        Record information about a store scan, e.g., `seconds`, `games` or `files`.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._report["stores"].setdefault(store, {}).update(values)
+
+    def record_filesystem(self, **values: int) -> None:
+        """
+        Add the given counters of a store scan to the filesystem counters, see
+        `fs_utils.CachedFileSystem.counters()`.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            counters = self._report["filesystem"]
+            for name, value in values.items():
+                counters[name] = counters.get(name, 0) + value
+
+    def set_logs_directory(self, path: Path) -> None:
+        """
+        Set the folder where the report should be written, unless a folder was
+        given through BASIC_GAMES_PROFILE, and write the report.
+        """
+        if not self.enabled:
+            return
+        if self._output_directory is None:
+            self._output_directory = path
+        self.write()
+
+    def write(self) -> None:
+        """
+        Write the current report, if profiling is enabled and the output folder is
+        known.
+        """
+        if not self.enabled or self._output_directory is None:
+            return
+
+        with self._lock:
+            content = json.dumps(
+                {
+                    "version": REPORT_VERSION,
+                    "date": datetime.now(timezone.utc).isoformat(),
+                    "python": sys.version,
+                    **self._report,
+                },
+                indent=2,
+            )
+
+        try:
+            self._output_directory.joinpath(REPORT_FILENAME).write_text(
+                content, encoding="utf-8"
+            )
+        except OSError as e:
+            print(f"Failed to write startup profile: {e}", file=sys.stderr)
+
+
+def _create_startup_profile() -> StartupProfile:
+    value = os.environ.get("BASIC_GAMES_PROFILE", "")
+    if not value:
+        return StartupProfile(False)
+    if os.path.isdir(value):
+        return StartupProfile(True, Path(value))
+    return StartupProfile(True)
+
+
+startup_profile = _create_startup_profile()
@@ -1,12 +1,28 @@
 # Code greatly inspired by https://github.com/LostDragonist/steam-library-setup-tool
 
+import os
+import re
 import sys
+import threading
+import time
 import winreg
 from pathlib import Path
 from typing import TypedDict, cast
 
 import vdf  # pyright: ignore[reportMissingTypeStubs]
 
+from . import fs_utils
+from .cache_utils import cached_find_games, load_cache, path_signature, save_cache
+from .startup_profile import startup_profile
+from .store_registry import ErrorList, NumericIdStoreProvider, map_concurrently
+
+# Cache of the application manifests of each library, see LibraryFolder:
+LIBRARY_INDEX_CACHE_NAME = "steam_library_index"
+LIBRARY_INDEX_VERSION = 1
+
+# Maximum number of libraries read concurrently:
+LIBRARY_SCAN_WORKERS = 8
+
 
 class SteamGame:
     def __init__(self, appid: str, installdir: str):
@@ -38,40 +54,188 @@ class _LibraryFolders(TypedDict, total=False):
     LibraryFolders: dict[str, str]
 
 
+class _IndexedManifest(TypedDict):
+    mtime_ns: int
+    size: int
+
+    # None if the manifest could not be read:
+    appid: str | None
+    installdir: str | None
+
+
+class LibraryIndex(TypedDict):
+    # signature of the steamapps folder when the manifests were listed:
+    steamapps: list[int] | None
+
+    # indexed manifests, by filename:
+    manifests: dict[str, _IndexedManifest]
+
+
+# Tokens of the VDF text format handled by _extract_app_state(): quoted strings,
+# braces and comments, other tokens (unquoted strings, conditionals) are not handled
+_VDF_TOKEN = re.compile(r'\s*(?:"((?:\\.|[^\\"])*)"|([{}])|//[^\n]*)')
+_VDF_ESCAPE = re.compile(r"\\[ntvbrfa\\?\"']")
+_VDF_ESCAPES = {
+    "\\n": "\n",
+    "\\t": "\t",
+    "\\v": "\v",
+    "\\b": "\b",
+    "\\r": "\r",
+    "\\f": "\f",
+    "\\a": "\a",
+    "\\\\": "\\",
+    "\\?": "?",
+    '\\"': '"',
+    "\\'": "'",
+}
+
+
+def _vdf_unescape(value: str) -> str:
+    if "\\" not in value:
+        return value
+    return _VDF_ESCAPE.sub(lambda m: _VDF_ESCAPES[m.group(0)], value)
+
+
+def _extract_app_state(text: str) -> tuple[str, str] | None:
+    """
+    Extract the application ID and installation folder from the content of an
+    application manifest, without parsing the whole manifest: the content is
+    tokenized until both `AppState.appid` and `AppState.installdir` are found.
+
+    Args:
+        text: Content of the application manifest.
+
+    Returns:
+        The application ID and installation folder, or None if they could not be
+        found, e.g., if the manifest is malformed or uses VDF features not handled
+        here, in which case the manifest should be parsed with vdf.
+    """
+    pos = 1 if text.startswith("\ufeff") else 0
+    depth = 0
+    key: str | None = None
+    fields: dict[str, str] = {}
+
+    while pos < len(text):
+        match = _VDF_TOKEN.match(text, pos)
+        if match is None:
+            break
+        pos = match.end()
+
+        string, brace = match.groups()
+        if string is not None:
+            if key is None:
+                key = _vdf_unescape(string)
+            else:
+                if depth == 1 and key in ("appid", "installdir"):
+                    fields[key] = _vdf_unescape(string)
+                    if len(fields) == 2:
+                        return fields["appid"], fields["installdir"]
+                key = None
+        elif brace == "{":
+            if key is None or (depth == 0 and key != "AppState"):
+                return None
+            depth += 1
+            key = None
+        elif brace == "}":
+            # closing AppState without both fields is handled by vdf, for the error
+            if key is not None or depth <= 1:
+                return None
+            depth -= 1
+
+    return None
+
+
+def _read_manifest(filepath: Path) -> SteamGame | None:
+    try:
+        text = fs_utils.read_text(filepath)
+        if fields := _extract_app_state(text):
+            return SteamGame(*fields)
+
+        # malformed or unusual manifest, let vdf parse (or reject) it
+        info = cast(
+            _AppManifest,
+            vdf.loads(text),  # pyright: ignore[reportUnknownMemberType]
+        )
+        app_state = info["AppState"]
+    except KeyError:
+        print(
+            f'Unable to read application state from "{filepath}"',
+            file=sys.stderr,
+        )
+        return None
+    except Exception as e:
+        print(f'Unable to parse file "{filepath}": {e}', file=sys.stderr)
+        return None
+
+    try:
+        return SteamGame(app_state["appid"], app_state["installdir"])
+    except KeyError:
+        print(
+            f'Unable to read application ID or installation folder from "{filepath}"',
+            file=sys.stderr,
+        )
+        return None
+
+
 class LibraryFolder:
-    def __init__(self, path: Path):
+    def __init__(self, path: Path, index: LibraryIndex | None = None):
+        """
+        Args:
+            path: Path to the library.
+            index (optional): Index of the library from a previous scan. Manifests
+                whose modification time and size did not change are not read again,
+                and the steamapps folder is not listed if it did not change.
+        """
         self.path = path
 
         self.games: list[SteamGame] = []
-        for filepath in path.joinpath("steamapps").glob("appmanifest_*.acf"):
-            try:
-                with open(filepath, "r", encoding="utf-8") as fp:
-                    info = cast(
-                        _AppManifest,
-                        vdf.load(fp),  # pyright: ignore[reportUnknownMemberType]
-                    )
-                    app_state = info["AppState"]
-            except KeyError:
-                print(
-                    f'Unable to read application state from "{filepath}"',
-                    file=sys.stderr,
-                )
-                continue
-            except Exception as e:
-                print(f'Unable to parse file "{filepath}": {e}', file=sys.stderr)
-                continue
+        self.manifests: list[Path] = []
+
+        # index of the library after this scan, and whether it differs from the
+        # given index:
+        self.index: LibraryIndex = {"steamapps": None, "manifests": {}}
+        self.index_updated = False
+
+        previous: LibraryIndex = index or {"steamapps": None, "manifests": {}}
+
+        # the signature is retrieved before listing the folder, so that changes
+        # made while listing are detected on next scan
+        steamapps = path.joinpath("steamapps")
+        signature = path_signature(steamapps)
+        if signature is not None and previous["steamapps"] == list(signature):
+            filenames = list(previous["manifests"])
+        else:
+            filenames = [p.name for p in fs_utils.glob(steamapps, "appmanifest_*.acf")]
+            self.index_updated = True
+        self.index["steamapps"] = None if signature is None else list(signature)
 
+        for filename in filenames:
+            filepath = steamapps.joinpath(filename)
             try:
-                app_id = app_state["appid"]
-                install_dir = app_state["installdir"]
-                self.games.append(SteamGame(app_id, install_dir))
-            except KeyError:
-                print(
-                    f"Unable to read application ID or installation folder "
-                    f'from "{filepath}"',
-                    file=sys.stderr,
-                )
+                stat = fs_utils.stat(filepath)
+            except FileNotFoundError:
+                self.index_updated = True
                 continue
+            self.manifests.append(filepath)
+
+            entry = previous["manifests"].get(filename)
+            if (
+                entry is None
+                or entry["mtime_ns"] != stat.mtime_ns
+                or entry["size"] != stat.size
+            ):
+                game = _read_manifest(filepath)
+                entry = _IndexedManifest(
+                    mtime_ns=stat.mtime_ns,
+                    size=stat.size,
+                    appid=game.appid if game else None,
+                    installdir=game.installdir if game else None,
+                )
+                self.index_updated = True
+
+            self.index["manifests"][filename] = entry
+            if entry["appid"] is not None and entry["installdir"] is not None:
+                self.games.append(SteamGame(entry["appid"], entry["installdir"]))
 
     def __repr__(self):
         return str(self)
@@ -80,23 +244,24 @@ class LibraryFolder:
         return "LibraryFolder at {}: {}".format(self.path, self.games)
 
 
-def parse_library_info(library_vdf_path: Path) -> list[LibraryFolder]:
+def read_library_paths(library_vdf_path: Path) -> list[Path]:
     """
-    Read library folders from the main library file.
+    Read the path of the library folders from the main library file.
 
     Args:
         library_vdf_path: The main library file (from the Steam installation
             folder).
 
     Returns:
-        A list of LibraryFolder, for each library found.
+        The path of each library found, in file order.
     """
 
-    with open(library_vdf_path, "r", encoding="utf-8") as f:
-        info = cast(
-            _LibraryFolders,
-            vdf.load(f),  # pyright: ignore[reportUnknownMemberType]
-        )
+    info = cast(
+        _LibraryFolders,
+        vdf.loads(  # pyright: ignore[reportUnknownMemberType]
+            fs_utils.read_text(library_vdf_path)
+        ),
+    )
 
     info_folders: dict[str, str] | dict[str, _LibraryFolder]
 
@@ -111,7 +276,7 @@ def parse_library_info(library_vdf_path: Path) -> list[LibraryFolder]:
     else:
         raise ValueError(f'Unknown file format from "{library_vdf_path}"')
 
-    library_folders: list[LibraryFolder] = []
+    paths: list[Path] = []
 
     for key, value in info_folders.items():
         # only keys that are integer values contains library folder
@@ -121,21 +286,79 @@ def parse_library_info(library_vdf_path: Path) -> list[LibraryFolder]:
             continue
 
         if isinstance(value, str):
-            path = value
+            paths.append(Path(value))
         else:
-            path = value["path"]
+            paths.append(Path(value["path"]))
+
+    return paths
+
+
+def scan_libraries(
+    paths: list[Path],
+    indexes: dict[str, LibraryIndex] | None = None,
+    errors: list[tuple[str, Exception]] | None = None,
+    timings: dict[str, float] | None = None,
+) -> list[LibraryFolder]:
+    """
+    Scan the given library folders concurrently, so that libraries on different
+    drives are read in parallel.
+
+    Args:
+        paths: Path to the libraries.
+        indexes (optional): Indexes of the libraries from a previous scan, by
+            library path, see LibraryFolder.
+        errors (optional): List to append the libraries that could not be read to.
+            If not given, failures are printed.
+        timings (optional): Dictionary to fill with the time (in seconds) spent
+            reading each library, by library path.
+
+    Returns:
+        A LibraryFolder for each library that could be read, in the order of the
+        given paths.
+    """
 
+    def scan(path: Path) -> LibraryFolder:
+        start = time.perf_counter()
         try:
-            library_folders.append(LibraryFolder(Path(path)))
+            return LibraryFolder(path, (indexes or {}).get(str(path)))
+        finally:
+            if timings is not None:
+                timings[str(path)] = time.perf_counter() - start
+
+    futures = map_concurrently("basic_games-steam", scan, paths, LIBRARY_SCAN_WORKERS)
+
+    library_folders: list[LibraryFolder] = []
+    for path, future in zip(paths, futures, strict=True):
+        try:
+            library_folders.append(future.result())
         except Exception as e:
-            print(
-                'Failed to read steam library from "{}", {}'.format(path, repr(e)),
-                file=sys.stderr,
-            )
+            message = 'Failed to read steam library from "{}"'.format(path)
+            if errors is None:
+                print("{}, {}".format(message, repr(e)), file=sys.stderr)
+            else:
+                errors.append((message, e))
 
     return library_folders
 
 
+def parse_library_info(
+    library_vdf_path: Path, indexes: dict[str, LibraryIndex] | None = None
+) -> list[LibraryFolder]:
+    """
+    Read library folders from the main library file.
+
+    Args:
+        library_vdf_path: The main library file (from the Steam installation
+            folder).
+        indexes (optional): Indexes of the libraries from a previous scan, by
+            library path, see LibraryFolder.
+
+    Returns:
+        A list of LibraryFolder, for each library found.
+    """
+    return scan_libraries(read_library_paths(library_vdf_path), indexes)
+
+
 def find_steam_path() -> Path | None:
     """
     Retrieve the Steam path, if available.
@@ -146,15 +369,129 @@ def find_steam_path() -> Path | None:
     try:
         with winreg.OpenKey(winreg.HKEY_CURRENT_USER, "Software\\Valve\\Steam") as key:
             value = winreg.QueryValueEx(key, "SteamExe")
-            return Path(value[0].replace("/", "\\")).parent
+            return Path(value[0]).parent
     except FileNotFoundError:
         return None
 
 
-def find_games() -> dict[str, Path]:
+class SteamUserData:
+    """
+    Cloud save folders of the Steam users, i.e., `userdata/<user>/<appid>/remote` in
+    the Steam folder.
+
+    The Steam path is read once, and the list of users is only read again when the
+    userdata folder changes. Cloud save folders found are kept (as long as they
+    exist), but missing ones are looked for again on each call since Steam creates
+    them when the game first saves.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._steam_path: Path | None = None
+        self._steam_path_read = False
+        self._signature: tuple[int, int] | None = None
+        self._users: list[Path] = []
+        self._cloud_saves: dict[str, list[Path]] = {}
+
+    def invalidate(self) -> None:
+        """
+        Forget the cached Steam path, users and cloud save folders.
+        """
+        with self._lock:
+            self._steam_path_read = False
+            self._signature = None
+            self._users = []
+            self._cloud_saves.clear()
+
+    def _update_users(self) -> list[Path]:
+        if not self._steam_path_read:
+            self._steam_path = find_steam_path()
+            self._steam_path_read = True
+        if self._steam_path is None:
+            return []
+
+        userdata = self._steam_path.joinpath("userdata")
+        signature = path_signature(userdata)
+        if signature is None or signature != self._signature:
+            self._signature = signature
+            self._cloud_saves.clear()
+            try:
+                self._users = [
+                    userdata.joinpath(entry.name)
+                    for entry in sorted(fs_utils.scandir(userdata))
+                    if entry.is_dir and entry.name.isdigit()
+                ]
+            except OSError:
+                self._users = []
+        return self._users
+
+    def users(self) -> list[Path]:
+        """
+        Returns:
+            The folders of the Steam users, sorted by user ID.
+        """
+        with self._lock:
+            return list(self._update_users())
+
+    def cloud_save_directories(self, appid: str | int) -> list[Path]:
+        """
+        Find the cloud save folders of a game.
+
+        Args:
+            appid: Steam ID of the game.
+
+        Returns:
+            The cloud save folder of the game for each user that has one, sorted by
+            user ID.
+        """
+        appid = str(appid)
+        with self._lock:
+            users = self._update_users()
+            cloud_saves = self._cloud_saves.get(appid)
+            if not cloud_saves or not all(map(fs_utils.is_dir, cloud_saves)):
+                cloud_saves = [
+                    remote
+                    for user in users
+                    if fs_utils.is_dir(remote := user.joinpath(appid, "remote"))
+                ]
+                self._cloud_saves[appid] = cloud_saves
+            return list(cloud_saves)
+
+    def cloud_save_directory(self, appid: str | int) -> Path | None:
+        """
+        Find the cloud save folder of a game, for the first user that has one.
+
+        Args:
+            appid: Steam ID of the game.
+
+        Returns:
+            The cloud save folder, or None if no user has one for the game.
+        """
+        return next(iter(self.cloud_save_directories(appid)), None)
+
+
+steam_userdata = SteamUserData()
+
+
+def find_cloud_save_directory(appid: str | int) -> Path | None:
+    """
+    Find the cloud save folder of a Steam game, see
+    `SteamUserData.cloud_save_directory()`.
+    """
+    return steam_userdata.cloud_save_directory(appid)
+
+
+def find_games(
+    sources: list[Path] | None = None, use_index: bool = True
+) -> dict[str, Path]:
     """
     Find the list of Steam games installed.
 
+    Args:
+        sources (optional): List to append the files and folders read to.
+        use_index (optional): If False, ignore the index of the libraries from the
+            previous scan and read all application manifests.
+
     Returns:
         A mapping from Steam game ID to install locations for available
         Steam games.
@@ -165,12 +502,47 @@ def find_games() -> dict[str, Path]:
 
     library_vdf_path = steam_path.joinpath("steamapps", "libraryfolders.vdf")
 
+    indexes = cast(
+        dict[str, LibraryIndex],
+        (use_index and load_cache(LIBRARY_INDEX_CACHE_NAME, LIBRARY_INDEX_VERSION))
+        or {},
+    )
+
     try:
-        library_folders = parse_library_info(library_vdf_path)
-        library_folders.append(LibraryFolder(steam_path))
+        library_paths = read_library_paths(library_vdf_path) + [steam_path]
     except FileNotFoundError:
         return {}
 
+    # the Steam folder is usually also listed in the library file, only scan it once
+    # (at its last position, so that it still takes precedence):
+    unique_paths = {os.path.normcase(p): p for p in reversed(library_paths)}
+    library_paths = list(reversed(unique_paths.values()))
+
+    errors: list[tuple[str, Exception]] = []
+    timings: dict[str, float] = {}
+    library_folders = scan_libraries(library_paths, indexes, errors, timings)
+
+    # a library that cannot be read (e.g., on a disconnected drive) is not an error
+    # for the whole store:
+    for message, error in errors:
+        print("{}, {}".format(message, repr(error)), file=sys.stderr)
+    startup_profile.record_store(
+        "Steam", libraries=timings, failed_libraries=len(errors)
+    )
+
+    # only keep the indexes of the current libraries
+    updated_indexes = {str(library.path): library.index for library in library_folders}
+    if updated_indexes.keys() != indexes.keys() or any(
+        library.index_updated for library in library_folders
+    ):
+        save_cache(LIBRARY_INDEX_CACHE_NAME, LIBRARY_INDEX_VERSION, updated_indexes)
+
+    if sources is not None:
+        sources.append(library_vdf_path)
+        for library in library_folders:
+            sources.append(library.path.joinpath("steamapps"))
+            sources.extend(library.manifests)
+
     games: dict[str, Path] = {}
     for library in library_folders:
         for game in library.games:
@@ -181,6 +553,28 @@ def find_games() -> dict[str, Path]:
     return games
 
 
+class SteamStore(NumericIdStoreProvider):
+    name = "Steam"
+    mapping = "steamAPPId"
+
+    def __init__(self, rescan: bool = False):
+        """
+        Args:
+            rescan (optional): If True, ignore the cached games and library indexes.
+        """
+        self._rescan = rescan
+
+    def detect(self, errors: ErrorList) -> dict[str, Path]:
+        return cached_find_games(
+            self.name,
+            lambda errors, sources: find_games(
+                sources=sources, use_index=not self._rescan
+            ),
+            errors,
+            self._rescan,
+        )
+
+
 if __name__ == "__main__":
     games = find_games()
     for k, v in games.items():
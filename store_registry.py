@@ -0,0 +1,483 @@
+# -*- encoding: utf-8 -*-
+
+from __future__ import annotations
+
+import contextvars
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from pathlib import Path
+from typing import TypeVar
+
+from PyQt6.QtCore import qDebug
+
+from .fs_utils import detection_pass
+from .startup_profile import startup_profile
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+ErrorList = list[tuple[str, Exception]]
+
+StoreDetector = Callable[[ErrorList], dict[str, Path]]
+
+# Scan of a store, resolving to the games found, the errors and the time spent:
+StoreScan = Future[tuple[dict[str, Path], ErrorList, float]]
+
+
+class StoreProvider:
+    """
+    A store (launcher) games can be installed through. Subclasses must set `name`
+    and `mapping`, implement `detect()` and, if the IDs of the store can be written
+    in several ways, override `normalize_id()`.
+    """
+
+    # Name of the store, e.g. "Steam":
+    name: str
+
+    # Name of the BasicGameMappings attribute containing the IDs of a game in this
+    # store, e.g. "steamAPPId":
+    mapping: str
+
+    def detect(self, errors: ErrorList) -> dict[str, Path]:
+        """
+        List the games installed through this store. This is called from a worker
+        thread.
+
+        Args:
+            errors: List to append errors to.
+
+        Returns:
+            A mapping from store IDs to install locations.
+        """
+        raise NotImplementedError()
+
+    def normalize_id(self, store_id: str) -> str:
+        """
+        Normalize a store ID, so that IDs from the game plugins and IDs from the
+        store can be compared.
+        """
+        return store_id.strip()
+
+
+class NumericIdStoreProvider(StoreProvider):
+    """
+    Store whose IDs are numbers, e.g., "0123" and "123" are the same ID.
+    """
+
+    def normalize_id(self, store_id: str) -> str:
+        store_id = store_id.strip()
+        return str(int(store_id)) if store_id.isdigit() else store_id
+
+
+def _start_daemon_thread(name: str, fn: Callable[[], _T]) -> Future[_T]:
+    """
+    Run the given function in a new daemon thread.
+
+    Daemon threads are used instead of a ThreadPoolExecutor so that a provider stuck
+    on an unreachable drive does not prevent MO2 from exiting. The function runs in a
+    copy of the current context, e.g., to use the filesystem of the detection pass.
+    """
+    future: Future[_T] = Future()
+    context = contextvars.copy_context()
+
+    def target():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(context.run(fn))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=target, name=name, daemon=True).start()
+    return future
+
+
+def map_concurrently(
+    name: str, fn: Callable[[_T], _R], items: Iterable[_T], max_workers: int
+) -> list[Future[_R]]:
+    """
+    Call the given function on each item, on at most `max_workers` daemon threads
+    (see `_start_daemon_thread` for why daemon threads are used), in copies of the
+    current context.
+
+    Args:
+        name: Prefix of the thread names.
+        fn: Function to call on each item.
+        items: Items to call the function on.
+        max_workers: Maximum number of threads.
+
+    Returns:
+        The futures of the calls, in the order of the items.
+    """
+    items = list(items)
+    futures: list[Future[_R]] = [Future() for _ in items]
+    indexes = iter(range(len(items)))
+    lock = threading.Lock()
+
+    def worker(context: contextvars.Context):
+        while True:
+            with lock:
+                index = next(indexes, None)
+            if index is None:
+                return
+            future = futures[index]
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(context.run(fn, items[index]))
+            except BaseException as e:
+                future.set_exception(e)
+
+    for i in range(min(max_workers, len(items))):
+        threading.Thread(
+            target=worker,
+            args=(contextvars.copy_context(),),
+            name=f"{name}-{i}",
+            daemon=True,
+        ).start()
+
+    return futures
+
+
+def find_store_games(
+    providers: Mapping[str, StoreDetector],
+    timeouts: Mapping[str, float],
+    errors: ErrorList,
+    timings: dict[str, float] | None = None,
+    pending: dict[str, StoreScan] | None = None,
+) -> dict[str, dict[str, Path]]:
+    """
+    Run the given store providers concurrently.
+
+    Args:
+        providers: Mapping from store name to the function listing the games of that
+            store.
+        timeouts: Maximum time (in seconds) to wait for each store, from the start
+            of the scan.
+        errors: List to append errors to. Providers that fail or time out report an
+            error here and return no games.
+        timings: Dictionary to fill with the time (in seconds) spent by each store.
+        pending: Dictionary of the scans that did not finish in time. The scans of
+            the given providers found there are waited for again instead of being
+            restarted, and the scans that time out are added to it.
+
+    Returns:
+        A mapping from store name to the games found in that store.
+    """
+
+    def run(provider: StoreDetector):
+        provider_errors: ErrorList = []
+        start = time.perf_counter()
+        games = provider(provider_errors)
+        return games, provider_errors, time.perf_counter() - start
+
+    start = time.perf_counter()
+    futures = {
+        name: (pending or {}).pop(name, None)
+        or _start_daemon_thread(
+            f"basic_games-{name}",
+            lambda provider=provider: run(provider),
+        )
+        for name, provider in providers.items()
+    }
+
+    results: dict[str, dict[str, Path]] = {}
+    for name, future in futures.items():
+        timeout = timeouts[name]
+        try:
+            games, provider_errors, seconds = future.result(
+                max(0.0, start + timeout - time.perf_counter())
+            )
+            results[name] = games
+            errors.extend(provider_errors)
+            if timings is not None:
+                timings[name] = seconds
+        except FutureTimeoutError:
+            results[name] = {}
+            if pending is not None:
+                pending[name] = future
+            errors.append(
+                (
+                    f"Looking for {name} games did not finish in {timeout:g} seconds,"
+                    " games from this store will not be detected"
+                    + (" until it does." if pending is not None else "."),
+                    TimeoutError(f"{name} store scan timed out"),
+                )
+            )
+            if timings is not None:
+                timings[name] = timeout
+        except Exception as e:
+            results[name] = {}
+            errors.append((f"Failed to look for {name} games.", e))
+            if timings is not None:
+                timings[name] = time.perf_counter() - start
+
+    return results
+
+
+def normalize_path(path: Path | str) -> str:
+    """
+    Normalize a path for comparison: separators are unified, redundant separators
+    and up-level references are collapsed and the case is folded (Windows paths are
+    case-insensitive). The filesystem is not accessed.
+    """
+    return os.path.normpath(str(path).replace("\\", "/")).casefold()
+
+
+class StoreIndex:
+    """
+    Games of a store, indexed both by store ID and by (normalized) install path.
+    """
+
+    games: dict[str, Path]
+    """Mapping from normalized store IDs to install locations."""
+
+    paths: dict[str, list[str]]
+    """Mapping from normalized install locations to normalized store IDs."""
+
+    def __init__(
+        self,
+        games: dict[str, Path],
+        normalize_id: Callable[[str], str] = lambda store_id: store_id,
+    ):
+        """
+        Args:
+            games: Mapping from store IDs to install locations.
+            normalize_id (optional): Function normalizing the store IDs, see
+                `StoreProvider.normalize_id()`.
+        """
+        self.normalize_id = normalize_id
+        self.games = {normalize_id(store_id): path for store_id, path in games.items()}
+        self.paths = {}
+        for store_id, path in self.games.items():
+            self.paths.setdefault(normalize_path(path), []).append(store_id)
+
+    def get(self, store_id: str) -> Path | None:
+        """
+        Retrieve the install location of the game with the given ID, if installed.
+        """
+        return self.games.get(self.normalize_id(store_id))
+
+    def ids(self, path: Path | str) -> list[str]:
+        """
+        Retrieve the IDs of the games installed at the given location.
+
+        Args:
+            path: Install location to look for.
+
+        Returns:
+            The IDs of the games installed at the given location, in scan order.
+        """
+        return self.paths.get(normalize_path(path), [])
+
+
+class StoreRegistry:
+    """
+    Lazy registry of the games installed through each store.
+
+    A store is only scanned the first time its games are requested, and the result
+    is kept for all subsequent lookups. A store whose scan does not finish in time is
+    not considered scanned, the next lookup waits for the same scan again.
+    """
+
+    def __init__(
+        self,
+        default_timeout: float,
+        report_errors: Callable[[ErrorList], None] | None = None,
+    ):
+        """
+        Args:
+            default_timeout: Maximum time (in seconds) to wait for stores registered
+                without a timeout.
+            report_errors (optional): Function called with the errors of each scan,
+                if any.
+        """
+        self._providers: dict[str, StoreProvider] = {}
+        self._timeouts: dict[str, float] = {}
+        self._default_timeout = default_timeout
+        self._report_errors = report_errors
+
+        self._indexes: dict[str, StoreIndex] = {}
+        self._pending: dict[str, StoreScan] = {}
+        self._lock = threading.Lock()
+
+        # Time (in seconds) spent looking for games in each scanned store:
+        self.timings: dict[str, float] = {}
+
+    def register(self, provider: StoreProvider, timeout: float | None = None) -> None:
+        """
+        Register a store, replacing the store with the same name if any.
+
+        Args:
+            provider: The store to register.
+            timeout (optional): Maximum time (in seconds) to wait for the store.
+        """
+        with self._lock:
+            self._providers[provider.name] = provider
+            self._timeouts[provider.name] = (
+                self._default_timeout if timeout is None else timeout
+            )
+            self._indexes.pop(provider.name, None)
+            self._pending.pop(provider.name, None)
+
+    def providers(self) -> list[StoreProvider]:
+        """
+        Returns:
+            The registered stores, in registration order.
+        """
+        return list(self._providers.values())
+
+    def stores(self) -> list[str]:
+        """
+        Returns:
+            The name of the registered stores, in registration order.
+        """
+        return list(self._providers)
+
+    def is_scanned(self, store: str) -> bool:
+        return store in self._indexes
+
+    def scan(self, stores: Iterable[str] | None = None) -> dict[str, StoreIndex]:
+        """
+        Retrieve the games of the given stores, concurrently scanning the stores that
+        were not scanned yet.
+
+        Args:
+            stores (optional): Names of the stores to retrieve, defaults to all stores.
+
+        Returns:
+            A mapping from store name to the index of the games found in that store.
+        """
+        stores = list(self._providers if stores is None else stores)
+
+        errors: ErrorList = []
+        with self._lock:
+            if missing := [store for store in stores if store not in self._indexes]:
+                timings: dict[str, float] = {}
+                with detection_pass() as filesystem:
+                    games = find_store_games(
+                        {store: self._providers[store].detect for store in missing},
+                        self._timeouts,
+                        errors,
+                        timings,
+                        self._pending,
+                    )
+                self._indexes.update(
+                    (
+                        store,
+                        StoreIndex(store_games, self._providers[store].normalize_id),
+                    )
+                    for store, store_games in games.items()
+                    if store not in self._pending
+                )
+                self.timings.update(timings)
+
+                for store in missing:
+                    startup_profile.record_store(
+                        store,
+                        seconds=timings.get(store, 0.0),
+                        games=len(games[store]),
+                    )
+                startup_profile.record_filesystem(**filesystem.counters())
+                startup_profile.write()
+
+                qDebug(
+                    "Store scan timings: "
+                    + ", ".join(
+                        f"{store}: {timings.get(store, 0.0) * 1000:.0f}ms"
+                        f" ({len(games[store])} games)"
+                        for store in missing
+                    )
+                )
+
+            results = {
+                store: self._indexes.get(store)
+                or StoreIndex({}, self._providers[store].normalize_id)
+                for store in stores
+            }
+
+        if errors and self._report_errors is not None:
+            self._report_errors(errors)
+
+        return results
+
+    def games(self, store: str) -> dict[str, Path]:
+        """
+        Retrieve the games of the given store, scanning it if needed.
+
+        Args:
+            store: Name of the store.
+
+        Returns:
+            A mapping from store IDs to install locations.
+        """
+        return self.scan([store])[store].games
+
+    def find_game(
+        self, ids: Mapping[str, Sequence[str]]
+    ) -> tuple[str, str, Path] | None:
+        """
+        Find the first installed game among the given IDs, scanning the stores if
+        needed (the stores are scanned concurrently).
+
+        Args:
+            ids: Mapping from store name to the IDs to look for in that store. Stores
+                are looked into in registration order, and IDs in the given order.
+
+        Returns:
+            The store, the ID (as given) and the install location of the first game
+            found, or None if none of the games is installed.
+        """
+        for store, index in self.scan(self._stores_for(ids)).items():
+            for store_id in ids[store]:
+                if (path := index.get(store_id)) is not None:
+                    return store, store_id, path
+        return None
+
+    def find_path(
+        self, path: Path | str, ids: Mapping[str, Sequence[str]]
+    ) -> dict[str, str]:
+        """
+        Find which of the given IDs are installed at the given location, scanning the
+        stores if needed.
+
+        Args:
+            path: Install location to look for.
+            ids: Mapping from store name to the IDs to look for in that store.
+
+        Returns:
+            A mapping from store name to the first of the given IDs installed at the
+            given location, for the stores where one is.
+        """
+        key = normalize_path(path)
+        found: dict[str, str] = {}
+        for store, index in self.scan(self._stores_for(ids)).items():
+            installed = index.paths.get(key, [])
+            for store_id in ids[store]:
+                if index.normalize_id(store_id) in installed:
+                    found[store] = store_id
+                    break
+        return found
+
+    def _stores_for(self, ids: Mapping[str, Sequence[str]]) -> list[str]:
+        return [store for store in self._providers if ids.get(store)]
+
+    def invalidate(self, store: str | None = None) -> None:
+        """
+        Forget the games of the given store (or all stores), so that it is scanned
+        again on next lookup.
+
+        Args:
+            store (optional): Name of the store to invalidate, defaults to all stores.
+        """
+        with self._lock:
+            if store is None:
+                self._indexes.clear()
+                self._pending.clear()
+            else:
+                self._indexes.pop(store, None)
+                self._pending.pop(store, None)